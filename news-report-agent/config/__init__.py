@@ -0,0 +1,41 @@
+# config/__init__.py
+# ────────────────────────────────
+# ⚙️ crew_settings.yaml 로더
+# ────────────────────────────────
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+import yaml
+
+CONFIG_DIR = Path(__file__).resolve().parent
+
+
+@lru_cache(maxsize=1)
+def load_crew_settings() -> Dict[str, Any]:
+    with open(CONFIG_DIR / "crew_settings.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def embedding_settings() -> Dict[str, Any]:
+    return dict(load_crew_settings().get("embedding") or {})
+
+
+def clustering_settings() -> Dict[str, Any]:
+    return dict(load_crew_settings().get("clustering") or {})
+
+
+def tagging_settings() -> Dict[str, Any]:
+    return dict(load_crew_settings().get("tagging") or {})
+
+
+def scoring_settings() -> Dict[str, Any]:
+    return dict(load_crew_settings().get("scoring") or {})
+
+
+def topic_scope_settings() -> Dict[str, Any]:
+    return dict(load_crew_settings().get("topic_scope") or {})
+
+
+def near_dup_settings() -> Dict[str, Any]:
+    return dict(load_crew_settings().get("near_dup") or {})
@@ -7,7 +7,8 @@ import dotenv
 import yaml
 from crewai import Agent, Task, Crew
 from crewai.project import CrewBase, agent, task, crew
-from tools.tools import fetch_and_store_news, generate_embeddings_for_articles
+from tools.tools import (fetch_and_store_news, generate_embeddings_for_articles, cluster_recent_events,
+                         get_topic_events)
 from services import db_services
 from models import Article, Event, Report
 
@@ -47,11 +48,11 @@ class NewsReaderCrew:
 
     @agent
     def clusterer(self):
-        return Agent(config=self.agents_config["clusterer"])
+        return Agent(config=self.agents_config["clusterer"], tools=[cluster_recent_events])
 
     @agent
     def reporter(self):
-        return Agent(config=self.agents_config["reporter"])
+        return Agent(config=self.agents_config["reporter"], tools=[get_topic_events])
 
     # ========== TASKS ========== #
     @task
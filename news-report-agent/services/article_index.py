@@ -0,0 +1,178 @@
+# services/article_index.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🗂️ Known-article 인덱스 (url → hash_sha256/title/published_at 지문)
+#   - persist_articles의 upsert 중 대부분은 WHERE 조건에 걸려 "UPDATE 0" no-op으로 끝남
+#   - 프로세스 안에 url별 지문을 들고 있다가, 바뀐 게 없으면 SQL 자체를 생략
+#   - 키/값 모두 8바이트 정수(blake2b)로 저장 → 기사 10만 건이어도 수 MB 수준
+#   - 본문 해시가 있는 기사만 건너뜀 (본문 없이 들어온 행은 baseline처럼 항상 upsert)
+#   - 지문은 DB에 실제로 저장된 값(upsert RETURNING / warm) 기준
+#   - 같은 프로세스의 다른 upsert 경로(db_services/async_db)는 forget_many로 제거,
+#     다른 프로세스의 변경/삭제는 ARTICLE_INDEX_MAX_AGE_SEC 마다 다시 warm 해서 반영
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+WARM_ITERSIZE = 5_000
+ARTICLE_INDEX_MAX_AGE_SEC = float(os.getenv("ARTICLE_INDEX_MAX_AGE_SEC", "3600"))
+
+
+def _digest64(text: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(text.encode("utf-8", errors="ignore"), digest_size=8).digest(),
+        "big",
+    )
+
+
+def _norm_ts(dt: Optional[datetime]) -> str:
+    """DB(timestamptz)와 파서(UTC aware) 양쪽 값을 같은 문자열로 정규화"""
+    if dt is None:
+        return ""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def fingerprint(hash_sha256: Optional[str],
+                title: Optional[str],
+                published_at: Optional[datetime]) -> int:
+    """
+    persist_articles upsert의 WHERE 절과 같은 3개 컬럼으로 지문 생성.
+    (hash_sha256, title, published_at) 중 하나라도 바뀌면 지문도 바뀜.
+    """
+    return _digest64("\x1f".join([hash_sha256 or "", title or "", _norm_ts(published_at)]))
+
+
+class KnownArticleIndex:
+    """
+    url → 지문 매핑 + hit/miss 카운터.
+      - hit   : url이 있고 지문이 같음 → upsert 생략
+      - stale : url은 있는데 지문이 다름 → upsert 필요
+      - miss  : 처음 보는 url → upsert 필요
+    write 스레드(persist)와 조회가 섞일 수 있어서 lock으로 보호.
+    """
+
+    def __init__(self) -> None:
+        self._map: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.warmed = False
+        self.warmed_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def is_unchanged(self, url: str, hash_sha256: Optional[str],
+                     title: Optional[str], published_at: Optional[datetime]) -> bool:
+        key = _digest64(url)
+        fp = fingerprint(hash_sha256, title, published_at)
+        with self._lock:
+            known = self._map.get(key)
+            if known is None or not hash_sha256:
+                self.misses += 1
+                return False
+            if known != fp:
+                self.stale += 1
+                return False
+            self.hits += 1
+            return True
+
+    def record(self, url: str, hash_sha256: Optional[str],
+               title: Optional[str], published_at: Optional[datetime]) -> None:
+        self.record_many([(url, hash_sha256, title, published_at)])
+
+    def record_many(self, rows: Iterable[Tuple[str, Optional[str], Optional[str], Optional[datetime]]]) -> None:
+        entries = [(_digest64(u), fingerprint(h, t, p)) for u, h, t, p in rows if u]
+        with self._lock:
+            self._map.update(entries)
+
+    def forget(self, url: str) -> None:
+        self.forget_many([url])
+
+    def forget_many(self, urls: Iterable[str]) -> None:
+        keys = [_digest64(u) for u in urls if u]
+        with self._lock:
+            for k in keys:
+                self._map.pop(k, None)
+
+    def expired(self, max_age: float = ARTICLE_INDEX_MAX_AGE_SEC) -> bool:
+        return self.warmed and max_age > 0 and time.monotonic() - self.warmed_at > max_age
+
+    def clear(self) -> None:
+        with self._lock:
+            self._map.clear()
+            self.warmed = False
+
+    def warm(self, conn, since: Optional[datetime] = None) -> int:
+        """
+        DB의 articles에서 (url, hash_sha256, title, published_at)를 읽어 인덱스 채움.
+        server-side cursor로 읽어서 테이블이 커도 메모리에 한 번에 올리지 않음.
+        since가 있으면 fetched_at 기준 최근 것만 (RSS는 최근 기사만 재등장하므로).
+        """
+        sql = "SELECT url, hash_sha256, title, published_at FROM articles"
+        params: Tuple[Any, ...] = ()
+        if since is not None:
+            sql += " WHERE fetched_at >= %s"
+            params = (since,)
+
+        loaded = 0
+        with self._lock:
+            self._map.clear()  # 삭제된 기사 지문이 남지 않도록 처음부터 다시
+        with conn.cursor(name="known_article_index_warm") as cur:
+            cur.itersize = WARM_ITERSIZE
+            cur.execute(sql, params)
+            batch = []
+            for row in cur:
+                batch.append(row)
+                if len(batch) >= WARM_ITERSIZE:
+                    self.record_many(batch)
+                    loaded += len(batch)
+                    batch = []
+            if batch:
+                self.record_many(batch)
+                loaded += len(batch)
+
+        self.warmed = True
+        self.warmed_at = time.monotonic()
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.stale
+            return {
+                "size": len(self._map),
+                "warmed": self.warmed,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 프로세스 단위 싱글톤
+# ─────────────────────────────────────────────────────────────────────────────
+_INDEX = KnownArticleIndex()
+_WARM_LOCK = threading.Lock()
+
+
+def get_index(conn=None) -> KnownArticleIndex:
+    """
+    프로세스 공용 인덱스 반환. 아직 warm 안 됐거나 오래됐고 conn이 주어지면 그 자리에서 warm.
+    """
+    if (not _INDEX.warmed or _INDEX.expired()) and conn is not None:
+        with _WARM_LOCK:
+            if not _INDEX.warmed or _INDEX.expired():
+                _INDEX.warm(conn)
+    return _INDEX
+
+
+def index_stats() -> Dict[str, Any]:
+    return _INDEX.stats()
@@ -0,0 +1,256 @@
+# services/body_archive.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧊 기사 본문 hot/cold 분리 — retention(아카이브) & 복원
+#   - hot : article_bodies (최근 N일 본문)
+#   - cold: {BODY_ARCHIVE_DIR}/bodies-YYYY-MM.jsonl.zst
+#           배치마다 zstd 프레임 1개를 파일 끝에 append (zstd는 프레임 연결이 유효한 스트림)
+#           article_body_archive에 (파일, 프레임 offset/length) 기록 → 복원 시 그 프레임만 해제
+#
+# 사용:
+#   python -m services.body_archive archive --days 30
+#   python -m services.body_archive restore 101 102 103
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import os
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import zstandard
+from psycopg2.extras import execute_values
+
+from services.db_services import get_conn
+
+BODY_ARCHIVE_DIR = os.getenv("BODY_ARCHIVE_DIR", "data/body_archive")
+BODY_RETENTION_DAYS = int(os.getenv("BODY_RETENTION_DAYS", "30"))
+ZSTD_LEVEL = 10
+
+
+def _archive_file(month: str) -> str:
+    return f"bodies-{month}.jsonl.zst"
+
+
+def _append_frame(archive_dir: str, filename: str, payload: bytes) -> Tuple[int, int]:
+    """
+    압축 프레임 하나를 파일 끝에 붙이고 (offset, length) 반환.
+    DB에 위치를 기록하기 전에 fsync까지 끝냄 → DB 커밋 실패 시 남는 건 읽히지 않는 프레임뿐.
+    여러 archiver가 같은 파일에 붙여도 offset이 겹치지 않도록 tell ~ fsync 동안 배타 lock.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    frame = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    with open(os.path.join(archive_dir, filename), "ab") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(frame)
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    return offset, len(frame)
+
+
+def _read_frame(archive_dir: str, filename: str, offset: int, length: int) -> Dict[int, str]:
+    with open(os.path.join(archive_dir, filename), "rb") as f:
+        f.seek(offset)
+        frame = f.read(length)
+    out: Dict[int, str] = {}
+    for line in zstandard.ZstdDecompressor().decompress(frame).splitlines():
+        if line:
+            rec = json.loads(line)
+            out[rec["id"]] = rec["body"]
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1) retention: 오래된 본문 → 압축 아카이브
+# ─────────────────────────────────────────────────────────────────────────────
+def archive_bodies(older_than_days: int = BODY_RETENTION_DAYS,
+                   archive_dir: str = BODY_ARCHIVE_DIR,
+                   batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    기사 시각(published_at, 없으면 fetched_at)과 hot 저장 시각이 모두 cutoff 이전인 본문을
+    월별 파일로 옮기고 article_bodies에서 삭제.
+    배치마다 한 트랜잭션 + SKIP LOCKED → 여러 프로세스가 동시에 돌아도 같은 행을 두 번 옮기지 않음.
+    반환: {"archived": int, "batches": int, "files": [str, ...], "cutoff": str}
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    archived = 0
+    batches = 0
+    files = set()
+
+    while True:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT b.article_id, b.body, length(btrim(b.body)),
+                       to_char(COALESCE(a.published_at, a.fetched_at) AT TIME ZONE 'UTC', 'YYYY-MM')
+                FROM article_bodies b
+                JOIN articles a ON a.id = b.article_id
+                WHERE b.stored_at < %s
+                  AND COALESCE(a.published_at, a.fetched_at) < %s
+                ORDER BY b.article_id
+                LIMIT %s
+                FOR UPDATE OF b SKIP LOCKED
+                """,
+                (cutoff, cutoff, batch_size),
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+
+            by_month: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+            chars = {}
+            for article_id, body, n_chars, month in rows:
+                by_month[month].append((article_id, body))
+                chars[article_id] = n_chars
+
+            locations: List[Tuple[int, str, int, int, int]] = []
+            for month, items in by_month.items():
+                filename = _archive_file(month)
+                payload = "".join(
+                    json.dumps({"id": aid, "body": body}, ensure_ascii=False) + "\n"
+                    for aid, body in items
+                ).encode("utf-8")
+                offset, length = _append_frame(archive_dir, filename, payload)
+                locations.extend((aid, filename, offset, length, chars[aid]) for aid, _ in items)
+                files.add(filename)
+
+            execute_values(
+                cur,
+                """
+                INSERT INTO article_body_archive (article_id, archive_path, frame_offset, frame_length, body_chars)
+                VALUES %s
+                ON CONFLICT (article_id) DO UPDATE SET
+                    archive_path = EXCLUDED.archive_path,
+                    frame_offset = EXCLUDED.frame_offset,
+                    frame_length = EXCLUDED.frame_length,
+                    body_chars = EXCLUDED.body_chars,
+                    archived_at = now()
+                """,
+                locations,
+                page_size=500,
+            )
+            cur.execute(
+                "DELETE FROM article_bodies WHERE article_id = ANY(%s)",
+                ([r[0] for r in rows],),
+            )
+
+        archived += len(rows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+
+    return {
+        "archived": archived,
+        "batches": batches,
+        "files": sorted(files),
+        "cutoff": cutoff.isoformat(),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2) 조회: hot 우선, 없으면 cold 프레임만 해제
+# ─────────────────────────────────────────────────────────────────────────────
+def load_bodies(article_ids: Iterable[int], archive_dir: str = BODY_ARCHIVE_DIR) -> Dict[int, str]:
+    """
+    article_id → body. hot에 없으면 아카이브에서 읽음 (같은 프레임은 한 번만 해제).
+    DB 상태는 바꾸지 않음.
+    """
+    ids = list(dict.fromkeys(article_ids))
+    if not ids:
+        return {}
+
+    out: Dict[int, str] = {}
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT article_id, body FROM article_bodies WHERE article_id = ANY(%s)", (ids,))
+        out.update(cur.fetchall())
+
+        cold_ids = [i for i in ids if i not in out]
+        if not cold_ids:
+            return out
+        cur.execute(
+            """
+            SELECT article_id, archive_path, frame_offset, frame_length
+            FROM article_body_archive
+            WHERE article_id = ANY(%s)
+            """,
+            (cold_ids,),
+        )
+        frames: Dict[Tuple[str, int, int], List[int]] = defaultdict(list)
+        for article_id, path, offset, length in cur.fetchall():
+            frames[(path, offset, length)].append(article_id)
+
+    for (path, offset, length), wanted in frames.items():
+        decoded = _read_frame(archive_dir, path, offset, length)
+        for aid in wanted:
+            if aid in decoded:
+                out[aid] = decoded[aid]
+    return out
+
+
+def load_body(article_id: int, archive_dir: str = BODY_ARCHIVE_DIR) -> Optional[str]:
+    return load_bodies([article_id], archive_dir).get(article_id)
+
+
+def restore_bodies(article_ids: Iterable[int], archive_dir: str = BODY_ARCHIVE_DIR) -> int:
+    """
+    아카이브된 본문을 hot 테이블로 되돌림 (stored_at=now() → 다음 retention 주기까지 hot 유지).
+    반환: 복원한 개수
+    """
+    ids = list(dict.fromkeys(article_ids))
+    bodies = load_bodies(ids, archive_dir)
+    if not bodies:
+        return 0
+
+    with get_conn() as conn, conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            INSERT INTO article_bodies (article_id, body)
+            VALUES %s
+            ON CONFLICT (article_id) DO NOTHING
+            """,
+            list(bodies.items()),
+            page_size=500,
+        )
+        cur.execute(
+            "DELETE FROM article_body_archive WHERE article_id = ANY(%s)",
+            (list(bodies.keys()),),
+        )
+    return len(bodies)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.body_archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_archive = sub.add_parser("archive", help="오래된 본문을 압축 아카이브로 이동")
+    p_archive.add_argument("--days", type=int, default=BODY_RETENTION_DAYS)
+    p_archive.add_argument("--batch-size", type=int, default=1000)
+    p_archive.add_argument("--dir", default=BODY_ARCHIVE_DIR)
+
+    p_restore = sub.add_parser("restore", help="아카이브 본문을 hot 테이블로 복원")
+    p_restore.add_argument("article_ids", type=int, nargs="+")
+    p_restore.add_argument("--dir", default=BODY_ARCHIVE_DIR)
+
+    args = parser.parse_args(argv)
+    if args.command == "archive":
+        result = archive_bodies(args.days, args.dir, args.batch_size)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"✅ restored: {restore_bodies(args.article_ids, args.dir)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,13 @@
 # services/db_service.py
 import os
+import numpy as np
 import psycopg2
-from psycopg2.extras import execute_batch
+from pgvector.psycopg2 import register_vector
+from psycopg2.extras import execute_batch, execute_values
 from typing import Iterable, List, Optional, Dict, Any
 from datetime import datetime
 from models import Article, Outlet, Event, Report, ArticleEmbedding
+from services.article_index import get_index
 
 # 👇 추가
 from dotenv import load_dotenv
@@ -42,33 +45,54 @@ def upsert_outlet(outlet: Outlet) -> int:
 # ────────────────────────────────
 # 2️⃣ Articles (기사)
 # ────────────────────────────────
+def _article_params(a: Article) -> Dict[str, Any]:
+    """HttpUrl은 드라이버가 바로 못 받으므로 문자열로 (async_db와 같은 정규화 → 인덱스 키도 이 값)"""
+    row = a.model_dump()
+    row["url"] = str(a.url)
+    row["canonical_url"] = str(a.canonical_url) if a.canonical_url else None
+    return row
+
+
 def upsert_articles(articles: Iterable[Article]) -> List[int]:
     """
     여러 Article 객체를 INSERT/UPDATE (url 기준)
+    본문은 article_bodies(hot 테이블)에 따로 저장
     """
     sql = """
     INSERT INTO articles (
         outlet_id, url, title, published_at, language,
-        author, body, canonical_url, hash_sha256
+        author, canonical_url, hash_sha256
     )
     VALUES (
         %(outlet_id)s, %(url)s, %(title)s, %(published_at)s, %(language)s,
-        %(author)s, %(body)s, %(canonical_url)s, %(hash_sha256)s
+        %(author)s, %(canonical_url)s, %(hash_sha256)s
     )
     ON CONFLICT (url) DO UPDATE SET
         title = EXCLUDED.title,
-        body = COALESCE(EXCLUDED.body, articles.body),
         author = COALESCE(EXCLUDED.author, articles.author),
         published_at = COALESCE(EXCLUDED.published_at, articles.published_at),
         hash_sha256 = COALESCE(EXCLUDED.hash_sha256, articles.hash_sha256),
         fetched_at = now()
     RETURNING id;
     """
+    body_sql = """
+    INSERT INTO article_bodies (article_id, body)
+    VALUES (%s, %s)
+    ON CONFLICT (article_id) DO UPDATE SET
+        body = EXCLUDED.body,
+        stored_at = now();
+    """
     inserted_ids = []
+    articles = list(articles)
     with get_conn() as conn, conn.cursor() as cur:
         for a in articles:
-            cur.execute(sql, a.model_dump())
-            inserted_ids.append(cur.fetchone()[0])
+            cur.execute(sql, _article_params(a))
+            article_id = cur.fetchone()[0]
+            if a.body:
+                cur.execute(body_sql, (article_id, a.body))
+            inserted_ids.append(article_id)
+    # persist_articles의 known-article 인덱스 지문이 DB와 달라졌을 수 있음
+    get_index().forget_many(str(a.url) for a in articles)
     return inserted_ids
 
 # ────────────────────────────────
@@ -78,18 +102,49 @@ def upsert_embedding(embed: ArticleEmbedding) -> None:
     sql = """
     INSERT INTO article_embeddings (article_id, model, dim, embedding)
     VALUES (%s, %s, %s, %s)
-    ON CONFLICT (article_id)
-    DO UPDATE SET model = EXCLUDED.model,
-                  dim = EXCLUDED.dim,
+    ON CONFLICT (article_id, model)
+    DO UPDATE SET dim = EXCLUDED.dim,
                   embedding = EXCLUDED.embedding;
     """
     with get_conn() as conn, conn.cursor() as cur:
         cur.execute(sql, (embed.article_id, embed.model, embed.dim, embed.embedding))
 
+def upsert_embeddings(embeds: Iterable[ArticleEmbedding], conn=None, page_size: int = 500) -> int:
+    """
+    여러 임베딩을 multi-row upsert 한 번으로 저장.
+    pgvector 어댑터로 numpy float32 배열을 vector 리터럴로 바로 전송
+    (list → numeric[] → vector 캐스트를 거치지 않음).
+    conn을 넘기면 그 트랜잭션 안에서 실행.
+    """
+    rows = [
+        (e.article_id, e.model, e.dim, np.asarray(e.embedding, dtype=np.float32))
+        for e in embeds
+    ]
+    if not rows:
+        return 0
+    sql = """
+    INSERT INTO article_embeddings (article_id, model, dim, embedding)
+    VALUES %s
+    ON CONFLICT (article_id, model)
+    DO UPDATE SET dim = EXCLUDED.dim,
+                  embedding = EXCLUDED.embedding;
+    """
+    if conn is None:
+        with get_conn() as own:
+            return _execute_embeddings(own, sql, rows, page_size)
+    return _execute_embeddings(conn, sql, rows, page_size)
+
+
+def _execute_embeddings(conn, sql: str, rows: list, page_size: int) -> int:
+    register_vector(conn)
+    with conn.cursor() as cur:
+        execute_values(cur, sql, rows, page_size=page_size)
+    return len(rows)
+
 # ────────────────────────────────
 # 4️⃣ Events (사건)
 # ────────────────────────────────
-def insert_event(event: Event) -> int:
+def insert_event(event: Event, conn=None) -> int:
     sql = """
     INSERT INTO events (
         summary, topic_tags, start_time, end_time,
@@ -101,22 +156,29 @@ def insert_event(event: Event) -> int:
     )
     RETURNING id;
     """
-    with get_conn() as conn, conn.cursor() as cur:
+    if conn is None:
+        with get_conn() as own:
+            return insert_event(event, conn=own)
+    with conn.cursor() as cur:
         cur.execute(sql, event.model_dump())
         event_id = cur.fetchone()[0]
     return event_id
 
 
-def link_event_articles(event_id: int, links: Iterable[tuple[int, float]]) -> None:
+def link_event_articles(event_id: int, links: Iterable[tuple[int, float]], conn=None) -> None:
     """
     links: [(article_id, similarity), ...]
+    conn: 주어지면 그 연결(트랜잭션)에서 실행 — 이벤트 여러 개를 한 번에 저장할 때
     """
     sql = """
     INSERT INTO event_articles (event_id, article_id, similarity)
     VALUES (%s, %s, %s)
     ON CONFLICT (event_id, article_id) DO NOTHING;
     """
-    with get_conn() as conn, conn.cursor() as cur:
+    if conn is None:
+        with get_conn() as own:
+            return link_event_articles(event_id, links, conn=own)
+    with conn.cursor() as cur:
         execute_batch(cur, sql, [(event_id, aid, sim) for aid, sim in links], page_size=200)
 
 # ────────────────────────────────
@@ -0,0 +1,290 @@
+# services/embedding_backfill.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🔁 임베딩 백필 워커 (에이전트와 무관하게 커버리지 100%로 수렴)
+#   - 대상: 현재 provider(model)의 article_embeddings 행이 없는 기사 (NOT EXISTS anti-join)
+#           본문이 임베딩 최소 길이(50자) 미만인 기사는 영구 실패이므로 제외
+#   - keyset pagination: id > 마지막 처리 id ORDER BY id LIMIT n (OFFSET 없음)
+#   - checkpoint: job_checkpoints("embedding_backfill:<model>")에 last_id/누적 카운터 저장
+#                 → 중단 후 재시작하면 이어서 진행, 끝까지 가면 last_id=0으로 되돌려
+#                   다음 실행에서 실패분을 다시 훑음
+#   - 여러 프로세스 동시 실행: 배치를 embedding_claims에 lease로 등록하는 짧은 트랜잭션만 커밋하고
+#     임베딩(API 호출)은 잠금 없이 → 같은 기사를 두 워커가 임베딩하지 않고,
+#     수집(persist_articles의 ON CONFLICT DO UPDATE)이 백필 뒤에서 기다리지 않음
+#     워커가 중단되면 CLAIM_LEASE_SEC 뒤에 다른 워커가 다시 가져감
+#
+# 사용:
+#   python -m services.embedding_backfill run --batch-size 256      # 한 바퀴
+#   python -m services.embedding_backfill run --loop --interval 300  # 상주 (프로세스 여러 개 가능)
+#   python -m services.embedding_backfill status
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from psycopg2.extras import Json
+
+from services.db_services import get_conn
+from services.embedding_providers import get_provider
+from services.embedding_service import generate_embeddings_batch
+
+MIN_BODY_CHARS = 50  # generate_embeddings_batch 의 "본문이 너무 짧습니다" 기준과 동일
+CLAIM_LEASE_SEC = float(os.getenv("EMBEDDING_CLAIM_LEASE_SEC", "900"))  # 배치 하나 임베딩(재시도 포함)보다 길게
+
+# 임베딩 대상: hot 본문이 충분히 길거나, hot 본문 없이 retention으로 아카이브된 본문
+# (아카이브 본문은 body_archive.load_bodies로 읽음, body_chars NULL = 길이 기록 전 아카이브 → 대상)
+ELIGIBLE_SQL = f"""
+    (EXISTS (SELECT 1 FROM article_bodies b
+             WHERE b.article_id = a.id AND length(btrim(b.body)) >= {MIN_BODY_CHARS})
+     OR (NOT EXISTS (SELECT 1 FROM article_bodies b WHERE b.article_id = a.id)
+         AND EXISTS (SELECT 1 FROM article_body_archive z
+                     WHERE z.article_id = a.id AND COALESCE(z.body_chars, {MIN_BODY_CHARS}) >= {MIN_BODY_CHARS})))
+"""
+
+_MISSING_SQL = f"""
+    FROM articles a
+    WHERE {ELIGIBLE_SQL}
+      AND NOT EXISTS (
+        SELECT 1 FROM article_embeddings e
+        WHERE e.article_id = a.id AND e.model = %(model)s
+    )
+"""
+
+
+def job_name(model: str) -> str:
+    return f"embedding_backfill:{model}"
+
+
+# ────────────────────────────────
+# 📍 checkpoint
+# ────────────────────────────────
+def load_checkpoint(job: str) -> Dict[str, Any]:
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT state FROM job_checkpoints WHERE job = %s;", (job,))
+        row = cur.fetchone()
+    return dict(row[0]) if row else {}
+
+
+def save_checkpoint(cur, job: str, last_id: int, embedded: int = 0, failed: int = 0,
+                    reset: bool = False) -> None:
+    """
+    누적 카운터는 더하고 last_id는 여러 워커 중 가장 앞선 값을 유지 (GREATEST).
+    reset=True면 한 바퀴 끝 → last_id=0
+    """
+    cur.execute(
+        """
+        INSERT INTO job_checkpoints (job, state, updated_at)
+        VALUES (%(job)s, %(state)s, now())
+        ON CONFLICT (job) DO UPDATE
+        SET state = job_checkpoints.state || jsonb_build_object(
+                'last_id', CASE WHEN %(reset)s THEN 0
+                                ELSE GREATEST(COALESCE((job_checkpoints.state->>'last_id')::bigint, 0), %(last_id)s)
+                           END,
+                'embedded', COALESCE((job_checkpoints.state->>'embedded')::bigint, 0) + %(embedded)s,
+                'failed', COALESCE((job_checkpoints.state->>'failed')::bigint, 0) + %(failed)s,
+                'passes', COALESCE((job_checkpoints.state->>'passes')::bigint, 0) + %(pass_done)s
+            ),
+            updated_at = now();
+        """,
+        {
+            "job": job,
+            "state": Json({"last_id": 0 if reset else last_id, "embedded": embedded,
+                           "failed": failed, "passes": int(reset)}),
+            "reset": reset,
+            "last_id": last_id,
+            "embedded": embedded,
+            "failed": failed,
+            "pass_done": int(reset),
+        },
+    )
+
+
+# ────────────────────────────────
+# 🚚 백필
+# ────────────────────────────────
+def _claim_batch(cur, model: str, after: int, batch_size: int) -> Tuple[List[int], List[int]]:
+    """
+    다른 워커의 lease가 살아 있는 기사는 건너뛰고 다음 batch_size개를 embedding_claims에 등록.
+    반환: (claim한 id, 그중 아직 임베딩 없는 id)
+      - 두 워커가 같은 id를 동시에 고르면 나중 INSERT는 PK에서 먼저 커밋한 쪽을 기다린 뒤
+        ON CONFLICT ... WHERE (lease 만료) 가 거짓 → RETURNING에 안 나옴 (한 워커만 claim)
+      - 방금 다른 워커가 임베딩하고 lease를 놓은 행이 섞일 수 있음 → 새 snapshot으로 한 번 더 거름
+    """
+    cur.execute(
+        f"""
+        WITH c AS (
+            SELECT a.id
+            {_MISSING_SQL}
+              AND a.id > %(after)s
+              AND NOT EXISTS (
+                SELECT 1 FROM embedding_claims k
+                WHERE k.model = %(model)s AND k.article_id = a.id
+                  AND k.claimed_at > now() - make_interval(secs => %(lease)s)
+              )
+            ORDER BY a.id
+            LIMIT %(limit)s
+        )
+        INSERT INTO embedding_claims (model, article_id)
+        SELECT %(model)s, id FROM c
+        ON CONFLICT (model, article_id) DO UPDATE SET claimed_at = now()
+        WHERE embedding_claims.claimed_at <= now() - make_interval(secs => %(lease)s)
+        RETURNING article_id;
+        """,
+        {"model": model, "after": after, "limit": batch_size, "lease": CLAIM_LEASE_SEC},
+    )
+    claimed = sorted(r[0] for r in cur.fetchall())
+    if not claimed:
+        return [], []
+    cur.execute(
+        """
+        SELECT id FROM unnest(%(ids)s::bigint[]) AS t(id)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM article_embeddings e
+            WHERE e.article_id = t.id AND e.model = %(model)s
+        )
+        ORDER BY id;
+        """,
+        {"ids": claimed, "model": model},
+    )
+    return claimed, [r[0] for r in cur.fetchall()]
+
+
+def _release(cur, model: str, article_ids: List[int]) -> None:
+    cur.execute(
+        "DELETE FROM embedding_claims WHERE model = %s AND article_id = ANY(%s);",
+        (model, article_ids),
+    )
+
+
+def _remaining(cur, model: str, after: int) -> int:
+    """
+    after 이후 아직 임베딩 없는 기사 수 + 다른 워커가 아직 임베딩 중인(lease 유효) 기사 수.
+    0이어야 한 바퀴 끝 → 마지막으로 배치를 끝낸 워커가 reset
+    """
+    cur.execute(
+        f"""
+        SELECT (SELECT count(*) {_MISSING_SQL} AND a.id > %(after)s)
+             + (SELECT count(*) FROM embedding_claims
+                WHERE model = %(model)s AND claimed_at > now() - make_interval(secs => %(lease)s));
+        """,
+        {"model": model, "after": after, "lease": CLAIM_LEASE_SEC},
+    )
+    return int(cur.fetchone()[0])
+
+
+def run_backfill(model: Optional[str] = None,
+                 batch_size: int = 256,
+                 max_batches: Optional[int] = None,
+                 restart: bool = False,
+                 pause: float = 0.0) -> Dict[str, Any]:
+    """
+    checkpoint 위치부터 끝까지 한 바퀴 (max_batches면 그만큼만).
+    pause: 배치 사이 대기(초) — 모델 전환용 재임베딩처럼 운영 트래픽과 API 한도를 나눠 쓸 때
+    반환: {"model", "batches", "embedded", "failed", "last_id", "pass_complete", "errors"}
+    """
+    provider = get_provider(model)
+    model = provider.name
+    job = job_name(model)
+    after = 0 if restart else int(load_checkpoint(job).get("last_id", 0))
+
+    batches = embedded = failed = 0
+    errors: List[str] = []
+    pass_complete = False
+    while max_batches is None or batches < max_batches:
+        # claim은 짧은 트랜잭션으로 커밋 → 임베딩 API 호출 동안 articles 행 잠금 없음
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                claimed, ids = _claim_batch(cur, model, after, batch_size)
+                if not claimed:
+                    # 남은 행이 전부 다른 워커가 claim 중이라 비었을 수도 있음 → claim 무시하고 다시 세어
+                    # 정말 0일 때만 한 바퀴 끝 (진행 중인 워커의 last_id / passes를 건드리지 않도록)
+                    if _remaining(cur, model, after) == 0:
+                        save_checkpoint(cur, job, after, reset=True)
+                        pass_complete = True
+        conn.close()
+        if not claimed:
+            break
+
+        try:
+            result = generate_embeddings_batch(ids, model) if ids else {"processed": 0, "errors": []}
+        except Exception:
+            # lease는 바로 놓음 (다음 바퀴에서 다시 시도)
+            with get_conn() as conn, conn.cursor() as cur:
+                _release(cur, model, claimed)
+            conn.close()
+            raise
+        n_failed = len(ids) - result["processed"]
+        after = claimed[-1]
+        with get_conn() as conn, conn.cursor() as cur:
+            _release(cur, model, claimed)
+            save_checkpoint(cur, job, after, result["processed"], n_failed)
+        conn.close()
+
+        batches += 1
+        embedded += result["processed"]
+        failed += n_failed
+        errors.extend(result["errors"][:5])
+        print(f"🔁 [{job}] batch {batches}: {result['processed']}/{len(ids)} embedded (last_id={after})")
+        if pause:
+            time.sleep(pause)
+
+    return {"model": model, "batches": batches, "embedded": embedded, "failed": failed,
+            "last_id": after, "pass_complete": pass_complete, "errors": errors[:20]}
+
+
+def coverage(model: Optional[str] = None) -> Dict[str, Any]:
+    """임베딩 대상 기사 수 / 누락 수 / checkpoint"""
+    provider = get_provider(model)
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(f"SELECT count(*) FROM articles a WHERE {ELIGIBLE_SQL};")
+        eligible = cur.fetchone()[0]
+        cur.execute(f"SELECT count(*) {_MISSING_SQL};", {"model": provider.name})
+        missing = cur.fetchone()[0]
+    conn.close()
+    return {
+        "model": provider.name,
+        "eligible": eligible,
+        "missing": missing,
+        "coverage": round(1 - missing / eligible, 4) if eligible else 1.0,
+        "checkpoint": load_checkpoint(job_name(provider.name)),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.embedding_backfill")
+    parser.add_argument("--model", default=None, help="provider 이름 (기본: crew_settings.yaml)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="임베딩 누락 기사 백필")
+    p_run.add_argument("--batch-size", type=int, default=256)
+    p_run.add_argument("--max-batches", type=int, default=None)
+    p_run.add_argument("--restart", action="store_true", help="checkpoint 무시하고 처음부터")
+    p_run.add_argument("--pause", type=float, default=0.0, help="배치 사이 대기(초)")
+    p_run.add_argument("--loop", action="store_true", help="한 바퀴 끝나면 interval 뒤 다시")
+    p_run.add_argument("--interval", type=float, default=300.0)
+
+    sub.add_parser("status", help="커버리지 / checkpoint")
+
+    args = parser.parse_args(argv)
+    if args.command == "status":
+        print(json.dumps(coverage(args.model), ensure_ascii=False, indent=2, default=str))
+        return 0
+
+    while True:
+        result = run_backfill(args.model, args.batch_size, args.max_batches, args.restart, args.pause)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        if not args.loop:
+            return 0
+        args.restart = False
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# services/embedding_executor.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🚦 동시 임베딩 실행기 (RPM/TPM 속도 제한 + 적응형 backoff)
+#   - 배치(요청) 여러 개를 스레드로 동시에 호출
+#   - 요청 수(RPM)와 토큰 수(TPM) 두 개의 token bucket을 모두 통과해야 전송
+#   - 429/5xx/타임아웃은 retry-after 힌트(없으면 지수 backoff + jitter)만큼 전체 일시정지,
+#     동시에 전송 속도를 줄였다가(×0.7) 성공이 이어지면 서서히 복구(×1.05)
+#   - input 때문에 생긴 오류(400 invalid input / 토큰 초과 등)만 배치를 반으로 나눠 원인 input 격리
+#   - 그 외(401/403, insufficient_quota, 재시도 소진된 429/5xx 등)는 쪼개도 같으므로 배치 전체 실패
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Batch = List[Tuple[str, str, int]]  # [(key, text, n_tokens), ...]
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# 요청 내용(input) 탓인 상태 코드 → 반으로 나누면 나머지 input은 성공
+INPUT_ERROR_STATUS = {400, 413, 422}
+
+
+class RateLimiter:
+    """RPM/TPM 두 개의 token bucket. 버킷은 가득 찬 상태로 시작."""
+
+    def __init__(self, rpm: int, tpm: int) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self.scale = 1.0  # 적응형 속도 배율 (0.2 ~ 1.0)
+        self._req = float(rpm)
+        self._tok = float(tpm)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        dt = now - self._last
+        self._last = now
+        self._req = min(self.rpm, self._req + dt * self.rpm * self.scale / 60.0)
+        self._tok = min(self.tpm, self._tok + dt * self.tpm * self.scale / 60.0)
+
+    def acquire(self, tokens: int) -> float:
+        """예산이 생길 때까지 대기 후 차감. 반환: 기다린 시간(초)"""
+        tokens = min(tokens, self.tpm)  # 버킷보다 큰 요청이 영원히 대기하지 않도록
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._req >= 1 and self._tok >= tokens:
+                        self._req -= 1
+                        self._tok -= tokens
+                        return waited
+                    need_r = (1 - self._req) * 60.0 / (self.rpm * self.scale) if self._req < 1 else 0.0
+                    need_t = (tokens - self._tok) * 60.0 / (self.tpm * self.scale) if self._tok < tokens else 0.0
+                    wait = max(need_r, need_t)
+            wait = min(max(wait, 0.01), 5.0)
+            time.sleep(wait)
+            waited += wait
+
+    def cooldown(self, seconds: float) -> None:
+        """429 등: 모든 워커를 seconds 동안 멈추고 속도 배율 감소"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.scale = max(0.2, self.scale * 0.7)
+
+    def recover(self) -> None:
+        with self._lock:
+            self.scale = min(1.0, self.scale * 1.05)
+
+
+def _status_of(e: Exception) -> Optional[int]:
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    """응답 헤더의 retry-after-ms / retry-after(초) 힌트"""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def is_retryable(e: Exception) -> bool:
+    if getattr(e, "code", None) == "insufficient_quota":
+        return False  # 429지만 기다려도 풀리지 않음
+    status = _status_of(e)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    name = type(e).__name__
+    return name in ("APIConnectionError", "APITimeoutError", "Timeout", "ConnectionError")
+
+
+def is_input_error(e: Exception) -> bool:
+    """배치 안 특정 input 때문에 실패했는지 (쪼개서 격리할 가치가 있는 오류)"""
+    if getattr(e, "code", None) == "insufficient_quota":
+        return False
+    status = _status_of(e)
+    if status is not None:
+        return status in INPUT_ERROR_STATUS
+    # 로컬/해시 provider: 입력 텍스트 처리 오류
+    return isinstance(e, (ValueError, UnicodeError))
+
+
+class EmbeddingExecutor:
+    """
+    사용:
+        ex = EmbeddingExecutor(lambda texts: embed_texts(texts, model), rpm=3000, tpm=1_000_000)
+        vectors, failed = ex.run(pack_batches(items))
+        ex.stats()
+    """
+
+    def __init__(self,
+                 embed_fn: Callable[[List[str]], List[List[float]]],
+                 rpm: int = 3000,
+                 tpm: int = 1_000_000,
+                 max_concurrency: int = 4,
+                 max_retries: int = 6,
+                 base_backoff: float = 1.0,
+                 max_backoff: float = 60.0) -> None:
+        self.embed_fn = embed_fn
+        self.limiter = RateLimiter(rpm, tpm)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "rate_limited": 0, "splits": 0,
+                       "inputs": 0, "tokens": 0, "throttle_wait_sec": 0.0}
+        self._elapsed = 0.0
+
+    def _bump(self, **kw: float) -> None:
+        with self._lock:
+            for k, v in kw.items():
+                self._stats[k] += v
+
+    def _call(self, batch: Batch) -> List[List[float]]:
+        """재시도 가능한 오류는 여기서 흡수, 그 외 오류는 raise"""
+        tokens = sum(n for _, _, n in batch)
+        attempt = 0
+        while True:
+            waited = self.limiter.acquire(tokens)
+            self._bump(requests=1, throttle_wait_sec=waited)
+            try:
+                vectors = self.embed_fn([text for _, text, _ in batch])
+                self.limiter.recover()
+                self._bump(inputs=len(batch), tokens=tokens)
+                return vectors
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                if _status_of(e) == 429:
+                    self._bump(rate_limited=1)
+                self._bump(retries=1)
+                hint = _retry_after(e)
+                delay = hint if hint is not None else min(
+                    self.max_backoff, self.base_backoff * (2 ** (attempt - 1))
+                ) * (0.5 + random.random())
+                self.limiter.cooldown(delay)
+
+    def _run_batch(self, batch: Batch) -> Tuple[Dict[str, List[float]], Dict[str, str]]:
+        try:
+            vectors = self._call(batch)
+            return {key: vec for (key, _, _), vec in zip(batch, vectors)}, {}
+        except Exception as e:
+            if len(batch) == 1 or not is_input_error(e):
+                return {}, {key: str(e) for key, _, _ in batch}
+            self._bump(splits=1)
+            mid = len(batch) // 2
+            ok_l, err_l = self._run_batch(batch[:mid])
+            ok_r, err_r = self._run_batch(batch[mid:])
+            return ok_l | ok_r, err_l | err_r
+
+    def run(self, batches: List[Batch]) -> Tuple[Dict[str, List[float]], Dict[str, str]]:
+        """배치들을 동시에 실행. 반환: ({key: vector}, {key: error})"""
+        vectors: Dict[str, List[float]] = {}
+        failed: Dict[str, str] = {}
+        if not batches:
+            return vectors, failed
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+            for ok, err in pool.map(self._run_batch, batches):
+                vectors.update(ok)
+                failed.update(err)
+        with self._lock:
+            self._elapsed += time.perf_counter() - t0
+        return vectors, failed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s: Dict[str, Any] = dict(self._stats)
+            elapsed = self._elapsed
+        s["elapsed_sec"] = round(elapsed, 3)
+        s["throttle_wait_sec"] = round(s["throttle_wait_sec"], 3)
+        s["inputs_per_sec"] = round(s["inputs"] / elapsed, 2) if elapsed else 0.0
+        s["tokens_per_min"] = round(s["tokens"] * 60.0 / elapsed) if elapsed else 0
+        s["requests_per_min"] = round(s["requests"] * 60.0 / elapsed, 1) if elapsed else 0.0
+        s["rate_scale"] = round(self.limiter.scale, 3)
+        return s
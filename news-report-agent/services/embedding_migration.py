@@ -0,0 +1,359 @@
+# services/embedding_migration.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🔀 임베딩 모델 무중단 전환
+#   - article_embeddings 는 (article_id, model) 키 → 기존 모델로 검색하는 동안 새 모델 벡터를 옆에 쌓음
+#   - embedding_models 레지스트리의 active 모델이 get_provider(None)의 기본값
+#     (레지스트리가 비어 있으면 crew_settings.yaml embedding.model)
+#   - 절차:
+#       start  <model>  : 레지스트리에 migrating으로 등록 + 모델 전용 ANN 인덱스 생성
+#       run    <model>  : 백필 워커(embedding_backfill)로 재임베딩, 배치 사이 pause로 속도 제한
+#       status          : 모델별 커버리지 / checkpoint
+#       switch <model>  : 커버리지 ≥ min_coverage면 한 트랜잭션에서 active 교체 (기존 active → standby)
+#       drop   <model>  : standby 모델의 인덱스 → 벡터 → 캐시 순으로 배치 삭제, retired 처리
+#   - 각 프로세스는 active 모델을 ACTIVE_MODEL_TTL_SEC 동안 캐시하므로,
+#     switch 직후 TTL 동안은 이전 모델로 검색될 수 있음 → drop은 그 이후에만 허용
+#
+# 사용:
+#   python -m services.embedding_migration start text-embedding-3-large@1536
+#   python -m services.embedding_migration run text-embedding-3-large@1536 --pause 2
+#   python -m services.embedding_migration switch text-embedding-3-large@1536 --min-coverage 0.99
+#   python -m services.embedding_migration drop text-embedding-3-small
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import embedding_settings
+from services.db_services import get_conn
+
+ACTIVE_MODEL_TTL_SEC = 30.0
+
+_active_lock = threading.Lock()
+_active: Dict[str, Any] = {"model": None, "at": 0.0}
+
+
+def _settings() -> Dict[str, Any]:
+    return dict(embedding_settings().get("migration") or {})
+
+
+# ────────────────────────────────
+# 📇 레지스트리
+# ────────────────────────────────
+def active_model(refresh: bool = False) -> Optional[str]:
+    """
+    레지스트리의 active 모델 (TTL 캐시). 테이블이 없거나 DB 오류면 None → 설정값 사용.
+    """
+    now = time.monotonic()
+    with _active_lock:
+        if not refresh and now - _active["at"] < ACTIVE_MODEL_TTL_SEC:
+            return _active["model"]
+    model = None
+    try:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('embedding_models') IS NOT NULL;")
+            if cur.fetchone()[0]:
+                cur.execute("SELECT model FROM embedding_models WHERE status = 'active';")
+                row = cur.fetchone()
+                model = row[0] if row else None
+        conn.close()
+    except Exception as e:
+        print(f"[active_model] Error: {e}")
+    with _active_lock:
+        _active.update(model=model, at=now)
+    return model
+
+
+def list_models() -> List[Dict[str, Any]]:
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT r.model, r.dim, r.status, r.activated_at, r.retired_at,
+                   (SELECT count(*) FROM article_embeddings e WHERE e.model = r.model)
+            FROM embedding_models r
+            ORDER BY r.created_at;
+            """
+        )
+        rows = cur.fetchall()
+    conn.close()
+    return [{"model": r[0], "dim": r[1], "status": r[2], "activated_at": r[3],
+             "retired_at": r[4], "vectors": r[5]} for r in rows]
+
+
+def _model_dim(cur, model: str) -> int:
+    cur.execute("SELECT dim FROM embedding_models WHERE model = %s;", (model,))
+    row = cur.fetchone()
+    if row is None:
+        raise ValueError(f"등록되지 않은 모델: {model} (먼저 start)")
+    return int(row[0])
+
+
+# ────────────────────────────────
+# 🚀 전환 절차
+# ────────────────────────────────
+def start_migration(target: str, build_index: bool = True) -> Dict[str, Any]:
+    """
+    target을 migrating으로 등록. active가 아직 없으면 현재 설정 모델을 active로 먼저 기록.
+    build_index: 모델 전용 partial HNSW 인덱스 (같은 dim 모델끼리 섞이지 않도록)
+    """
+    from services.embedding_providers import configured_provider, get_provider
+    from services import vector_search
+
+    provider = get_provider(target)
+    conn = get_conn()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute("LOCK TABLE embedding_models IN SHARE ROW EXCLUSIVE MODE;")
+            cur.execute("SELECT model FROM embedding_models WHERE status = 'active';")
+            row = cur.fetchone()
+            current = row[0] if row else None
+            if current is None:
+                base = configured_provider()
+                cur.execute(
+                    """
+                    INSERT INTO embedding_models (model, dim, status, activated_at)
+                    VALUES (%s, %s, 'active', now())
+                    ON CONFLICT (model) DO UPDATE SET status = 'active', activated_at = now();
+                    """,
+                    (base.name, base.dim),
+                )
+                current = base.name
+            if provider.name == current:
+                raise ValueError(f"{provider.name} 는 이미 active 모델입니다")
+            cur.execute(
+                """
+                INSERT INTO embedding_models (model, dim, status)
+                VALUES (%s, %s, 'migrating')
+                ON CONFLICT (model) DO UPDATE
+                SET status = 'migrating', dim = EXCLUDED.dim, retired_at = NULL
+                WHERE embedding_models.status = 'retired';
+                """,
+                (provider.name, provider.dim),
+            )
+    finally:
+        conn.close()
+
+    index = None
+    if build_index and provider.dim <= vector_search.MAX_INDEX_DIM["full"]:
+        index = vector_search.ensure_index(provider.dim, model=provider.name)
+    active_model(refresh=True)
+    return {"model": provider.name, "dim": provider.dim, "active": current, "index": index}
+
+
+def run_migration(target: str,
+                  batch_size: Optional[int] = None,
+                  pause: Optional[float] = None,
+                  max_batches: Optional[int] = None) -> Dict[str, Any]:
+    """target 재임베딩 (백필 워커 재사용 → checkpoint로 이어서, 여러 프로세스 동시 실행 가능)"""
+    from services.embedding_backfill import run_backfill
+
+    cfg = _settings()
+    return run_backfill(
+        target,
+        batch_size=int(batch_size or cfg.get("batch_size", 256)),
+        max_batches=max_batches,
+        pause=float(cfg.get("pause_sec", 1.0) if pause is None else pause),
+    )
+
+
+def migration_status() -> List[Dict[str, Any]]:
+    from services.embedding_backfill import coverage
+
+    out = []
+    for m in list_models():
+        if m["status"] != "retired":
+            m |= {k: v for k, v in coverage(m["model"]).items() if k in ("eligible", "missing", "coverage")}
+        out.append(m)
+    return out
+
+
+def switch_active(target: str, min_coverage: Optional[float] = None) -> Dict[str, Any]:
+    """
+    커버리지가 min_coverage 이상이면 active를 target으로 교체 (한 트랜잭션 → 중간 상태 없음).
+    기존 active는 standby (벡터 유지 → 같은 방법으로 되돌릴 수 있음).
+    """
+    from services.embedding_backfill import ELIGIBLE_SQL
+
+    threshold = float(_settings().get("min_coverage", 0.99) if min_coverage is None else min_coverage)
+    conn = get_conn()
+    try:
+        with conn, conn.cursor() as cur:
+            # start/switch/drop 끼리 직렬화 (검색 쪽 SELECT는 막지 않음)
+            cur.execute("LOCK TABLE embedding_models IN SHARE ROW EXCLUSIVE MODE;")
+            cur.execute("SELECT status FROM embedding_models WHERE model = %s;", (target,))
+            row = cur.fetchone()
+            if row is None or row[0] not in ("migrating", "standby"):
+                raise ValueError(f"{target}: 전환 가능한 상태가 아님 ({row[0] if row else '미등록'})")
+            cur.execute(
+                f"""
+                SELECT count(*),
+                       count(*) FILTER (WHERE EXISTS (
+                           SELECT 1 FROM article_embeddings e
+                           WHERE e.article_id = a.id AND e.model = %s))
+                FROM articles a
+                WHERE {ELIGIBLE_SQL};
+                """,
+                (target,),
+            )
+            eligible, covered = cur.fetchone()
+            ratio = covered / eligible if eligible else 1.0
+            if ratio < threshold:
+                conn.rollback()
+                return {"switched": False, "model": target, "coverage": round(ratio, 4), "min_coverage": threshold}
+
+            cur.execute(
+                """
+                UPDATE embedding_models SET status = 'standby'
+                WHERE status = 'active'
+                RETURNING model;
+                """
+            )
+            previous = cur.fetchone()
+            cur.execute(
+                "UPDATE embedding_models SET status = 'active', activated_at = now() WHERE model = %s;",
+                (target,),
+            )
+    finally:
+        conn.close()
+    active_model(refresh=True)
+    return {"switched": True, "model": target, "previous": previous[0] if previous else None,
+            "coverage": round(ratio, 4), "min_coverage": threshold}
+
+
+def drop_model(model: str, batch_size: int = 5000, force: bool = False) -> Dict[str, Any]:
+    """
+    standby / migrating 모델의 인덱스·벡터·캐시를 삭제하고 retired 처리.
+      - 인덱스를 먼저 지워서 행 삭제 시 ANN 인덱스 갱신 비용을 없앰
+      - 삭제는 PK (article_id, model) 순서로 batch_size씩 끊어 커밋 → 긴 잠금/거대 트랜잭션 없음
+    """
+    from services import vector_search
+    from services.embedding_backfill import job_name
+    from services.recent_index import RecentVectorIndex
+
+    conn = get_conn()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute("SELECT status FROM embedding_models WHERE model = %s;", (model,))
+            row = cur.fetchone()
+            if row is None or row[0] == "active":
+                raise ValueError(f"{model}: active 모델 또는 미등록 모델은 삭제할 수 없음")
+            cur.execute("SELECT now() - activated_at FROM embedding_models WHERE status = 'active';")
+            since_switch = cur.fetchone()
+            if (not force and since_switch and since_switch[0] is not None
+                    and since_switch[0].total_seconds() < 2 * ACTIVE_MODEL_TTL_SEC):
+                raise ValueError("active 전환 직후라 다른 프로세스가 아직 이 모델로 검색 중일 수 있음 (--force)")
+            dim = _model_dim(cur, model)
+            cur.execute(
+                "SELECT count(*) FROM embedding_models WHERE dim = %s AND model <> %s AND status <> 'retired';",
+                (dim, model),
+            )
+            dim_shared = cur.fetchone()[0] > 0
+    finally:
+        conn.close()
+
+    # 1) 인덱스: 모델 전용 인덱스 + (같은 dim을 쓰는 다른 모델이 없으면) dim 공용 인덱스
+    dropped: List[str] = []
+    existing = {ix["name"] for ix in vector_search.list_indexes()}
+    for mode in vector_search.SEARCH_MODES:
+        if dim > vector_search.MAX_INDEX_DIM[mode]:
+            continue
+        for method in vector_search.INDEX_METHODS:
+            for m in [model] + ([] if dim_shared else [None]):
+                if vector_search.index_name(dim, mode, method, m) in existing:
+                    dropped.append(vector_search.drop_index(dim, mode, method, m))
+
+    # 2) 벡터 / 3) 캐시 배치 삭제
+    vectors = _delete_batched(
+        """
+        DELETE FROM article_embeddings
+        WHERE model = %(model)s AND article_id IN (
+            SELECT article_id FROM article_embeddings
+            WHERE model = %(model)s ORDER BY article_id LIMIT %(limit)s
+        );
+        """,
+        model, batch_size,
+    )
+    cached = _delete_batched(
+        """
+        DELETE FROM embedding_cache
+        WHERE model = %(model)s AND content_hash IN (
+            SELECT content_hash FROM embedding_cache
+            WHERE model = %(model)s ORDER BY content_hash LIMIT %(limit)s
+        );
+        """,
+        model, batch_size,
+    )
+
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            "UPDATE embedding_models SET status = 'retired', retired_at = now() WHERE model = %s;",
+            (model,),
+        )
+        cur.execute("DELETE FROM job_checkpoints WHERE job = %s;", (job_name(model),))
+    conn.close()
+    shutil.rmtree(RecentVectorIndex(model, dim).path, ignore_errors=True)
+    return {"model": model, "indexes": dropped, "vectors": vectors, "cache_rows": cached}
+
+
+def _delete_batched(sql: str, model: str, batch_size: int) -> int:
+    total = 0
+    while True:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(sql, {"model": model, "limit": batch_size})
+            n = cur.rowcount
+        conn.close()
+        total += n
+        if n < batch_size:
+            return total
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.embedding_migration")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("status", help="모델별 상태 / 커버리지")
+
+    p_start = sub.add_parser("start", help="새 모델 등록 (migrating) + 전용 인덱스")
+    p_start.add_argument("model")
+    p_start.add_argument("--no-index", action="store_true")
+
+    p_run = sub.add_parser("run", help="새 모델로 재임베딩 (속도 제한)")
+    p_run.add_argument("model")
+    p_run.add_argument("--batch-size", type=int, default=None)
+    p_run.add_argument("--pause", type=float, default=None, help="배치 사이 대기(초)")
+    p_run.add_argument("--max-batches", type=int, default=None)
+
+    p_switch = sub.add_parser("switch", help="커버리지 충족 시 active 교체")
+    p_switch.add_argument("model")
+    p_switch.add_argument("--min-coverage", type=float, default=None)
+
+    p_drop = sub.add_parser("drop", help="이전 모델 벡터/인덱스 삭제")
+    p_drop.add_argument("model")
+    p_drop.add_argument("--batch-size", type=int, default=5000)
+    p_drop.add_argument("--force", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.command == "status":
+        result: Any = migration_status()
+    elif args.command == "start":
+        result = start_migration(args.model, build_index=not args.no_index)
+    elif args.command == "run":
+        result = run_migration(args.model, args.batch_size, args.pause, args.max_batches)
+    elif args.command == "switch":
+        result = switch_active(args.model, args.min_coverage)
+    else:
+        result = drop_model(args.model, args.batch_size, args.force)
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
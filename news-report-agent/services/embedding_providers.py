@@ -0,0 +1,244 @@
+# services/embedding_providers.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🔌 임베딩 provider (crew_settings.yaml embedding.model 로 선택)
+#   - "text-embedding-3-small" 등 접두사 없음 / "openai:<model>" → OpenAI API
+#     ("<model>@<dim>" 또는 embedding.dimensions → text-embedding-3의 dimensions 파라미터로 차원 축소)
+#   - "local:<hf 모델명>"  → 로컬 CPU 추론 (sentence-transformers, torch 또는 onnx backend)
+#   - "hash" / "hash:<dim>" → 결정적 해시 임베딩 (테스트/오프라인 벤치마크용, 네트워크 없음)
+#
+#   provider.name 이 article_embeddings.model / embedding_cache.model 에 그대로 저장되므로
+#   provider를 바꾸면 캐시도 자연스럽게 분리됨
+#   기본 provider는 embedding_models 레지스트리의 active 모델 (전환 절차: services.embedding_migration)
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config import embedding_settings
+
+DEFAULT_MODEL = "text-embedding-3-small"
+
+# OpenAI 모델별 기본 차원
+OPENAI_DIMS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+class EmbeddingProvider(ABC):
+    """
+    공통 인터페이스
+      - embed(texts) → 입력 순서대로 벡터 목록
+      - remote: True면 RPM/TPM 제한 + 동시 요청, False면 로컬 추론(속도 제한 없음)
+      - max_inputs / max_tokens: 요청 1회 한도 (pack_batches 에 사용)
+      - max_input_tokens: 입력 1개 한도 (청크 크기 상한)
+    """
+
+    name: str = ""
+    dim: int = 0
+    remote: bool = False
+    max_inputs: int = 2048
+    max_tokens: int = 300_000
+    max_input_tokens: int = 8191
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        ...
+
+    def embed_one(self, text: str) -> List[float]:
+        return self.embed([text])[0]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(name={self.name!r}, dim={self.dim})"
+
+
+# ────────────────────────────────
+# ☁️ OpenAI
+# ────────────────────────────────
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """
+    dimensions: text-embedding-3 계열의 차원 축소 (앞쪽 성분만 남기고 재정규화된 벡터를 API가 반환).
+    축소 시 name = "<model>@<dim>" → 캐시/저장 시 전체 차원 벡터와 섞이지 않음.
+    """
+
+    remote = True
+
+    def __init__(self,
+                 model: str = DEFAULT_MODEL,
+                 api_key_env: str = "OPENAI_API_KEY",
+                 dimensions: Optional[int] = None) -> None:
+        from openai import OpenAI
+
+        native = OPENAI_DIMS.get(model, 1536)
+        if dimensions == native:
+            dimensions = None
+        self.model = model
+        self.dimensions = dimensions
+        self.name = f"{model}@{dimensions}" if dimensions else model
+        self.dim = dimensions or native
+        # 재시도는 EmbeddingExecutor가 전담하므로 SDK 자체 재시도는 끔
+        self.client = OpenAI(api_key=os.getenv(api_key_env), max_retries=0)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        kwargs: Dict[str, Any] = {"dimensions": self.dimensions} if self.dimensions else {}
+        response = self.client.embeddings.create(model=self.model, input=texts, **kwargs)
+        data = sorted(response.data, key=lambda d: d.index)  # index 기준으로 입력 순서 맞춤
+        return [d.embedding for d in data]
+
+
+# ────────────────────────────────
+# 🖥️ 로컬 CPU (sentence-transformers)
+# ────────────────────────────────
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    - backend="onnx"면 ONNX Runtime으로 추론 (sentence-transformers>=3.2, optimum 필요)
+    - threads: torch intra-op 스레드 수 (None이면 라이브러리 기본값)
+    - batch_size: 모델 forward 1회에 넣는 문장 수
+    """
+
+    remote = False
+
+    def __init__(self,
+                 model_name: str,
+                 threads: Optional[int] = None,
+                 batch_size: int = 64,
+                 backend: str = "torch",
+                 device: str = "cpu") -> None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "local 임베딩에는 sentence-transformers가 필요합니다: "
+                "pip install 'sentence-transformers[onnx]'"
+            ) from e
+
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+
+        kwargs: Dict[str, Any] = {"device": device}
+        if backend != "torch":
+            kwargs["backend"] = backend
+        self._model = SentenceTransformer(model_name, **kwargs)
+        self._lock = threading.Lock()
+
+        self.name = f"local:{model_name}"
+        self.dim = int(self._model.get_sentence_embedding_dimension())
+        self.batch_size = batch_size
+        self.max_inputs = max(batch_size * 8, 256)
+        self.max_tokens = 10 ** 9  # 로컬은 요청 토큰 한도 없음
+        # 모델 tokenizer 기준 최대 길이 (초과분은 모델이 잘라냄)
+        self.max_input_tokens = int(self._model.max_seq_length or 512)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        # 추론 자체가 내부 스레드 풀을 쓰므로 호출은 직렬화
+        with self._lock:
+            arr = self._model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+        return np.asarray(arr, dtype=np.float32).tolist()
+
+
+# ────────────────────────────────
+# 🧪 결정적 해시 임베딩 (fake)
+#   - 단어별 blake2b → (차원 index, 부호) feature hashing 후 L2 정규화
+#   - 같은 텍스트 → 같은 벡터, 단어가 많이 겹치면 cosine도 높음 → 클러스터링/검색 테스트 가능
+# ────────────────────────────────
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class HashEmbeddingProvider(EmbeddingProvider):
+    remote = False
+    max_tokens = 10 ** 9
+
+    def __init__(self, dim: int = 1536) -> None:
+        self.name = f"hash:{dim}"
+        self.dim = dim
+
+    def _vector(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        words = _WORD_RE.findall(text.lower()) or [text]
+        idx = np.empty(len(words), dtype=np.int64)
+        sign = np.empty(len(words), dtype=np.float32)
+        for i, w in enumerate(words):
+            h = int.from_bytes(hashlib.blake2b(w.encode("utf-8"), digest_size=8).digest(), "little")
+            idx[i] = h % self.dim
+            sign[i] = 1.0 if (h >> 63) & 1 else -1.0
+        np.add.at(vec, idx, sign)
+        norm = float(np.linalg.norm(vec))
+        if norm == 0:
+            vec[idx[0]] = 1.0
+            norm = 1.0
+        return vec / norm
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(t).tolist() for t in texts]
+
+
+# ────────────────────────────────
+# 🎛️ 선택
+# ────────────────────────────────
+def get_provider(model: Optional[str] = None) -> EmbeddingProvider:
+    """
+    model이 None이면 embedding_models 레지스트리의 active 모델
+    (레지스트리가 비어 있으면 crew_settings.yaml embedding.model).
+    같은 이름이면 같은 인스턴스(로컬 모델 로딩 1회).
+    """
+    if model is None:
+        from services.embedding_migration import active_model  # 순환 import 방지
+        model = active_model()
+    return _provider_for(_spec(model))
+
+
+def configured_provider() -> EmbeddingProvider:
+    """레지스트리와 무관하게 crew_settings.yaml 기준 provider (모델 전환 시작 시점 기록용)"""
+    return _provider_for(_spec(None))
+
+
+def _spec(model: Optional[str]) -> str:
+    cfg = embedding_settings()
+    spec = (model or cfg.get("model") or DEFAULT_MODEL).strip()
+    if spec.startswith("openai:"):
+        spec = spec[len("openai:"):]
+    elif spec == "hash":
+        spec = "hash:1536"
+    if model is None and cfg.get("dimensions") and ":" not in spec and "@" not in spec:
+        spec = f"{spec}@{int(cfg['dimensions'])}"
+    return spec
+
+
+@lru_cache(maxsize=8)
+def _provider_for(spec: str) -> EmbeddingProvider:
+    cfg = embedding_settings()
+
+    if spec.startswith("hash:"):
+        return HashEmbeddingProvider(int(spec[len("hash:"):]))
+
+    if spec.startswith("local:"):
+        local = dict(cfg.get("local") or {})
+        return LocalEmbeddingProvider(
+            spec[len("local:"):],
+            threads=local.get("threads"),
+            batch_size=int(local.get("batch_size", 64)),
+            backend=local.get("backend", "torch"),
+        )
+
+    name, _, dims = spec.partition("@")
+    return OpenAIEmbeddingProvider(
+        name,
+        api_key_env=cfg.get("api_key_env", "OPENAI_API_KEY"),
+        dimensions=int(dims) if dims else None,
+    )
@@ -3,114 +3,584 @@
 # 🔢 Embedding 관리 (pgvector)
 # ────────────────────────────────
 
-from openai import OpenAI
-import os
-from services import db_service
+from collections import OrderedDict
+from functools import lru_cache
+from psycopg2.extras import execute_values
+import hashlib
+import threading
+import time
+import numpy as np
+import tiktoken
+from config import embedding_settings
+from services import db_services as db_service
+from services.embedding_executor import EmbeddingExecutor
+from services.embedding_providers import get_provider
+from services import vector_search
+from services.recent_index import get_recent_index, on_embeddings_stored
+from services.event_clustering import on_articles_embedded
 from models import ArticleEmbedding
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
 
-
-def embed_text(article_id: int, text: str, model: str = "text-embedding-3-small"):
+def embed_text(article_id: int, text: str, model: str | None = None):
     """
     주어진 텍스트를 임베딩하고 DB에 저장.
+    model이 None이면 crew_settings.yaml embedding.model 의 provider 사용.
     """
     try:
-        response = client.embeddings.create(model=model, input=text)
-        vector = response.data[0].embedding
+        provider = get_provider(model)
+        vector = provider.embed_one(text)
 
         embedding = ArticleEmbedding(
             article_id=article_id,
-            model=model,
+            model=provider.name,
             dim=len(vector),
             embedding=vector,
         )
         db_service.upsert_embedding(embedding)
+        on_embeddings_stored(provider.name, len(vector), [article_id])
 
-        return {"article_id": article_id, "dim": len(vector), "model": model}
+        return {"article_id": article_id, "dim": len(vector), "model": provider.name}
     except Exception as e:
         print(f"[embed_text] Error: {e}")
         return {"error": str(e)}
 
 
-def search_similar_text(query_text: str, top_k: int = 5, model: str = "text-embedding-3-small"):
+# ────────────────────────────────
+# 🧠 질의 임베딩 캐시 (LRU + TTL)
+#   - 같은 주제 질의("global energy crisis" 등)가 반복되므로 API 호출 없이 재사용
+#   - 키: (provider.name, 공백 정규화한 질의) → provider/차원이 바뀌면 자연스럽게 분리
+# ────────────────────────────────
+class QueryEmbeddingCache:
+    def __init__(self, max_size: int = 1024, ttl_sec: float = 3600) -> None:
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or (self.ttl_sec and time.monotonic() - item[1] > self.ttl_sec):
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, vector) -> None:
+        with self._lock:
+            self._data[key] = (vector, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"size": len(self._data), "max_size": self.max_size, "ttl_sec": self.ttl_sec,
+                    "hits": self.hits, "misses": self.misses,
+                    "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+
+@lru_cache(maxsize=1)
+def query_cache() -> QueryEmbeddingCache:
+    cfg = dict(embedding_settings().get("query_cache") or {})
+    return QueryEmbeddingCache(int(cfg.get("max_size", 1024)), float(cfg.get("ttl_sec", 3600)))
+
+
+def _query_key(text: str) -> str:
+    return " ".join(text.split())
+
+
+def embed_queries(queries: list[str], model: str | None = None) -> list[list[float]]:
+    """
+    질의 목록 → 벡터 목록 (입력 순서 유지).
+    캐시에 없는 질의만 중복 제거 후 provider 요청 1회로 임베딩.
+    """
+    provider = get_provider(model)
+    cache = query_cache()
+    keys = [(provider.name, _query_key(q)) for q in queries]
+
+    vectors: dict = {}
+    missing: list = []
+    for key in keys:
+        if key in vectors or key in missing:
+            continue
+        hit = cache.get(key)
+        if hit is None:
+            missing.append(key)
+        else:
+            vectors[key] = hit
+
+    if missing:
+        for key, vec in zip(missing, provider.embed([k[1] for k in missing])):
+            cache.put(key, vec)
+            vectors[key] = vec
+    return [vectors[k] for k in keys]
+
+
+def search_similar_text(query_text: str, top_k: int = 5, model: str | None = None, mode: str | None = None,
+                        **filters):
     """
     입력 텍스트와 유사한 기사 검색 (pgvector cosine similarity).
+    mode: full | half | binary (None이면 crew_settings.yaml embedding.search.mode)
+          half/binary는 양자화 인덱스로 후보를 뽑고 full precision으로 재정렬.
+    filters: since / until / outlet_ids / language / ef_search / probes
+             (services.vector_search.search 참고)
     """
     try:
-        response = client.embeddings.create(model=model, input=query_text)
-        vector = response.data[0].embedding
-
-        sql = """
-        SELECT a.id, a.title, a.url,
-               1 - (aemb.embedding <=> %s::vector) AS similarity
-        FROM article_embeddings aemb
-        JOIN articles a ON a.id = aemb.article_id
-        ORDER BY aemb.embedding <=> %s::vector
-        LIMIT %s;
-        """
+        provider = get_provider(model)
+        vector = embed_queries([query_text], provider.name)[0]
+        return vector_search.search(vector, provider.name, top_k=top_k, mode=mode, **filters)
+    except Exception as e:
+        print(f"[search_similar_text] Error: {e}")
+        return {"error": str(e)}
+
+
+def search_similar_texts(queries: list[str], top_k: int = 5, model: str | None = None, mode: str | None = None,
+                         use_recent_index: bool = False, **filters):
+    """
+    여러 질의를 한 번에 검색 → 질의 순서대로 결과 목록.
+      - 임베딩: 캐시 miss만 요청 1회
+      - 검색: SQL 1회 (unnest + LATERAL), use_recent_index=True면 최근 윈도우 memmap에서
+              행렬곱 1회 후 title/url 조회 1회 (since 외 필터는 무시)
+    """
+    try:
+        if not queries:
+            return []
+        provider = get_provider(model)
+        vectors = embed_queries(queries, provider.name)
 
-        with db_service.get_conn() as conn, conn.cursor() as cur:
-            cur.execute(sql, (vector, vector, top_k))
-            rows = cur.fetchall()
+        if not use_recent_index:
+            return vector_search.search_many(vectors, provider.name, top_k=top_k, mode=mode, **filters)
 
-        return [{"id": r[0], "title": r[1], "url": r[2], "similarity": float(r[3])} for r in rows]
+        since = filters.get("since")
+        results = get_recent_index(provider.name, provider.dim).search_many(
+            np.asarray(vectors, dtype=np.float32), top_k,
+            since=since.timestamp() if since is not None else None,
+        )
+        ids = sorted({r["id"] for rows in results for r in rows})
+        meta = {}
+        if ids:
+            with db_service.get_conn() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT id, title, url FROM articles WHERE id = ANY(%s);", (ids,))
+                    meta = {r[0]: r for r in cur.fetchall()}
+        return [
+            [{"id": r["id"], "title": meta[r["id"]][1], "url": meta[r["id"]][2], "similarity": r["similarity"]}
+             for r in rows if r["id"] in meta]
+            for rows in results
+        ]
     except Exception as e:
-        print(f"[search_similar_text] Error: {e}")
+        print(f"[search_similar_texts] Error: {e}")
         return {"error": str(e)}
 
 
-def generate_embeddings_batch(article_ids: list[int]) -> dict:
+# ────────────────────────────────
+# 📦 배치 임베딩 (요청 1회에 여러 input)
+# ────────────────────────────────
+# OpenAI embeddings 한 요청당 한도 (provider별 한도는 EmbeddingProvider.max_* 참고)
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300_000
+MAX_TOKENS_PER_INPUT = 8191
+
+
+@lru_cache(maxsize=8)
+def _encoding_for(model: str):
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")  # 로컬/해시 provider 등
+    except Exception:
+        return None  # BPE 파일을 못 받는 오프라인 환경
+
+
+def count_tokens(text: str, model: str = "text-embedding-3-small") -> int:
+    enc = _encoding_for(model)
+    if enc is None:
+        # 보수적 추정 (영문 평균 ~4 bytes/token → 3으로 나눠 과대 추정)
+        return len(text.encode("utf-8")) // 3 + 1
+    return len(enc.encode(text, disallowed_special=()))
+
+
+# ────────────────────────────────
+# ✂️ 토큰 기준 청크 분할 + 풀링
+#   - 모델 입력 한도를 넘는 본문(Playwright 전체 페이지 텍스트 등)을 잘라서 보냄
+#   - 기사당 토큰 예산(max_article_tokens)을 넘는 꼬리는 버림 → 기사당 토큰 비용 상한
+#   - 청크 벡터는 토큰 수 가중 평균 후 L2 정규화 → 기사 벡터 1개
+# ────────────────────────────────
+def chunk_for_embedding(text: str,
+                        model: str = "text-embedding-3-small",
+                        chunk_tokens: int = 2000,
+                        max_article_tokens: int = 6000) -> list[tuple[str, int]]:
+    """
+    반환: [(chunk_text, n_tokens), ...] (최소 1개)
+    """
+    chunk_tokens = max(1, min(chunk_tokens, MAX_TOKENS_PER_INPUT))
+    enc = _encoding_for(model)
+    if enc is None:
+        # 토크나이저가 없으면 글자 1개 = 토큰 1개로 보수적으로 보고 글자 단위 분할
+        text = text[:max_article_tokens]
+        pieces = [text[i:i + chunk_tokens] for i in range(0, len(text), chunk_tokens)] or [text]
+        return [(p, count_tokens(p, model)) for p in pieces]
+
+    tokens = enc.encode(text, disallowed_special=())[:max_article_tokens]
+    if not tokens:
+        return [(text, 1)]
+    return [
+        (enc.decode(tokens[i:i + chunk_tokens]), len(tokens[i:i + chunk_tokens]))
+        for i in range(0, len(tokens), chunk_tokens)
+    ]
+
+
+def pool_vectors(vectors: list[list[float]], weights: list[int]) -> list[float]:
+    """토큰 수 가중 평균 + L2 정규화 (청크 1개면 그대로)"""
+    if len(vectors) == 1:
+        return list(vectors[0])
+    mat = np.asarray(vectors, dtype=np.float32)
+    w = np.asarray(weights, dtype=np.float32)
+    pooled = (mat * w[:, None]).sum(axis=0) / w.sum()
+    norm = float(np.linalg.norm(pooled))
+    if norm > 0:
+        pooled /= norm
+    return pooled.tolist()
+
+
+def pack_batches(items: list[tuple[str, str, int]],
+                 max_inputs: int = MAX_INPUTS_PER_REQUEST,
+                 max_tokens: int = MAX_TOKENS_PER_REQUEST) -> list[list[tuple[str, str, int]]]:
+    """
+    (key, text, n_tokens) 목록을 요청 단위로 묶음 (입력 개수/토큰 합 한도 내에서 greedy).
+    """
+    batches: list[list[tuple[str, str, int]]] = []
+    cur: list[tuple[str, str, int]] = []
+    cur_tokens = 0
+    for item in items:
+        n = item[2]
+        if cur and (len(cur) >= max_inputs or cur_tokens + n > max_tokens):
+            batches.append(cur)
+            cur, cur_tokens = [], 0
+        cur.append(item)
+        cur_tokens += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def embed_texts(texts: list[str], model: str | None = None) -> list[list[float]]:
+    """
+    여러 텍스트를 요청 1회로 임베딩 (입력 순서 유지).
+    """
+    return get_provider(model).embed(texts)
+
+
+def make_executor(model: str | None = None) -> EmbeddingExecutor:
+    """
+    crew_settings.yaml의 embedding.{rpm,tpm,max_concurrency,max_retries}로 실행기 생성.
+    로컬 provider는 속도 제한/재시도 없이 순차 실행 (모델이 내부 스레드로 병렬 추론).
+    """
+    cfg = embedding_settings()
+    provider = get_provider(model)
+    if not provider.remote:
+        return EmbeddingExecutor(provider.embed, rpm=10 ** 9, tpm=10 ** 12,
+                                 max_concurrency=1, max_retries=0)
+    return EmbeddingExecutor(
+        provider.embed,
+        rpm=int(cfg.get("rpm", 3000)),
+        tpm=int(cfg.get("tpm", 1_000_000)),
+        max_concurrency=int(cfg.get("max_concurrency", 4)),
+        max_retries=int(cfg.get("max_retries", 6)),
+    )
+
+
+# ────────────────────────────────
+# 🗃️ 임베딩 캐시 (model, sha256(임베딩 입력 텍스트))
+#   - 제목/날짜만 바뀐 업데이트, 동일 본문의 통신사 전재 기사는 API 호출 없이 재사용
+# ────────────────────────────────
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def _copy_from_cache(cur, model: str, pairs: list[tuple[int, str]]) -> set[int]:
+    """
+    캐시에 있는 (article_id, content_hash)는 DB 안에서 바로 article_embeddings로 복사.
+    반환: 복사된 article_id 집합
+    """
+    if not pairs:
+        return set()
+    cur.execute(
+        """
+        INSERT INTO article_embeddings (article_id, model, dim, embedding)
+        SELECT v.article_id, c.model, c.dim, c.embedding
+        FROM unnest(%s::bigint[], %s::text[]) AS v(article_id, content_hash)
+        JOIN embedding_cache c
+          ON c.model = %s AND c.content_hash = v.content_hash
+        ON CONFLICT (article_id, model)
+        DO UPDATE SET dim = EXCLUDED.dim,
+                      embedding = EXCLUDED.embedding
+        RETURNING article_id;
+        """,
+        ([p[0] for p in pairs], [p[1] for p in pairs], model),
+    )
+    return {r[0] for r in cur.fetchall()}
+
+
+def _store_in_cache(cur, model: str, vectors: dict[str, list[float]]) -> None:
+    if not vectors:
+        return
+    execute_values(
+        cur,
+        """
+        INSERT INTO embedding_cache (model, content_hash, dim, embedding)
+        VALUES %s
+        ON CONFLICT (model, content_hash) DO NOTHING;
+        """,
+        [(model, h, len(v), v) for h, v in vectors.items()],
+        page_size=200,
+    )
+
+
+def _copy_from_canonical(cur, model: str, article_ids: list[int]) -> set[int]:
+    """
+    near-duplicate(articles.duplicate_of) 기사는 canonical 기사의 벡터를 DB 안에서 바로 복사.
+    반환: 복사된 article_id 집합 (canonical이 아직 이 모델로 임베딩되지 않았으면 빠짐)
+    """
+    if not article_ids:
+        return set()
+    cur.execute(
+        """
+        INSERT INTO article_embeddings (article_id, model, dim, embedding)
+        SELECT a.id, e.model, e.dim, e.embedding
+        FROM articles a
+        JOIN article_embeddings e
+          ON e.article_id = a.duplicate_of AND e.model = %s
+        WHERE a.id = ANY(%s)
+        ON CONFLICT (article_id, model)
+        DO UPDATE SET dim = EXCLUDED.dim,
+                      embedding = EXCLUDED.embedding
+        RETURNING article_id;
+        """,
+        (model, list(article_ids)),
+    )
+    return {r[0] for r in cur.fetchall()}
+
+
+def _duplicate_map(cur, article_ids: list[int]) -> dict[int, int]:
+    """{article_id: canonical_id} — duplicate_of가 있는 기사만"""
+    if not article_ids:
+        return {}
+    cur.execute(
+        "SELECT id, duplicate_of FROM articles WHERE id = ANY(%s) AND duplicate_of IS NOT NULL;",
+        (list(article_ids),),
+    )
+    return dict(cur.fetchall())
+
+
+def iter_articles_for_embedding(article_ids: list[int], itersize: int = 2000):
+    """
+    (id, title, body)를 한 쿼리로 조회. named cursor → 대량 ID도 itersize씩 스트리밍.
+    hot 본문이 없는 기사는 retention 아카이브에서 읽어 마지막에 (프레임 단위로 한 번씩 해제).
+    """
+    from services.body_archive import load_bodies
+    from services.db_services import get_conn
+
+    ids = list(dict.fromkeys(article_ids))
+    if not ids:
+        return
+    cold: list[tuple[int, str]] = []
+    conn = get_conn()
+    try:
+        with conn, conn.cursor(name="embedding_articles") as cur:
+            cur.itersize = itersize
+            cur.execute(
+                """
+                SELECT a.id, a.title, b.body, (b.article_id IS NULL AND z.article_id IS NOT NULL)
+                FROM articles a
+                LEFT JOIN article_bodies b ON b.article_id = a.id
+                LEFT JOIN article_body_archive z ON z.article_id = a.id
+                WHERE a.id = ANY(%s)
+                """,
+                (ids,),
+            )
+            for article_id, title, body, archived in cur:
+                if archived:
+                    cold.append((article_id, title))
+                else:
+                    yield article_id, title, body
+    finally:
+        conn.close()
+    if cold:
+        try:
+            bodies = load_bodies([article_id for article_id, _ in cold])
+        except OSError as e:  # 아카이브 파일 유실 등 → 해당 기사만 본문 없음으로 처리
+            print(f"⚠️ 아카이브 본문 읽기 실패 ({len(cold)}건): {e}")
+            bodies = {}
+        for article_id, title in cold:
+            yield article_id, title, bodies.get(article_id)
+
+
+def generate_embeddings_batch(article_ids: list[int], model: str | None = None) -> dict:
     """
     여러 기사 ID에 대해 배치 임베딩 생성 및 저장
+    - 기사 텍스트를 모아 요청당 입력 개수/토큰 한도까지 묶어서 호출
+    - 묶음들을 RPM/TPM 한도 안에서 동시에 호출, 429/5xx는 backoff 후 재시도
+    - input 탓인 오류(400 invalid input / 토큰 초과)만 묶음을 반씩 쪼개 원인 input 격리
+      (embedding_executor.is_input_error), 인증/쿼터/재시도 소진은 묶음 전체를 오류로 기록
+    - 긴 본문은 토큰 기준 청크로 나눠 같은 배치에 담고, 가중 평균으로 기사 벡터 1개로 풀링
+    - (model, 텍스트 해시) 캐시 hit는 API 호출 없이 복사, 같은 텍스트는 한 번만 임베딩
+    - near-duplicate(통신사 전재) 기사는 canonical 기사 벡터를 복사 (canonical이 같은 배치면 임베딩 후 복사)
     
     Args:
         article_ids: 임베딩을 생성할 기사 ID 목록
+        model: provider 이름 (None이면 crew_settings.yaml embedding.model)
         
     Returns:
-        dict: {"processed": int, "errors": list[str], "processed_ids": list[int]}
+        dict: {"processed": int, "errors": list[str], "processed_ids": list[int],
+               "requests": int, "cache_hits": int, "cache_hit_rate": float, ...}
     """
     from services.db_services import get_conn
     
-    processed = 0
+    provider = get_provider(model)
+    model = provider.name
     errors = []
-    processed_ids = []
+    items: list[tuple[int, str]] = []
+    found: set[int] = set()
     
-    with get_conn() as conn, conn.cursor() as cur:
-        for article_id in article_ids:
-            try:
-                # DB에서 기사 조회
-                cur.execute(
-                    "SELECT id, title, body FROM articles WHERE id = %s",
-                    (article_id,)
-                )
-                row = cur.fetchone()
-                
-                if not row:
-                    errors.append(f"기사 ID {article_id}를 찾을 수 없습니다")
-                    continue
+    # 0) 기사 일괄 조회 (WHERE id = ANY, server-side cursor로 스트리밍)
+    for article_id, title, body in iter_articles_for_embedding(article_ids):
+        found.add(article_id)
+        try:
+            if not body or len(body.strip()) < 50:
+                errors.append(f"기사 ID {article_id}: 본문이 너무 짧습니다")
+                continue
+            
+            # 제목 + 본문으로 임베딩 생성 (길면 아래에서 청크 분할)
+            items.append((article_id, f"{title}\n\n{body}"))
                 
-                _, title, body = row
-                if not body or len(body.strip()) < 50:
-                    errors.append(f"기사 ID {article_id}: 본문이 너무 짧습니다")
-                    continue
-                
-                # 제목 + 본문으로 임베딩 생성
-                text_for_embedding = f"{title}\n\n{body}"
-                result = embed_text(article_id, text_for_embedding)
-                
-                if "error" not in result:
-                    processed += 1
-                    processed_ids.append(article_id)
-                else:
-                    errors.append(f"기사 ID {article_id}: {result['error']}")
-                    
-            except Exception as e:
-                errors.append(f"기사 ID {article_id}: {str(e)}")
+        except Exception as e:
+            errors.append(f"기사 ID {article_id}: {str(e)}")
+    
+    for article_id in dict.fromkeys(article_ids):
+        if article_id not in found:
+            errors.append(f"기사 ID {article_id}를 찾을 수 없습니다")
+
+    # 1) 캐시 hit / canonical 벡터 → DB 안에서 복사 (API 호출 없음)
+    hashes = {article_id: content_hash(text) for article_id, text in items}
+    item_ids = {article_id for article_id, _ in items}
+    conn = get_conn()
+    try:
+        with conn, conn.cursor() as cur:
+            cached_ids = _copy_from_cache(cur, model, list(hashes.items()))
+            dup_of = _duplicate_map(cur, [a for a, _ in items if a not in cached_ids])
+            # canonical이 같은 배치에서 임베딩될 기사는 4) 이후로 미룸
+            deferred = {a for a, c in dup_of.items() if c in item_ids and c not in dup_of}
+            canonical_ids = _copy_from_canonical(cur, model, [a for a in dup_of if a not in deferred])
+    finally:
+        conn.close()
+    processed_ids = [article_id for article_id, _ in items if article_id in cached_ids | canonical_ids]
+
+    # 2) miss → 같은 텍스트는 한 번만 임베딩
+    misses = [it for it in items if it[0] not in cached_ids | canonical_ids | deferred]
+    ids_by_hash: dict[str, list[int]] = {}
+    chunk_items: list[tuple[str, str, int]] = []
+    chunk_weights: dict[str, list[int]] = {}
+    cfg = embedding_settings()
+    chunk_tokens = min(int(cfg.get("chunk_tokens", 2000)), provider.max_input_tokens)
+    max_article_tokens = int(cfg.get("max_article_tokens", 6000))
+    for article_id, text in misses:
+        h = hashes[article_id]
+        if h not in ids_by_hash:
+            ids_by_hash[h] = []
+            # 2-1) 토큰 기준 청크 분할 (같은 배치 안에 청크들을 함께 담음)
+            chunks = chunk_for_embedding(text, model, chunk_tokens, max_article_tokens)
+            chunk_weights[h] = [n for _, n in chunks]
+            chunk_items.extend((f"{h}:{i}", chunk, n) for i, (chunk, n) in enumerate(chunks))
+        ids_by_hash[h].append(article_id)
+
+    # 3) 요청 묶음을 RPM/TPM 한도 안에서 동시 실행 (429/5xx는 실행기가 backoff 후 재시도)
+    executor = make_executor(model)
+    chunk_vectors, failed = executor.run(pack_batches(chunk_items, provider.max_inputs, provider.max_tokens))
+
+    # 3-1) 청크 벡터 → 기사 벡터 (청크 하나라도 실패하면 그 기사는 실패 처리)
+    failed_by_hash: dict[str, str] = {}
+    for key, error in failed.items():
+        failed_by_hash.setdefault(key.rsplit(":", 1)[0], error)
+    vectors: dict[str, list[float]] = {}
+    for h, weights in chunk_weights.items():
+        if h in failed_by_hash:
+            continue
+        vectors[h] = pool_vectors([chunk_vectors[f"{h}:{i}"] for i in range(len(weights))], weights)
+    for h, error in failed_by_hash.items():
+        for article_id in ids_by_hash[h]:
+            errors.append(f"기사 ID {article_id}: {error}")
+
+    # 4) 캐시 + article_embeddings를 한 트랜잭션에서 multi-row upsert
+    embeds = [
+        ArticleEmbedding(article_id=article_id, model=model, dim=len(vector), embedding=vector)
+        for h, vector in vectors.items()
+        for article_id in ids_by_hash[h]
+    ]
+    if embeds:
+        conn = None
+        try:
+            conn = get_conn()
+            with conn:
+                with conn.cursor() as cur:
+                    _store_in_cache(cur, model, vectors)
+                db_service.upsert_embeddings(embeds, conn=conn)
+            processed_ids.extend(e.article_id for e in embeds)
+        except Exception as e:
+            errors.extend(f"기사 ID {e_.article_id}: {e}" for e_ in embeds)
+        finally:
+            if conn is not None:
+                conn.close()
+    if deferred:
+        conn = get_conn()
+        try:
+            with conn, conn.cursor() as cur:
+                copied = _copy_from_canonical(cur, model, sorted(deferred))
+        finally:
+            conn.close()
+        processed_ids.extend(a for a in sorted(deferred) if a in copied)
+        errors.extend(f"기사 ID {a}: canonical 기사 {dup_of[a]} 임베딩 실패" for a in sorted(deferred - copied))
+        canonical_ids |= copied
+    stats = executor.stats()
+
+    # 5) 최근 window mmap 인덱스에 반영 (recent_index.enabled 일 때만)
+    on_embeddings_stored(model, provider.dim, processed_ids)
+    # 6) open 사건에 온라인 배정 (clustering.online.enabled 일 때만)
+    on_articles_embedded(model, processed_ids)
+
+    cache_hits = len(cached_ids)
+    cache_lookups = len(items)
     
     return {
-        "processed": processed,
+        "processed": len(processed_ids),
         "errors": errors,
-        "processed_ids": processed_ids
-    }
\ No newline at end of file
+        "processed_ids": processed_ids,
+        "requests": stats["requests"],
+        "splits": stats["splits"],
+        "retries": stats["retries"],
+        "rate_limited": stats["rate_limited"],
+        "throughput": {
+            "inputs_per_sec": stats["inputs_per_sec"],
+            "tokens_per_min": stats["tokens_per_min"],
+            "requests_per_min": stats["requests_per_min"],
+        },
+        "chunked": sum(1 for w in chunk_weights.values() if len(w) > 1),
+        "tokens_sent": sum(n for _, _, n in chunk_items),
+        "cache_hits": cache_hits,
+        "cache_misses": cache_lookups - cache_hits,
+        "cache_hit_rate": round(cache_hits / cache_lookups, 4) if cache_lookups else 0.0,
+        "near_duplicates": len(canonical_ids),  # canonical 벡터 복사로 처리한 기사 수
+    }
@@ -0,0 +1,747 @@
+# services/event_clustering.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧩 사건(event) 클러스터링 — 결정적 · 벡터화 (LLM 프롬프트 대신 코드로)
+#   1) 윈도우 내 임베딩을 한 번에 numpy 행렬로 로드 (vector_send 바이너리 → frombuffer)
+#   2) 게시 시각 순으로 정렬 후 block × block 타일 행렬곱으로 cosine ≥ threshold 쌍만 추출
+#      (max_gap_hours 보다 멀리 떨어진 타일은 아예 계산하지 않음)
+#      prefilter_dim: 랜덤 직교 투영(예: 256차원)으로 후보를 먼저 뽑고 원래 벡터로 재검증
+#      → n² 행렬곱 비용이 dim/prefilter_dim 배 감소
+#      blocking=lsh: 수십만 건 윈도우는 LSH bucket 후보만 재검증 (services.lsh, 비용 ~ 선형)
+#   3) 밀도 기반 묶기 (DBSCAN 방식, eps = 1 - threshold)
+#        core  : 이웃 수 + 1 ≥ min_samples  → core-core 간선으로 union-find (numpy 벡터화)
+#        border: core 이웃 중 가장 가까운 core의 클러스터에 합류
+#        noise : 사건으로 만들지 않음   (min_samples=2 면 임계값 연결요소와 동일)
+#   4) 클러스터 평균 벡터에 가장 가까운 기사 = centroid_article_id,
+#      기사별 similarity = 평균 벡터와의 cosine → insert_event / link_event_articles 로 한 트랜잭션 저장
+#   5) 사건별 평균 벡터/멤버 수는 event_centroids 에 저장 → 온라인 배정(assign_online)이 이어서 사용
+#   6) near-duplicate(통신사 전재, articles.duplicate_of) 기사는 묶지 않고 canonical 기사의 사건에 바로 연결
+#      → 비교 대상 수는 줄고 언론사 수(coverage)는 그대로 집계 (services.near_dup)
+#   7) 저장 후 바뀐 사건의 topic_tags(TF-IDF) / event_cred·conflicts(집계) 갱신
+#      (services.event_tagging, services.event_scoring — 각각 tagging.enabled / scoring.enabled)
+#   같은 입력 → 같은 결과 (정렬/라벨 순서가 모두 결정적)
+#
+# 사용:
+#   python -m services.event_clustering run --hours 72 --threshold 0.85
+#   python -m services.event_clustering run --hours 72 --dry-run
+#   python -m services.event_clustering assign            # 온라인 배정 (open 사건 centroid 기준)
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pgvector.psycopg2 import register_vector
+from psycopg2.extras import execute_values
+
+from config import clustering_settings
+from models import Event
+from services import db_services
+from services.db_services import get_conn
+from services.embedding_providers import get_provider
+from services import event_scoring, event_tagging
+from services.lsh import HyperplaneLSH, lsh_settings, verify_pairs
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    return m / np.maximum(np.linalg.norm(m, axis=-1, keepdims=True), 1e-12)
+
+
+# ────────────────────────────────
+# 📥 로드
+# ────────────────────────────────
+def _vectors_from_send(raw: List[bytes], dim: int) -> np.ndarray:
+    """vector_send() 결과 = int16 dim + int16 unused + float32 big-endian × dim"""
+    if not raw:
+        return np.zeros((0, dim), np.float32)
+    return np.frombuffer(b"".join(r[4:] for r in raw), dtype=">f4").astype(np.float32).reshape(len(raw), dim)
+
+
+def load_window(model: str,
+                dim: int,
+                since: datetime,
+                until: Optional[datetime] = None,
+                unassigned_only: bool = True,
+                article_ids: Optional[List[int]] = None,
+                canonical_only: bool = True,
+                itersize: int = 5000) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """
+    반환: (ids int64, ts float64 epoch, 정규화된 (n × dim) float32 행렬, titles) — 게시 시각 순.
+    unassigned_only: 이미 event_articles에 연결된 기사는 제외 (재실행 시 중복 사건 방지)
+    article_ids: 주어지면 그 기사들만 (온라인 배정 hook)
+    canonical_only: near-duplicate 기사 제외 (canonical 사건에 attach_duplicates 로 연결)
+    """
+    where = [
+        "e.model = %(model)s", "e.dim = %(dim)s",
+        "COALESCE(a.published_at, a.fetched_at) >= %(since)s",
+    ]
+    params: Dict[str, Any] = {"model": model, "dim": dim, "since": since}
+    if until is not None:
+        where.append("COALESCE(a.published_at, a.fetched_at) < %(until)s")
+        params["until"] = until
+    if unassigned_only:
+        where.append("NOT EXISTS (SELECT 1 FROM event_articles ea WHERE ea.article_id = e.article_id)")
+    if canonical_only:
+        where.append("a.duplicate_of IS NULL")
+    if article_ids is not None:
+        where.append("e.article_id = ANY(%(ids)s)")
+        params["ids"] = list(article_ids)
+
+    ids: List[int] = []
+    ts: List[float] = []
+    titles: List[str] = []
+    buf: List[bytes] = []
+    with get_conn() as conn:
+        with conn.cursor(name="event_clustering_window") as cur:
+            cur.itersize = itersize
+            cur.execute(
+                f"""
+                SELECT e.article_id,
+                       extract(epoch FROM COALESCE(a.published_at, a.fetched_at))::float8,
+                       a.title,
+                       vector_send(e.embedding)
+                FROM article_embeddings e
+                JOIN articles a ON a.id = e.article_id
+                WHERE {" AND ".join(where)}
+                ORDER BY 2, 1
+                """,
+                params,
+            )
+            for article_id, epoch, title, raw in cur:
+                ids.append(article_id)
+                ts.append(epoch)
+                titles.append(title)
+                buf.append(bytes(raw))
+    conn.close()
+
+    mat = _vectors_from_send(buf, dim)
+    return np.asarray(ids, np.int64), np.asarray(ts, np.float64), _normalize(mat), titles
+
+
+# ────────────────────────────────
+# 🧮 유사 쌍 / 연결요소
+# ────────────────────────────────
+def project(mat: np.ndarray, k: int, seed: int = 0) -> np.ndarray:
+    """
+    랜덤 직교 투영 (dim → k) 후 재정규화. cosine 오차 표준편차 ≈ 1/sqrt(k).
+    seed 고정 → 결정적
+    """
+    rng = np.random.default_rng(seed)
+    q, _ = np.linalg.qr(rng.standard_normal((mat.shape[1], k)).astype(np.float32))
+    return _normalize(mat @ q)
+
+
+def similar_pairs(mat: np.ndarray,
+                  threshold: float,
+                  ts: Optional[np.ndarray] = None,
+                  max_gap_sec: Optional[float] = None,
+                  block: int = 2048,
+                  prefilter_dim: int = 0,
+                  prefilter_margin: float = 0.1,
+                  blocking: str = "exact",
+                  lsh: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    cosine ≥ threshold 인 (i < j) 쌍. mat은 정규화 + (ts가 있으면) ts 오름차순이어야 함.
+    prefilter_dim > 0 이고 dim보다 작으면: 투영 공간에서 threshold - margin 으로 후보만 뽑고
+    원래 벡터로 정확히 재검증 (n² 항의 차원을 dim → prefilter_dim 으로 줄임)
+    blocking="lsh": 타일 행렬곱 대신 random hyperplane LSH bucket 으로 후보 생성 (services.lsh)
+                    → 비용 ~ n × n_tables, recall < 1 (lsh = {"n_bits", "n_tables", "max_bucket", "seed"})
+    반환: (i int64, j int64, sim float32)
+    """
+    if blocking == "lsh":
+        cfg = lsh or lsh_settings(threshold, len(mat))
+        # signature는 투영 공간에서 계산해도 각도가 거의 보존됨 → 초평면 곱 비용 감소
+        space = project(mat, prefilter_dim) if 0 < prefilter_dim < mat.shape[1] else mat
+        hasher = HyperplaneLSH(space.shape[1], int(cfg["n_bits"]), int(cfg["n_tables"]), int(cfg.get("seed", 0)))
+        i, j = hasher.candidate_pairs(space, int(cfg.get("max_bucket", 256)))
+        if ts is not None and max_gap_sec is not None:
+            keep = np.abs(ts[j] - ts[i]) <= max_gap_sec
+            i, j = i[keep], j[keep]
+        return verify_pairs(mat, i, j, threshold)
+    if 0 < prefilter_dim < mat.shape[1]:
+        i, j, _ = _tile_pairs(project(mat, prefilter_dim), threshold - prefilter_margin,
+                              ts, max_gap_sec, block)
+        return verify_pairs(mat, i, j, threshold)
+    return _tile_pairs(mat, threshold, ts, max_gap_sec, block)
+
+
+def resolve_blocking(n: int, cfg: Optional[Dict[str, Any]] = None) -> str:
+    """clustering.blocking: exact | lsh | auto (auto = 기사 수가 lsh.auto_min_rows 이상이면 lsh)"""
+    cfg = cfg if cfg is not None else clustering_settings()
+    mode = str(cfg.get("blocking") or "exact")
+    if mode == "auto":
+        return "lsh" if n >= int((cfg.get("lsh") or {}).get("auto_min_rows", 10_000)) else "exact"
+    return mode
+
+
+def _tile_pairs(mat: np.ndarray,
+                threshold: float,
+                ts: Optional[np.ndarray],
+                max_gap_sec: Optional[float],
+                block: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    n = len(mat)
+    out_i: List[np.ndarray] = []
+    out_j: List[np.ndarray] = []
+    out_s: List[np.ndarray] = []
+    banded = ts is not None and max_gap_sec is not None
+    for i0 in range(0, n, block):
+        i1 = min(i0 + block, n)
+        a = mat[i0:i1]
+        for j0 in range(i0, n, block):
+            if banded and ts[j0] - ts[i1 - 1] > max_gap_sec:
+                break  # 이후 타일은 전부 gap 밖
+            j1 = min(j0 + block, n)
+            sims = a @ mat[j0:j1].T
+            if j0 == i0:
+                sims[np.tril_indices(i1 - i0, 0, j1 - j0)] = -1.0  # 대각선 블록은 i < j만
+            ii, jj = np.nonzero(sims >= threshold)
+            if not len(ii):
+                continue
+            ii = ii + i0
+            jj = jj + j0
+            s = sims[ii - i0, jj - j0]
+            if banded:
+                keep = np.abs(ts[jj] - ts[ii]) <= max_gap_sec
+                ii, jj, s = ii[keep], jj[keep], s[keep]
+            out_i.append(ii)
+            out_j.append(jj)
+            out_s.append(s)
+    if not out_i:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.float32)
+    return (np.concatenate(out_i).astype(np.int64), np.concatenate(out_j).astype(np.int64),
+            np.concatenate(out_s).astype(np.float32))
+
+
+def connected_components(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """
+    벡터화 union-find (hooking + pointer jumping). 반환: 원소별 루트 (= 연결요소 내 최소 index)
+    """
+    parent = np.arange(n, dtype=np.int64)
+    if not len(src):
+        return parent
+    while True:
+        ps, pd = parent[src], parent[dst]
+        differ = ps != pd
+        if not differ.any():
+            return parent
+        lo = np.minimum(ps[differ], pd[differ])
+        hi = np.maximum(ps[differ], pd[differ])
+        np.minimum.at(parent, hi, lo)  # 큰 루트를 작은 루트 밑으로 (순환 없음)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+def density_labels(n: int,
+                   i: np.ndarray,
+                   j: np.ndarray,
+                   sim: np.ndarray,
+                   min_samples: int = 2) -> np.ndarray:
+    """
+    DBSCAN 방식 라벨 (-1 = noise). 라벨은 클러스터 첫 원소 index 순으로 0..k-1.
+    """
+    degree = np.bincount(i, minlength=n) + np.bincount(j, minlength=n)
+    core = degree + 1 >= min_samples
+    both = core[i] & core[j]
+    root = connected_components(n, i[both], j[both])
+
+    labels = np.full(n, -1, dtype=np.int64)
+    labels[core] = root[core]
+
+    # border: core 이웃 중 가장 가까운 것의 클러스터
+    src = np.concatenate([i, j])
+    dst = np.concatenate([j, i])
+    s = np.concatenate([sim, sim])
+    m = ~core[src] & core[dst]
+    if m.any():
+        src, dst, s = src[m], dst[m], s[m]
+        order = np.lexsort((-s, src))
+        src, dst = src[order], dst[order]
+        first = np.r_[True, src[1:] != src[:-1]]
+        labels[src[first]] = root[dst[first]]
+
+    # core 없는 단독 원소는 noise, 나머지는 0..k-1로 재번호
+    valid = labels >= 0
+    _, dense = np.unique(labels[valid], return_inverse=True)
+    labels[valid] = dense
+    return labels
+
+
+def cluster_members(labels: np.ndarray, mat: np.ndarray,
+                    min_size: int = 2) -> List[Tuple[np.ndarray, np.ndarray, int, np.ndarray]]:
+    """
+    클러스터별 (멤버 index, 평균 벡터와의 cosine, centroid 멤버 index, 평균 벡터(정규화 전)).
+    평균은 라벨 정렬 후 np.add.reduceat 으로 한 번에 계산.
+    """
+    valid = np.nonzero(labels >= 0)[0]
+    if not len(valid):
+        return []
+    order = valid[np.argsort(labels[valid], kind="stable")]
+    lab = labels[order]
+    starts = np.r_[0, np.nonzero(lab[1:] != lab[:-1])[0] + 1]
+    sizes = np.diff(np.r_[starts, len(order)])
+    means = np.add.reduceat(mat[order], starts, axis=0) / sizes[:, None]
+    unit = _normalize(means)
+
+    out = []
+    for k, (start, size) in enumerate(zip(starts, sizes)):
+        if size < min_size:
+            continue
+        members = order[start:start + size]
+        sims = mat[members] @ unit[k]
+        out.append((members, sims, int(members[int(np.argmax(sims))]), means[k].astype(np.float32)))
+    return out
+
+
+def _store_centroids(conn, model: str, rows: List[Tuple[int, np.ndarray, int, float]]) -> None:
+    """rows: (event_id, 평균 벡터, 멤버 수, 마지막 기사 epoch) → event_centroids upsert"""
+    if not rows:
+        return
+    register_vector(conn)
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            """
+            INSERT INTO event_centroids (event_id, model, dim, centroid, n_articles, last_article_at)
+            VALUES %s
+            ON CONFLICT (event_id, model) DO UPDATE
+            SET dim = EXCLUDED.dim,
+                centroid = EXCLUDED.centroid,
+                n_articles = EXCLUDED.n_articles,
+                last_article_at = GREATEST(event_centroids.last_article_at, EXCLUDED.last_article_at),
+                updated_at = now();
+            """,
+            [(event_id, model, len(vec), vec, n, last) for event_id, vec, n, last in rows],
+            template="(%s, %s, %s, %s, %s, to_timestamp(%s))",
+            page_size=200,
+        )
+
+
+def _drop_taken(clusters: List[Tuple[np.ndarray, np.ndarray, int, np.ndarray]], taken: np.ndarray,
+                mat: np.ndarray, min_size: int) -> List[Tuple[np.ndarray, np.ndarray, int, np.ndarray]]:
+    """
+    taken(bool, 기사 index별): 로드 이후 다른 실행이 배정한 기사 → 클러스터에서 빼고
+    평균 벡터 / similarity / centroid 재계산. min_size 미만으로 줄면 사건을 만들지 않음
+    """
+    out = []
+    for members, sims, centroid, mean in clusters:
+        keep = ~taken[members]
+        if keep.all():
+            out.append((members, sims, centroid, mean))
+            continue
+        members = members[keep]
+        if len(members) < min_size:
+            continue
+        mean = mat[members].mean(axis=0).astype(np.float32)
+        sims = mat[members] @ _normalize(mean)
+        out.append((members, sims, int(members[int(np.argmax(sims))]), mean))
+    return out
+
+
+# ────────────────────────────────
+# 🚀 실행
+# ────────────────────────────────
+ONLINE_LOCK_KEY = 742_031_002  # 배치 / 온라인 배정은 한 번에 하나만 (같은 기사 이중 배정 방지)
+
+
+def cluster_window(hours: Optional[float] = None,
+                   threshold: Optional[float] = None,
+                   model: Optional[str] = None,
+                   min_samples: Optional[int] = None,
+                   min_size: Optional[int] = None,
+                   dry_run: bool = False,
+                   since: Optional[datetime] = None,
+                   until: Optional[datetime] = None,
+                   article_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+    """
+    최근 hours 시간(또는 since~until)의 미배정 기사로 사건 생성.
+    article_ids: 주어지면 그 기사들만 (topic_scope.select_articles 결과 → 주제 관련 기사만 클러스터링)
+    반환: {"articles", "pairs", "events": [{"event_id", "centroid_article_id", "size", ...}], "timings"}
+    """
+    cfg = clustering_settings()
+    threshold = float(threshold if threshold is not None else cfg.get("threshold", 0.85))
+    min_samples = int(min_samples or cfg.get("min_samples", 2))
+    min_size = int(min_size or cfg.get("min_cluster_size", 2))
+    max_gap = cfg.get("max_gap_hours")
+    block = int(cfg.get("block_size", 2048))
+    prefilter_dim = int(cfg.get("prefilter_dim", 0) or 0)
+    prefilter_margin = float(cfg.get("prefilter_margin", 0.1))
+    if since is None:
+        since = datetime.now(timezone.utc) - timedelta(hours=float(hours or cfg.get("window_hours", 72)))
+
+    provider = get_provider(model)
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    ids, ts, mat, titles = load_window(provider.name, provider.dim, since, until, article_ids=article_ids)
+    timings["load_sec"] = round(time.perf_counter() - t0, 3)
+
+    t0 = time.perf_counter()
+    blocking = resolve_blocking(len(ids), cfg)
+    i, j, s = similar_pairs(mat, threshold, ts, float(max_gap) * 3600 if max_gap else None, block,
+                            prefilter_dim, prefilter_margin, blocking)
+    timings["pairs_sec"] = round(time.perf_counter() - t0, 3)
+
+    t0 = time.perf_counter()
+    labels = density_labels(len(ids), i, j, s, min_samples)
+    clusters = cluster_members(labels, mat, min_size)
+    timings["cluster_sec"] = round(time.perf_counter() - t0, 3)
+
+    events: List[Dict[str, Any]] = []
+    t0 = time.perf_counter()
+    conn = None if dry_run else get_conn()
+    centroid_rows: List[Tuple[int, np.ndarray, int, float]] = []
+    try:
+        if conn is not None and clusters:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s);", (ONLINE_LOCK_KEY,))
+                # 로드 이후 assign_online / 다른 배치가 배정했을 수 있으므로 락 안에서 다시 거름
+                cur.execute("SELECT DISTINCT article_id FROM event_articles WHERE article_id = ANY(%s);",
+                            (ids[np.concatenate([c[0] for c in clusters])].tolist(),))
+                taken_ids = [r[0] for r in cur.fetchall()]
+            if taken_ids:
+                clusters = _drop_taken(clusters, np.isin(ids, taken_ids), mat, min_size)
+        for members, sims, centroid, mean in clusters:
+            event = Event(
+                summary=titles[centroid],
+                start_time=datetime.fromtimestamp(float(ts[members].min()), timezone.utc),
+                end_time=datetime.fromtimestamp(float(ts[members].max()), timezone.utc),
+                centroid_article_id=int(ids[centroid]),
+            )
+            event_id = None
+            if conn is not None:
+                event_id = db_services.insert_event(event, conn=conn)
+                db_services.link_event_articles(
+                    event_id, [(int(a), float(x)) for a, x in zip(ids[members], sims)], conn=conn
+                )
+                centroid_rows.append((event_id, mean, len(members), float(ts[members].max())))
+            events.append({"event_id": event_id, "centroid_article_id": int(ids[centroid]),
+                           "size": int(len(members)), "summary": event.summary,
+                           "start_time": event.start_time, "end_time": event.end_time})
+        if conn is not None:
+            _store_centroids(conn, provider.name, centroid_rows)
+            conn.commit()
+    finally:
+        if conn is not None:
+            conn.close()
+    timings["write_sec"] = round(time.perf_counter() - t0, 3)
+    if not dry_run:
+        after_events_changed(e["event_id"] for e in events)
+
+    return {
+        "model": provider.name,
+        "threshold": threshold,
+        "articles": int(len(ids)),
+        "pairs": int(len(i)),
+        "blocking": blocking,
+        "clustered_articles": int(sum(len(c[0]) for c in clusters)),
+        "events": events,
+        "timings": timings,
+    }
+
+
+# ────────────────────────────────
+# 🔄 온라인 배정 (open 사건 centroid와 비교 → 합류 또는 새 사건)
+#   - open 사건: open_hours 안에 기사가 합류한 사건 (event_centroids.last_article_at)
+#   - 비용 = 새 기사 m × open 사건 k 행렬곱 + 미합류 기사끼리 m'² → 전체 윈도우 재계산 없음
+#   - 사건 id가 유지되므로 실행마다 번호가 바뀌지 않음
+# ────────────────────────────────
+def _bootstrap_centroids(cur, model: str, cutoff: datetime) -> int:
+    """centroid가 없는 open 사건(배치/LLM으로 만든 사건 등)은 멤버 임베딩 평균으로 채움"""
+    cur.execute(
+        """
+        INSERT INTO event_centroids (event_id, model, dim, centroid, n_articles, last_article_at)
+        SELECT ea.event_id, e.model, min(e.dim), avg(e.embedding), count(*),
+               max(COALESCE(a.published_at, a.fetched_at))
+        FROM event_articles ea
+        JOIN events ev ON ev.id = ea.event_id
+        JOIN article_embeddings e ON e.article_id = ea.article_id AND e.model = %(model)s
+        JOIN articles a ON a.id = ea.article_id
+        WHERE COALESCE(ev.end_time, ev.created_at) >= %(cutoff)s
+          AND NOT EXISTS (
+              SELECT 1 FROM event_centroids c WHERE c.event_id = ea.event_id AND c.model = %(model)s
+          )
+        GROUP BY ea.event_id, e.model
+        ON CONFLICT (event_id, model) DO NOTHING;
+        """,
+        {"model": model, "cutoff": cutoff},
+    )
+    return cur.rowcount
+
+
+def _load_open_centroids(cur, model: str, dim: int,
+                         cutoff: datetime) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """반환: (event_ids, 멤버 수, 평균 벡터 (k × dim))"""
+    cur.execute(
+        """
+        SELECT event_id, n_articles, vector_send(centroid)
+        FROM event_centroids
+        WHERE model = %s AND dim = %s AND last_article_at >= %s
+        ORDER BY event_id;
+        """,
+        (model, dim, cutoff),
+    )
+    rows = cur.fetchall()
+    return (np.asarray([r[0] for r in rows], np.int64),
+            np.asarray([r[1] for r in rows], np.int64),
+            _vectors_from_send([bytes(r[2]) for r in rows], dim))
+
+
+def assign_online(article_ids: Optional[List[int]] = None,
+                  model: Optional[str] = None,
+                  threshold: Optional[float] = None,
+                  open_hours: Optional[float] = None,
+                  dry_run: bool = False) -> Dict[str, Any]:
+    """
+    미배정 새 기사(article_ids 또는 open 윈도우 전체)를 open 사건에 합류시키거나 새 사건 생성.
+      1) 새 기사 × open centroid 행렬곱 → 최고 유사도 ≥ threshold 면 그 사건에 합류
+         centroid = (평균 × n + 합류 벡터 합) / (n + 합류 수),  events.start/end_time 갱신
+      2) 못 붙은 기사끼리는 같은 threshold로 묶어서 (단독 포함) 새 사건
+    반환: {"articles", "joined", "new_events", "events_touched", "timings"}
+    """
+    cfg = clustering_settings()
+    online = dict(cfg.get("online") or {})
+    threshold = float(threshold if threshold is not None else online.get("threshold") or cfg.get("threshold", 0.85))
+    open_hours = float(open_hours or online.get("open_hours", 48))
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=open_hours)
+
+    provider = get_provider(model)
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    ids, ts, mat, titles = load_window(provider.name, provider.dim, cutoff, article_ids=article_ids)
+    timings["load_sec"] = round(time.perf_counter() - t0, 3)
+    result: Dict[str, Any] = {"model": provider.name, "threshold": threshold, "articles": int(len(ids)),
+                              "joined": 0, "new_events": [], "events_touched": 0, "timings": timings}
+    if not len(ids):
+        return result
+
+    conn = get_conn()
+    try:
+        register_vector(conn)
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s);", (ONLINE_LOCK_KEY,))
+            # 다른 실행이 락을 잡기 전에 배정했을 수 있으므로 락 안에서 다시 거름
+            cur.execute("SELECT DISTINCT article_id FROM event_articles WHERE article_id = ANY(%s);",
+                        (ids.tolist(),))
+            taken = np.asarray([r[0] for r in cur.fetchall()], np.int64)
+            if len(taken):
+                keep = ~np.isin(ids, taken)
+                ids, ts, mat = ids[keep], ts[keep], mat[keep]
+                titles = [t for t, k in zip(titles, keep) if k]
+            result["bootstrapped"] = _bootstrap_centroids(cur, provider.name, cutoff)
+            ev_ids, counts, means = _load_open_centroids(cur, provider.name, provider.dim, cutoff)
+        result["open_events"] = int(len(ev_ids))
+
+        # 1) open 사건 합류
+        t0 = time.perf_counter()
+        best = np.full(len(ids), -1, np.int64)
+        best_sim = np.zeros(len(ids), np.float32)
+        if len(ev_ids):
+            sims = mat @ _normalize(means).T
+            best = np.argmax(sims, axis=1)
+            best_sim = sims[np.arange(len(ids)), best]
+        joined = np.nonzero((best >= 0) & (best_sim >= threshold))[0]
+
+        centroid_rows: List[Tuple[int, np.ndarray, int, float]] = []
+        time_rows: List[Tuple[int, float, float]] = []
+        links: List[Tuple[int, int, float]] = []
+        if len(joined):
+            order = joined[np.argsort(best[joined], kind="stable")]
+            k = best[order]
+            starts = np.r_[0, np.nonzero(k[1:] != k[:-1])[0] + 1]
+            sizes = np.diff(np.r_[starts, len(order)])
+            sums = np.add.reduceat(mat[order], starts, axis=0)
+            for g, (start, size) in enumerate(zip(starts, sizes)):
+                e = int(k[start])
+                members = order[start:start + size]
+                n_new = int(counts[e] + size)
+                mean = ((means[e] * counts[e] + sums[g]) / n_new).astype(np.float32)
+                centroid_rows.append((int(ev_ids[e]), mean, n_new, float(ts[members].max())))
+                time_rows.append((int(ev_ids[e]), float(ts[members].min()), float(ts[members].max())))
+                links.extend((int(ev_ids[e]), int(ids[m]), float(best_sim[m])) for m in members)
+        timings["match_sec"] = round(time.perf_counter() - t0, 3)
+
+        # 2) 미합류 기사 → 새 사건 (단독 기사도 사건 시작)
+        t0 = time.perf_counter()
+        rest = np.setdiff1d(np.arange(len(ids)), joined)
+        new_clusters = []
+        if len(rest):
+            i, j, s = similar_pairs(mat[rest], threshold, ts[rest])
+            labels = density_labels(len(rest), i, j, s, min_samples=1)
+            new_clusters = [(rest[m], sims_, rest[c], mean)
+                            for m, sims_, c, mean in cluster_members(labels, mat[rest], min_size=1)]
+        timings["new_sec"] = round(time.perf_counter() - t0, 3)
+
+        if dry_run:
+            conn.rollback()
+            result.update(joined=int(len(joined)), events_touched=len(time_rows),
+                          new_events=[{"event_id": None, "size": int(len(m)), "centroid_article_id": int(ids[c])}
+                                      for m, _, c, _ in new_clusters])
+            return result
+
+        t0 = time.perf_counter()
+        new_events: List[Dict[str, Any]] = []
+        for members, sims_, c, mean in new_clusters:
+            event = Event(
+                summary=titles[c],
+                start_time=datetime.fromtimestamp(float(ts[members].min()), timezone.utc),
+                end_time=datetime.fromtimestamp(float(ts[members].max()), timezone.utc),
+                centroid_article_id=int(ids[c]),
+            )
+            event_id = db_services.insert_event(event, conn=conn)
+            links.extend((event_id, int(a), float(x)) for a, x in zip(ids[members], sims_))
+            centroid_rows.append((event_id, mean, len(members), float(ts[members].max())))
+            new_events.append({"event_id": event_id, "size": int(len(members)), "centroid_article_id": int(ids[c])})
+
+        with conn.cursor() as cur:
+            if time_rows:
+                execute_values(
+                    cur,
+                    """
+                    UPDATE events ev
+                    SET start_time = LEAST(ev.start_time, to_timestamp(v.t_min)),
+                        end_time = GREATEST(ev.end_time, to_timestamp(v.t_max))
+                    FROM (VALUES %s) AS v(event_id, t_min, t_max)
+                    WHERE ev.id = v.event_id;
+                    """,
+                    time_rows,
+                    template="(%s::bigint, %s::float8, %s::float8)",
+                )
+            execute_values(
+                cur,
+                """
+                INSERT INTO event_articles (event_id, article_id, similarity)
+                VALUES %s
+                ON CONFLICT (event_id, article_id) DO NOTHING;
+                """,
+                links,
+                page_size=500,
+            )
+        _store_centroids(conn, provider.name, centroid_rows)
+        conn.commit()
+        timings["write_sec"] = round(time.perf_counter() - t0, 3)
+    finally:
+        conn.close()
+
+    result.update(joined=int(len(joined)), events_touched=len(time_rows), new_events=new_events)
+    after_events_changed([e for e, _, _ in time_rows] + [e["event_id"] for e in new_events])
+    return result
+
+
+def attach_duplicates(article_ids: Optional[List[int]] = None,
+                      event_ids: Optional[List[int]] = None) -> List[int]:
+    """
+    미배정 near-duplicate 기사를 canonical 기사가 속한 사건에 연결 (similarity는 canonical 값 그대로).
+    article_ids: 이 중복 기사들만 / event_ids: 이 사건 멤버를 canonical로 가진 중복 기사들만
+    반환: 기사가 붙은 사건 id (start/end_time도 넓힘)
+    """
+    if not article_ids and not event_ids:
+        return []
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            WITH linked AS (
+                INSERT INTO event_articles (event_id, article_id, similarity)
+                SELECT DISTINCT ON (a.id) ea.event_id, a.id, ea.similarity
+                FROM articles a
+                JOIN event_articles ea ON ea.article_id = a.duplicate_of
+                WHERE a.duplicate_of IS NOT NULL
+                  AND (a.id = ANY(%(ids)s) OR ea.event_id = ANY(%(events)s))
+                  AND NOT EXISTS (SELECT 1 FROM event_articles x WHERE x.article_id = a.id)
+                ORDER BY a.id, ea.event_id
+                ON CONFLICT (event_id, article_id) DO NOTHING
+                RETURNING event_id, article_id
+            ), spans AS (
+                SELECT l.event_id,
+                       min(COALESCE(a.published_at, a.fetched_at)) AS t_min,
+                       max(COALESCE(a.published_at, a.fetched_at)) AS t_max
+                FROM linked l JOIN articles a ON a.id = l.article_id
+                GROUP BY l.event_id
+            )
+            UPDATE events ev
+            SET start_time = LEAST(ev.start_time, s.t_min),
+                end_time = GREATEST(ev.end_time, s.t_max)
+            FROM spans s
+            WHERE ev.id = s.event_id
+            RETURNING ev.id;
+            """,
+            {"ids": list(article_ids or []), "events": list(event_ids or [])},
+        )
+        touched = sorted(r[0] for r in cur.fetchall())
+    conn.close()
+    return touched
+
+
+def after_events_changed(event_ids) -> None:
+    """사건 멤버가 바뀐 뒤(커밋 후) near-duplicate 연결 + 태그 / 신뢰도 재계산 — 각 단계는 실패해도 호출자 흐름 유지"""
+    event_ids = list(event_ids)
+    try:
+        attach_duplicates(event_ids=event_ids)
+    except Exception as e:
+        print(f"[attach_duplicates] Error: {e}")
+    event_tagging.on_events_changed(event_ids)
+    event_scoring.on_events_changed(event_ids)
+
+
+def on_articles_embedded(model: str, article_ids: List[int]) -> None:
+    """embedding_service가 저장 직후 호출. clustering.online.enabled + active 모델일 때만, 실패해도 저장 흐름 유지"""
+    if not article_ids or not (clustering_settings().get("online") or {}).get("enabled"):
+        return
+    try:
+        if model != get_provider().name:
+            return
+        assign_online(list(article_ids), model)
+        # canonical이 이미 사건에 있는 중복 기사 (assign_online은 canonical 기사만 다룸)
+        touched = attach_duplicates(article_ids=list(article_ids))
+        if touched:
+            after_events_changed(touched)
+    except Exception as e:
+        print(f"[on_articles_embedded] Error: {e}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.event_clustering")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="최근 윈도우 미배정 기사 클러스터링 → events 저장")
+    p_run.add_argument("--hours", type=float, default=None)
+    p_run.add_argument("--threshold", type=float, default=None)
+    p_run.add_argument("--model", default=None)
+    p_run.add_argument("--min-samples", type=int, default=None)
+    p_run.add_argument("--topic", default=None, help="주어지면 주제 관련 기사만 (services.topic_scope)")
+    p_run.add_argument("--dry-run", action="store_true")
+
+    p_assign = sub.add_parser("assign", help="새 기사를 open 사건에 온라인 배정")
+    p_assign.add_argument("article_ids", type=int, nargs="*", help="비우면 open 윈도우의 미배정 기사 전체")
+    p_assign.add_argument("--threshold", type=float, default=None)
+    p_assign.add_argument("--open-hours", type=float, default=None)
+    p_assign.add_argument("--model", default=None)
+    p_assign.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.command == "assign":
+        result = assign_online(args.article_ids or None, args.model, args.threshold, args.open_hours,
+                               dry_run=args.dry_run)
+        print(json.dumps({**result, "new_events": result["new_events"][:20]},
+                         ensure_ascii=False, indent=2, default=str))
+        return 0
+    article_ids = None
+    if args.topic:
+        from services.topic_scope import select_articles
+        article_ids = select_articles(args.topic, args.hours, args.model)["article_ids"]
+    result = cluster_window(args.hours, args.threshold, args.model, args.min_samples, dry_run=args.dry_run,
+                            article_ids=article_ids)
+    print(json.dumps({**result, "events": result["events"][:20]}, ensure_ascii=False, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
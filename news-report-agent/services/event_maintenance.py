@@ -0,0 +1,510 @@
+# services/event_maintenance.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧹 사건 병합 / 분할 유지보수 (온라인 배정 drift 보정)
+#   - 대상: 지난 실행 이후 centroid가 바뀐 사건만 (event_centroids.updated_at > watermark)
+#           watermark는 job_checkpoints("event_maintenance:<model>")에 저장
+#           → 이력이 커져도 매 실행 비용은 그 사이 새로 바뀐 사건 수에 비례
+#   - block_events개 사건씩 한 트랜잭션 (온라인 배정과 같은 advisory lock → 서로 끼어들지 않음)
+#     1) 분할: 멤버 벡터를 한 번에 로드 → np.add.reduceat 으로 사건별 합 벡터
+#              cohesion(멤버 쌍 cosine 평균) < split_cohesion 인 사건은 클러스터러와 같은 밀도 기반 묶기로 재분할
+#              가장 큰 묶음은 기존 사건에 남고 나머지(노이즈 기사는 단독)는 새 사건으로 이동
+#     2) 병합: 블록 사건 centroid × lookback 안의 centroid 행렬곱 → cosine ≥ merge_threshold
+#              이고 기간 간격 ≤ max_gap_hours 인 쌍을 연결요소로 묶어 멤버 많은 사건으로 합침
+#              (event_articles / reports 는 남는 사건으로 옮기고 tags/conflicts 는 합집합)
+#     3) 정리: 바뀐 사건의 평균/멤버 수/기간 재계산, centroid_article_id = 평균에 가장 가까운 기사,
+#              event_articles.similarity 갱신 (유지보수 쓰기는 updated_at을 올리지 않음 → 다음 실행에서 재처리 안 함,
+#              분할로 새로 만든 centroid 행도 updated_at = watermark - overlap_minutes 로 넣음)
+#     4) 분할/병합된 사건은 topic_tags / event_cred / conflicts 재계산
+#
+# 사용:
+#   python -m services.event_maintenance run              # 지난 실행 이후 바뀐 사건만
+#   python -m services.event_maintenance run --full       # lookback 안 사건 전체
+#   python -m services.event_maintenance run --dry-run
+#   python -m services.event_maintenance status
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pgvector.psycopg2 import register_vector
+from psycopg2.extras import Json, execute_values
+
+from config import clustering_settings
+from models import Event
+from services import db_services
+from services.db_services import get_conn
+from services.embedding_backfill import load_checkpoint
+from services.embedding_providers import get_provider
+from services.event_clustering import (
+    ONLINE_LOCK_KEY,
+    _bootstrap_centroids,
+    _normalize,
+    _vectors_from_send,
+    after_events_changed,
+    connected_components,
+    density_labels,
+    similar_pairs,
+)
+
+
+def job_name(model: str) -> str:
+    return f"event_maintenance:{model}"
+
+
+def maintenance_settings() -> Dict[str, Any]:
+    cfg = clustering_settings()
+    m = dict(cfg.get("maintenance") or {})
+    return {
+        "threshold": float(cfg.get("threshold", 0.85)),
+        "min_samples": int(cfg.get("min_samples", 2)),
+        "max_gap_hours": cfg.get("max_gap_hours"),
+        "lookback_hours": float(m.get("lookback_hours", 336)),
+        "merge_threshold": float(m.get("merge_threshold", 0.9)),
+        "split_cohesion": float(m.get("split_cohesion", 0.8)),
+        "split_min_size": int(m.get("split_min_size", 4)),
+        "block_events": int(m.get("block_events", 500)),
+        "overlap_minutes": float(m.get("overlap_minutes", 10)),
+    }
+
+
+# ────────────────────────────────
+# 📥 멤버 로드 / 사건별 통계
+# ────────────────────────────────
+class Members:
+    """사건별로 연속 정렬된 멤버 (event_id, 게시 시각, article_id 순)"""
+
+    def __init__(self, rows: List[tuple], dim: int) -> None:
+        self.event = np.asarray([r[0] for r in rows], np.int64)
+        self.article = np.asarray([r[1] for r in rows], np.int64)
+        self.ts = np.asarray([r[2] for r in rows], np.float64)
+        self.titles = [r[3] for r in rows]
+        self.old_sim = np.asarray([np.nan if r[4] is None else r[4] for r in rows], np.float32)
+        self.mat = _normalize(_vectors_from_send([bytes(r[5]) for r in rows], dim))
+        if len(rows):
+            self.starts = np.r_[0, np.nonzero(self.event[1:] != self.event[:-1])[0] + 1]
+        else:
+            self.starts = np.zeros(0, np.int64)
+        self.sizes = np.diff(np.r_[self.starts, len(rows)]).astype(np.int64)
+        self.event_ids = self.event[self.starts]
+
+    def stats(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        반환: (사건별 평균 벡터(정규화 전), 멤버별 평균과의 cosine, 사건별 cohesion)
+        cohesion = 멤버 쌍 cosine 평균 = (|Σx|² - n) / (n(n-1))  — 합 벡터만으로 계산 (n² 없음)
+          (평균과의 cosine은 서로 무관한 두 묶음이 합쳐져도 √((1+c)/2) ≈ 0.87 로 높게 나와 쓰지 않음)
+        """
+        if not len(self.event):
+            return np.zeros((0, self.mat.shape[1]), np.float32), np.zeros(0, np.float32), np.zeros(0, np.float32)
+        sums = np.add.reduceat(self.mat, self.starts, axis=0)
+        means = sums / self.sizes[:, None]
+        grp = np.repeat(np.arange(len(self.starts)), self.sizes)
+        sims = np.einsum("ij,ij->i", self.mat, _normalize(means)[grp]).astype(np.float32)
+        n = self.sizes.astype(np.float64)
+        pair_sum = np.einsum("ij,ij->i", sums, sums) - n
+        cohesion = np.where(n > 1, pair_sum / np.maximum(n * (n - 1), 1), 1.0)
+        return means.astype(np.float32), sims, cohesion.astype(np.float32)
+
+
+def _load_members(cur, model: str, dim: int, event_ids: List[int]) -> Members:
+    cur.execute(
+        """
+        SELECT ea.event_id, ea.article_id,
+               extract(epoch FROM COALESCE(a.published_at, a.fetched_at))::float8,
+               a.title, ea.similarity, vector_send(e.embedding)
+        FROM event_articles ea
+        JOIN article_embeddings e ON e.article_id = ea.article_id AND e.model = %s AND e.dim = %s
+        JOIN articles a ON a.id = ea.article_id
+        WHERE ea.event_id = ANY(%s)
+        ORDER BY ea.event_id, 3, ea.article_id;
+        """,
+        (model, dim, list(event_ids)),
+    )
+    return Members(cur.fetchall(), dim)
+
+
+# ────────────────────────────────
+# ✂️ 분할
+# ────────────────────────────────
+def _split_block(conn, members: Members, cohesion: np.ndarray, cfg: Dict[str, Any],
+                 dry_run: bool) -> Tuple[List[int], List[int]]:
+    """반환: (분할된 기존 사건 id, 새로 만든 사건 id)"""
+    split: List[int] = []
+    created: List[int] = []
+    max_gap = float(cfg["max_gap_hours"]) * 3600 if cfg["max_gap_hours"] else None
+    candidates = np.nonzero((cohesion < cfg["split_cohesion"]) & (members.sizes >= cfg["split_min_size"]))[0]
+    for k in candidates:
+        start, size = int(members.starts[k]), int(members.sizes[k])
+        mat, ts = members.mat[start:start + size], members.ts[start:start + size]
+        i, j, s = similar_pairs(mat, cfg["threshold"], ts, max_gap)
+        labels = density_labels(size, i, j, s, cfg["min_samples"])
+        noise = labels < 0
+        labels[noise] = labels.max() + 1 + np.arange(int(noise.sum()))  # 노이즈 기사는 단독 사건
+        counts = np.bincount(labels)
+        if len(counts) < 2:
+            continue
+        keep = int(np.argmax(counts))  # 동률이면 먼저 나온 묶음
+        old_id = int(members.event_ids[k])
+        split.append(old_id)
+        for part in range(len(counts)):
+            if part == keep:
+                continue
+            idx = np.nonzero(labels == part)[0]
+            unit = _normalize(mat[idx].mean(axis=0))
+            c = int(idx[int(np.argmax(mat[idx] @ unit))])
+            if dry_run:
+                created.append(-1)
+                continue
+            event_id = db_services.insert_event(Event(
+                summary=members.titles[start + c],
+                start_time=datetime.fromtimestamp(float(ts[idx].min()), timezone.utc),
+                end_time=datetime.fromtimestamp(float(ts[idx].max()), timezone.utc),
+                centroid_article_id=int(members.article[start + c]),
+            ), conn=conn)
+            with conn.cursor() as cur:
+                cur.execute(
+                    "UPDATE event_articles SET event_id = %s WHERE event_id = %s AND article_id = ANY(%s);",
+                    (event_id, old_id, members.article[start + idx].tolist()),
+                )
+            created.append(event_id)
+    return split, created
+
+
+# ────────────────────────────────
+# 🔗 병합
+# ────────────────────────────────
+def _merge_block(cur, model: str, dim: int, block_ids: List[int], cutoff: datetime,
+                 cfg: Dict[str, Any], dry_run: bool, chunk: int = 8192) -> Dict[int, int]:
+    """블록 사건과 수렴한 사건을 합침. 반환: {없어진 사건 id: 남은 사건 id}"""
+    cur.execute(
+        """
+        SELECT c.event_id, c.n_articles,
+               extract(epoch FROM COALESCE(ev.start_time, c.last_article_at))::float8,
+               extract(epoch FROM COALESCE(ev.end_time, c.last_article_at))::float8,
+               vector_send(c.centroid)
+        FROM event_centroids c
+        JOIN events ev ON ev.id = c.event_id
+        WHERE c.model = %s AND c.dim = %s AND c.last_article_at >= %s
+        ORDER BY c.event_id;
+        """,
+        (model, dim, cutoff),
+    )
+    rows = cur.fetchall()
+    if len(rows) < 2:
+        return {}
+    ids = np.asarray([r[0] for r in rows], np.int64)
+    counts = np.asarray([r[1] for r in rows], np.int64)
+    t_start = np.asarray([r[2] for r in rows], np.float64)
+    t_end = np.asarray([r[3] for r in rows], np.float64)
+    unit = _normalize(_vectors_from_send([bytes(r[4]) for r in rows], dim))
+    rows_in_block = np.nonzero(np.isin(ids, block_ids))[0]
+    max_gap = float(cfg["max_gap_hours"]) * 3600 if cfg["max_gap_hours"] else None
+
+    src: List[np.ndarray] = []
+    dst: List[np.ndarray] = []
+    q = unit[rows_in_block]
+    for c0 in range(0, len(ids), chunk):
+        sims = q @ unit[c0:c0 + chunk].T
+        a, b = np.nonzero(sims >= cfg["merge_threshold"])
+        a, b = rows_in_block[a], b + c0
+        keep = a != b
+        if max_gap is not None:
+            gap = np.maximum(t_start[a], t_start[b]) - np.minimum(t_end[a], t_end[b])
+            keep &= gap <= max_gap
+        src.append(a[keep])
+        dst.append(b[keep])
+    src_a, dst_a = np.concatenate(src), np.concatenate(dst)
+    if not len(src_a):
+        return {}
+
+    root = connected_components(len(ids), src_a, dst_a)
+    touched = np.unique(np.concatenate([src_a, dst_a]))
+    # 연결요소마다 멤버가 가장 많은 사건(동률이면 id가 작은 쪽)이 남음
+    order = touched[np.lexsort((ids[touched], -counts[touched], root[touched]))]
+    first = np.r_[True, root[order][1:] != root[order][:-1]]
+    survivor_of_root = dict(zip(root[order][first].tolist(), ids[order][first].tolist()))
+    mapping = {int(ids[x]): int(survivor_of_root[int(root[x])])
+               for x in touched if ids[x] != survivor_of_root[int(root[x])]}
+    if dry_run or not mapping:
+        return mapping
+
+    losers, survivors = list(mapping), list(mapping.values())
+    params = {"losers": losers, "survivors": survivors}
+    cur.execute(
+        """
+        INSERT INTO event_articles (event_id, article_id, similarity)
+        SELECT m.survivor, ea.article_id, ea.similarity
+        FROM unnest(%(losers)s::bigint[], %(survivors)s::bigint[]) AS m(loser, survivor)
+        JOIN event_articles ea ON ea.event_id = m.loser
+        ON CONFLICT (event_id, article_id) DO NOTHING;
+        """,
+        params,
+    )
+    cur.execute(
+        """
+        UPDATE reports r SET event_id = m.survivor
+        FROM unnest(%(losers)s::bigint[], %(survivors)s::bigint[]) AS m(loser, survivor)
+        WHERE r.event_id = m.loser;
+        """,
+        params,
+    )
+    cur.execute(
+        """
+        WITH m AS (
+            SELECT * FROM unnest(%(losers)s::bigint[], %(survivors)s::bigint[]) AS m(loser, survivor)
+        ), grp AS (
+            SELECT survivor, loser AS id FROM m
+            UNION SELECT survivor, survivor FROM m
+        ), merged AS (
+            SELECT g.survivor,
+                   (SELECT array_agg(DISTINCT t ORDER BY t) FROM grp g2 JOIN events e2 ON e2.id = g2.id,
+                           unnest(e2.topic_tags) AS t WHERE g2.survivor = g.survivor) AS tags,
+                   (SELECT array_agg(DISTINCT c ORDER BY c) FROM grp g2 JOIN events e2 ON e2.id = g2.id,
+                           unnest(e2.conflicts) AS c WHERE g2.survivor = g.survivor) AS conflicts
+            FROM (SELECT DISTINCT survivor FROM grp) g
+        )
+        UPDATE events ev
+        SET topic_tags = merged.tags, conflicts = merged.conflicts
+        FROM merged
+        WHERE ev.id = merged.survivor;
+        """,
+        params,
+    )
+    # event_articles / event_centroids 는 ON DELETE CASCADE
+    cur.execute("DELETE FROM events WHERE id = ANY(%s);", (losers,))
+    return mapping
+
+
+# ────────────────────────────────
+# 📌 centroid 재계산 / re-point
+# ────────────────────────────────
+def _finalize(conn, model: str, dim: int, event_ids: List[int], seen_at: datetime) -> int:
+    """
+    사건별 평균/멤버 수/기간/centroid_article_id/similarity를 멤버로부터 다시 계산해 저장.
+    event_centroids.updated_at 은 기존 값 유지 (온라인 배정 변경분만 다음 실행 대상).
+    분할로 새로 생긴 사건의 centroid 행은 updated_at = seen_at 으로 넣음
+    (다음 실행의 스캔 하한 — watermark - overlap — 이하라서 dirty로 다시 잡히지 않음).
+    반환: centroid_article_id가 바뀐 사건 수
+    """
+    if not event_ids:
+        return 0
+    register_vector(conn)
+    with conn.cursor() as cur:
+        members = _load_members(cur, model, dim, event_ids)
+        if not len(members.event):
+            return 0
+        means, sims, _ = members.stats()
+        grp = np.repeat(np.arange(len(members.starts)), members.sizes)
+        best = np.lexsort((-sims, grp))[members.starts]  # 사건별 평균에 가장 가까운 멤버
+        t_min = np.minimum.reduceat(members.ts, members.starts)
+        t_max = np.maximum.reduceat(members.ts, members.starts)
+
+        cur.execute(
+            "SELECT id, centroid_article_id FROM events WHERE id = ANY(%s);",
+            (members.event_ids.tolist(),),
+        )
+        old = dict(cur.fetchall())
+        repointed = sum(old.get(int(e)) != int(members.article[b])
+                        for e, b in zip(members.event_ids, best))
+        execute_values(
+            cur,
+            """
+            UPDATE events ev
+            SET centroid_article_id = v.cid, start_time = to_timestamp(v.t_min), end_time = to_timestamp(v.t_max)
+            FROM (VALUES %s) AS v(event_id, cid, t_min, t_max)
+            WHERE ev.id = v.event_id;
+            """,
+            [(int(e), int(members.article[b]), float(lo), float(hi))
+             for e, b, lo, hi in zip(members.event_ids, best, t_min, t_max)],
+            template="(%s::bigint, %s::bigint, %s::float8, %s::float8)",
+        )
+        changed = ~(np.abs(sims - members.old_sim) < 1e-3)  # NaN(비어 있던 값) 포함
+        if changed.any():
+            execute_values(
+                cur,
+                """
+                UPDATE event_articles ea SET similarity = v.sim
+                FROM (VALUES %s) AS v(event_id, article_id, sim)
+                WHERE ea.event_id = v.event_id AND ea.article_id = v.article_id;
+                """,
+                list(zip(members.event[changed].tolist(), members.article[changed].tolist(),
+                         sims[changed].astype(float).tolist())),
+                template="(%s::bigint, %s::bigint, %s::real)",
+                page_size=500,
+            )
+        execute_values(
+            cur,
+            """
+            INSERT INTO event_centroids (event_id, model, dim, centroid, n_articles, last_article_at, updated_at)
+            VALUES %s
+            ON CONFLICT (event_id, model) DO UPDATE
+            SET dim = EXCLUDED.dim,
+                centroid = EXCLUDED.centroid,
+                n_articles = EXCLUDED.n_articles,
+                last_article_at = EXCLUDED.last_article_at;
+            """,
+            [(int(e), model, dim, mean, int(n), float(hi), seen_at)
+             for e, mean, n, hi in zip(members.event_ids, means, members.sizes, t_max)],
+            template="(%s, %s, %s, %s, %s, to_timestamp(%s), %s)",
+            page_size=200,
+        )
+    return int(repointed)
+
+
+# ────────────────────────────────
+# 🚀 실행
+# ────────────────────────────────
+def run_maintenance(model: Optional[str] = None,
+                    full: bool = False,
+                    dry_run: bool = False) -> Dict[str, Any]:
+    """
+    반환: {"model", "dirty_events", "blocks", "split_events", "new_events", "merged_events",
+           "repointed", "watermark", "timings"}
+    """
+    cfg = maintenance_settings()
+    provider = get_provider(model)
+    model, dim = provider.name, provider.dim
+    job = job_name(model)
+    state = load_checkpoint(job)
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=cfg["lookback_hours"])
+
+    timings: Dict[str, float] = {"split_sec": 0.0, "merge_sec": 0.0, "finalize_sec": 0.0}
+    result: Dict[str, Any] = {"model": model, "dirty_events": 0, "blocks": 0, "split_events": 0,
+                              "new_events": 0, "merged_events": 0, "repointed": 0, "timings": timings}
+    t0 = time.perf_counter()
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s);", (ONLINE_LOCK_KEY,))
+            cur.execute("SELECT now();")
+            watermark = cur.fetchone()[0]
+            seen_at = watermark - timedelta(minutes=cfg["overlap_minutes"])  # 유지보수가 만든 centroid 행의 updated_at
+            bootstrapped = 0 if dry_run else _bootstrap_centroids(cur, model, cutoff)
+            since = None
+            if not full and state.get("watermark"):
+                since = datetime.fromisoformat(state["watermark"]) - timedelta(minutes=cfg["overlap_minutes"])
+            cur.execute(
+                """
+                SELECT event_id FROM event_centroids
+                WHERE model = %(model)s AND dim = %(dim)s AND last_article_at >= %(cutoff)s
+                  AND (%(since)s::timestamptz IS NULL OR updated_at > %(since)s)
+                ORDER BY event_id;
+                """,
+                {"model": model, "dim": dim, "cutoff": cutoff, "since": since},
+            )
+            dirty = [r[0] for r in cur.fetchall()]
+        conn.commit()
+        result.update(dirty_events=len(dirty), bootstrapped=bootstrapped)
+        timings["select_sec"] = round(time.perf_counter() - t0, 3)
+
+        merged_away: set = set()
+        changed: set = set()
+        for b0 in range(0, len(dirty), cfg["block_events"]):
+            block = [e for e in dirty[b0:b0 + cfg["block_events"]] if e not in merged_away]
+            if not block:
+                continue
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s);", (ONLINE_LOCK_KEY,))
+
+                t0 = time.perf_counter()
+                members = _load_members(cur, model, dim, block)
+                _, _, cohesion = members.stats()
+                split, created = _split_block(conn, members, cohesion, cfg, dry_run)
+                timings["split_sec"] += time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                block_ids = members.event_ids.tolist() + [e for e in created if e > 0]
+                if not dry_run:
+                    result["repointed"] += _finalize(conn, model, dim, block_ids, seen_at)
+                timings["finalize_sec"] += time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                mapping = _merge_block(cur, model, dim, block_ids, cutoff, cfg, dry_run)
+                timings["merge_sec"] += time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                if mapping and not dry_run:
+                    _finalize(conn, model, dim, sorted(set(mapping.values())), seen_at)
+                timings["finalize_sec"] += time.perf_counter() - t0
+            if dry_run:
+                conn.rollback()
+            else:
+                conn.commit()
+            merged_away.update(mapping)
+            changed.update(split + [e for e in created if e > 0] + list(mapping.values()))
+            result["blocks"] += 1
+            result["split_events"] += len(split)
+            result["new_events"] += len(created)
+            result["merged_events"] += len(mapping)
+
+        if not dry_run:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO job_checkpoints (job, state, updated_at)
+                    VALUES (%(job)s, %(state)s, now())
+                    ON CONFLICT (job) DO UPDATE
+                    SET state = job_checkpoints.state || jsonb_build_object(
+                            'watermark', %(watermark)s::text,
+                            'runs', COALESCE((job_checkpoints.state->>'runs')::bigint, 0) + 1,
+                            'merged', COALESCE((job_checkpoints.state->>'merged')::bigint, 0) + %(merged)s,
+                            'split', COALESCE((job_checkpoints.state->>'split')::bigint, 0) + %(split)s
+                        ),
+                        updated_at = now();
+                    """,
+                    {"job": job, "watermark": watermark.isoformat(),
+                     "state": Json({"watermark": watermark.isoformat(), "runs": 1,
+                                    "merged": result["merged_events"], "split": result["split_events"]}),
+                     "merged": result["merged_events"], "split": result["split_events"]},
+                )
+            conn.commit()
+    finally:
+        conn.close()
+
+    if not dry_run:
+        after_events_changed(sorted(changed - merged_away))  # 분할/병합으로 멤버가 바뀐 사건 태그 / 신뢰도 갱신
+    for k in ("split_sec", "merge_sec", "finalize_sec"):
+        timings[k] = round(timings[k], 3)
+    result["watermark"] = watermark.isoformat()
+    return result
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.event_maintenance")
+    parser.add_argument("--model", default=None, help="provider 이름 (기본: active 모델)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="바뀐 사건 병합 / 분할 / centroid 재계산")
+    p_run.add_argument("--full", action="store_true", help="watermark 무시하고 lookback 안 사건 전체")
+    p_run.add_argument("--dry-run", action="store_true")
+    p_run.add_argument("--loop", action="store_true", help="interval 마다 반복")
+    p_run.add_argument("--interval", type=float, default=900.0)
+
+    sub.add_parser("status", help="마지막 실행 watermark / 누적 카운터")
+
+    args = parser.parse_args(argv)
+    if args.command == "status":
+        model = get_provider(args.model).name
+        print(json.dumps({"model": model, "checkpoint": load_checkpoint(job_name(model)),
+                          "settings": maintenance_settings()}, ensure_ascii=False, indent=2, default=str))
+        return 0
+
+    while True:
+        result = run_maintenance(args.model, full=args.full, dry_run=args.dry_run)
+        print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+        if not args.loop:
+            return 0
+        args.full = False
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
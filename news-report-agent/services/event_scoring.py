@@ -0,0 +1,284 @@
+# services/event_scoring.py
+# ─────────────────────────────────────────────────────────────────────────────
+# ⚖️ 사건 신뢰도(event_cred) / 충돌(conflicts) 계산 — LLM 프롬프트 대신 집계로
+#   - 한 번의 배치 쿼리: event_articles ⋈ articles ⋈ outlets (사건 순 정렬)
+#   - 사건별 특징 (np.unique / reduceat 로 전 사건 한 번에)
+#       outlets   : 서로 다른 언론사 수          → 1 - exp(-(k-1)/outlet_scale)
+#       countries : 서로 다른 국가 수             → 1 - exp(-(k-1)/country_scale)
+#       time      : 첫 ~ 마지막 게시 시각 간격     → min(1, span / time_full_hours)
+#       cohesion  : 멤버 similarity 평균↑ / 표준편차↓
+#     event_cred = Σ weight × 특징 - conflict_penalty × 충돌 수  (0~1로 자름)
+#   - 충돌 표시 (conflicts)
+#       같은 본문(hash_sha256)인데 게시 시각이 time_conflict_hours 이상 다름
+#       수집 시각보다 늦은 게시 시각 (미래 시각 / 시간대 오류)
+#       게시 시각이 사건 중앙값에서 max_gap_hours 이상 떨어진 기사
+#       제목 수치 불일치 (같은 단위인데 언론사마다 다른 숫자: "10명" vs "12명")
+#       사건 평균과 유사도가 낮은 기사 (low_similarity 미만)
+#
+# 사용:
+#   python -m services.event_scoring run                 # 전체 사건
+#   python -m services.event_scoring run 12 34 --dry-run
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from config import clustering_settings, scoring_settings
+from services.db_services import get_conn
+
+_NUMBER_RE = re.compile(
+    r"(\d[\d,]*(?:\.\d+)?)\s*(%|퍼센트|명|건|채|곳|억|조|만|달러|원|엔|percent|dead|killed|people|injured|"
+    r"billion|million|trillion)",
+    re.IGNORECASE,
+)
+
+DEFAULT_WEIGHTS = {"outlets": 0.45, "countries": 0.15, "time": 0.1, "cohesion": 0.3}
+
+
+def _settings() -> Dict[str, Any]:
+    cfg = scoring_settings()
+    weights = {**DEFAULT_WEIGHTS, **(cfg.get("weights") or {})}
+    return {
+        "weights": weights,
+        "outlet_scale": float(cfg.get("outlet_scale", 2.0)),
+        "country_scale": float(cfg.get("country_scale", 1.5)),
+        "time_full_hours": float(cfg.get("time_full_hours", 6)),
+        "conflict_penalty": float(cfg.get("conflict_penalty", 0.05)),
+        "max_penalty": float(cfg.get("max_penalty", 0.3)),
+        "time_conflict_hours": float(cfg.get("time_conflict_hours", 6)),
+        "future_tolerance_hours": float(cfg.get("future_tolerance_hours", 1)),
+        "low_similarity": float(cfg.get("low_similarity", 0.6)),
+        "max_gap_hours": float(clustering_settings().get("max_gap_hours") or 48),
+    }
+
+
+# ────────────────────────────────
+# 📥 로드
+# ────────────────────────────────
+def _load_rows(event_ids: Optional[List[int]]) -> List[tuple]:
+    """사건 순 정렬된 멤버 행 (한 번의 쿼리, 서버 측 커서)"""
+    rows: List[tuple] = []
+    with get_conn() as conn:
+        with conn.cursor(name="event_scoring_rows") as cur:
+            cur.itersize = 10000
+            cur.execute(
+                """
+                SELECT ea.event_id, ea.article_id, a.outlet_id, o.country_code,
+                       extract(epoch FROM a.published_at)::float8,
+                       extract(epoch FROM a.fetched_at)::float8,
+                       a.hash_sha256, a.title, ea.similarity
+                FROM event_articles ea
+                JOIN articles a ON a.id = ea.article_id
+                LEFT JOIN outlets o ON o.id = a.outlet_id
+                WHERE %(ids)s::bigint[] IS NULL OR ea.event_id = ANY(%(ids)s)
+                ORDER BY ea.event_id, ea.article_id;
+                """,
+                {"ids": event_ids},
+            )
+            rows = list(cur)
+    conn.close()
+    return rows
+
+
+def _distinct_per_group(group: np.ndarray, values: np.ndarray, valid: np.ndarray, n_groups: int) -> np.ndarray:
+    """그룹별 서로 다른 값 개수 (valid=False 인 값은 제외)"""
+    uniq, codes = np.unique(values[valid], return_inverse=True)
+    pairs = np.unique(group[valid] * max(len(uniq), 1) + codes)
+    return np.bincount(pairs // max(len(uniq), 1), minlength=n_groups)
+
+
+# ────────────────────────────────
+# 🚩 충돌
+# ────────────────────────────────
+def _title_numbers(title: str) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for num, unit in _NUMBER_RE.findall(title or ""):
+        out.setdefault(unit.lower(), num.replace(",", ""))
+    return out
+
+
+def _conflicts(sl: slice, article: np.ndarray, outlet: np.ndarray, pub: np.ndarray, fetched: np.ndarray,
+               hashes: List[Optional[str]], titles: List[str], sim: np.ndarray,
+               cfg: Dict[str, Any]) -> List[str]:
+    out: List[str] = []
+    a, o, p, f, s = article[sl], outlet[sl], pub[sl], fetched[sl], sim[sl]
+    hs, ts = hashes[sl], titles[sl]
+
+    # 같은 본문인데 게시 시각이 다름
+    by_hash: Dict[str, List[int]] = {}
+    for k, h in enumerate(hs):
+        if h and not np.isnan(p[k]):
+            by_hash.setdefault(h, []).append(k)
+    for ks in by_hash.values():
+        if len(ks) > 1:
+            lo, hi = min(ks, key=lambda k: p[k]), max(ks, key=lambda k: p[k])
+            gap = (p[hi] - p[lo]) / 3600
+            if gap >= cfg["time_conflict_hours"]:
+                out.append(f"게시 시각 불일치: 같은 본문 기사 {a[lo]}·{a[hi]} ({gap:.1f}h 차이)")
+
+    # 수집 시각보다 늦은 게시 시각
+    ahead = (p - f) / 3600
+    for k in np.nonzero(ahead > cfg["future_tolerance_hours"])[0]:
+        out.append(f"미래 게시 시각: 기사 {a[k]} (수집 {ahead[k]:.1f}h 뒤)")
+
+    # 중앙값에서 멀리 떨어진 게시 시각
+    known = ~np.isnan(p)
+    if known.sum() >= 3:
+        off = np.abs(p - np.median(p[known])) / 3600
+        for k in np.nonzero(known & (off > cfg["max_gap_hours"]))[0]:
+            out.append(f"게시 시각 이상치: 기사 {a[k]} (중앙값과 {off[k]:.0f}h 차이)")
+
+    # 제목 수치 불일치 (언론사가 다른 기사끼리)
+    claims: Dict[str, Dict[str, set]] = {}
+    for k, title in enumerate(ts):
+        for unit, num in _title_numbers(title).items():
+            claims.setdefault(unit, {}).setdefault(num, set()).add(int(o[k]) if o[k] >= 0 else -1 - k)
+    for unit, by_num in sorted(claims.items()):
+        if len(by_num) > 1 and len(set().union(*by_num.values())) > 1:
+            out.append(f"제목 수치 불일치 ({unit}): {' / '.join(sorted(by_num))}")
+
+    # 사건 평균과 거리가 먼 기사
+    for k in np.nonzero(s < cfg["low_similarity"])[0]:
+        out.append(f"낮은 유사도 기사: {a[k]} ({s[k]:.2f})")
+    return out
+
+
+# ────────────────────────────────
+# 🧮 점수
+# ────────────────────────────────
+def score_events(event_ids: Optional[Iterable[int]] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    반환: {"events", "updated", "scores": {event_id: {"event_cred", "conflicts", 특징...}} (최대 20개), "timings"}
+    """
+    cfg = _settings()
+    w = cfg["weights"]
+    ids = None if event_ids is None else sorted({int(e) for e in event_ids})
+    timings: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    rows = _load_rows(ids)
+    timings["load_sec"] = round(time.perf_counter() - t0, 3)
+    if not rows:
+        return {"events": 0, "updated": 0, "scores": {}, "timings": timings}
+
+    t0 = time.perf_counter()
+    event = np.asarray([r[0] for r in rows], np.int64)
+    article = np.asarray([r[1] for r in rows], np.int64)
+    outlet = np.asarray([-1 if r[2] is None else r[2] for r in rows], np.int64)
+    country = np.asarray([r[3] or "" for r in rows], dtype=object).astype(str)
+    pub = np.asarray([np.nan if r[4] is None else r[4] for r in rows], np.float64)
+    fetched = np.asarray([np.nan if r[5] is None else r[5] for r in rows], np.float64)
+    hashes = [r[6] for r in rows]
+    titles = [r[7] or "" for r in rows]
+    sim = np.asarray([np.nan if r[8] is None else r[8] for r in rows], np.float64)
+
+    starts = np.r_[0, np.nonzero(event[1:] != event[:-1])[0] + 1]
+    sizes = np.diff(np.r_[starts, len(event)])
+    event_ids_arr = event[starts]
+    n_ev = len(starts)
+    grp = np.repeat(np.arange(n_ev), sizes)
+
+    n_outlets = _distinct_per_group(grp, outlet, outlet >= 0, n_ev)
+    n_countries = _distinct_per_group(grp, country, country != "", n_ev)
+    ts = np.where(np.isnan(pub), fetched, pub)
+    ts_known = ~np.isnan(ts)
+    t_max = np.maximum.reduceat(np.where(ts_known, ts, -np.inf), starts)
+    t_min = np.minimum.reduceat(np.where(ts_known, ts, np.inf), starts)
+    span_h = np.where(np.isfinite(t_max) & np.isfinite(t_min), (t_max - t_min) / 3600, 0.0)
+    sim_known = ~np.isnan(sim)
+    sim_n = np.add.reduceat(sim_known.astype(np.float64), starts)
+    sim_sum = np.add.reduceat(np.where(sim_known, sim, 0.0), starts)
+    sim_sq = np.add.reduceat(np.where(sim_known, sim * sim, 0.0), starts)
+    sim_mean = np.where(sim_n > 0, sim_sum / np.maximum(sim_n, 1), np.nan)
+    sim_std = np.sqrt(np.maximum(sim_sq / np.maximum(sim_n, 1) - np.nan_to_num(sim_mean) ** 2, 0.0))
+
+    f_outlets = 1 - np.exp(-np.maximum(n_outlets - 1, 0) / cfg["outlet_scale"])
+    f_countries = 1 - np.exp(-np.maximum(n_countries - 1, 0) / cfg["country_scale"])
+    f_time = np.minimum(1.0, span_h / cfg["time_full_hours"])
+    f_cohesion = np.where(np.isnan(sim_mean), 0.5,  # similarity 없는 사건(LLM 생성 등)은 중립
+                          np.clip((np.nan_to_num(sim_mean) - 0.5) / 0.5, 0, 1) * np.clip(1 - sim_std / 0.15, 0, 1))
+    base = (w["outlets"] * f_outlets + w["countries"] * f_countries
+            + w["time"] * f_time + w["cohesion"] * f_cohesion) / max(sum(w.values()), 1e-9)
+
+    conflicts: List[List[str]] = []
+    sim_for_flags = np.where(sim_known, sim, np.inf)
+    for k in range(n_ev):
+        sl = slice(int(starts[k]), int(starts[k] + sizes[k]))
+        conflicts.append(_conflicts(sl, article, outlet, pub, fetched, hashes, titles, sim_for_flags, cfg))
+    penalty = np.minimum(cfg["max_penalty"], cfg["conflict_penalty"] * np.asarray([len(c) for c in conflicts]))
+    cred = np.round(np.clip(base - penalty, 0.0, 1.0), 3)
+    timings["score_sec"] = round(time.perf_counter() - t0, 3)
+
+    updated = 0
+    t0 = time.perf_counter()
+    if not dry_run:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    """
+                    UPDATE events ev SET event_cred = v.cred, conflicts = v.conflicts
+                    FROM (VALUES %s) AS v(event_id, cred, conflicts)
+                    WHERE ev.id = v.event_id
+                      AND (ev.event_cred IS DISTINCT FROM v.cred OR ev.conflicts IS DISTINCT FROM v.conflicts);
+                    """,
+                    [(int(e), float(c), conf or None) for e, c, conf in zip(event_ids_arr, cred, conflicts)],
+                    template="(%s::bigint, %s::real, %s::text[])",
+                    page_size=500,
+                )
+                updated = cur.rowcount
+        conn.close()
+    timings["write_sec"] = round(time.perf_counter() - t0, 3)
+
+    scores = {
+        int(event_ids_arr[k]): {
+            "event_cred": float(cred[k]),
+            "outlets": int(n_outlets[k]),
+            "countries": int(n_countries[k]),
+            "span_hours": round(float(span_h[k]), 1),
+            "similarity_mean": None if np.isnan(sim_mean[k]) else round(float(sim_mean[k]), 3),
+            "similarity_std": round(float(sim_std[k]), 3),
+            "conflicts": conflicts[k],
+        }
+        for k in range(min(n_ev, 20))
+    }
+    return {"events": n_ev, "updated": updated, "scores": scores, "timings": timings}
+
+
+def on_events_changed(event_ids: Iterable[int]) -> None:
+    """클러스터링 / 온라인 배정 / 유지보수가 커밋 직후 호출. scoring.enabled 일 때만, 실패해도 흐름 유지"""
+    event_ids = [e for e in event_ids if e]
+    if not event_ids or not scoring_settings().get("enabled"):
+        return
+    try:
+        score_events(event_ids)
+    except Exception as e:
+        print(f"[event_scoring.on_events_changed] Error: {e}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.event_scoring")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="사건 event_cred / conflicts 계산")
+    p_run.add_argument("event_ids", type=int, nargs="*", help="비우면 전체 사건")
+    p_run.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args(argv)
+    result = score_events(args.event_ids or None, dry_run=args.dry_run)
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+# services/event_tagging.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🏷️ 사건 topic_tags 자동 생성 — TF-IDF (LLM 호출 없음, 결정적)
+#   - 문서 빈도(DF): 기사 단위, term_df 테이블에 새 기사만 증분 반영 (job_checkpoints 'term_df')
+#       articles.df_counted = false 인 기사만 토큰화 → term별 등장 기사 수를 더함, docs(전체 기사 수) 누적
+#       (id 워터마크 대신 기사별 플래그 → 늦게 커밋된 작은 id도 다음 실행에 반영)
+#   - 사건 문서 = 멤버 기사 제목(title_weight배) + 본문 앞부분
+#   - 모든 사건을 한 번에: term을 dict로 정수화 → (사건, term) 정수 키를 np.unique 로 세어 희소 TF 행렬(COO)
+#       score = (1 + log tf) × (log((N + 1) / (df + 1)) + 1)
+#       lexsort(사건, -score) 로 사건별 상위 k개 → 상위 bigram에 포함된 unigram은 생략
+#   - 토큰: 영문/숫자/한글 연속 문자열, 영문 소문자화, 한글은 흔한 조사 제거, 불용어 제외
+#
+# 사용:
+#   python -m services.event_tagging df                 # 문서 빈도 증분 반영만
+#   python -m services.event_tagging tag                # 전체 사건 태그 갱신
+#   python -m services.event_tagging tag 12 34 --dry-run
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from psycopg2.extras import Json, execute_values
+
+from config import tagging_settings
+from services.db_services import get_conn
+
+DF_JOB = "term_df"
+DF_LOCK_KEY = 742_031_003  # DF 증분 반영은 한 번에 하나만 (같은 기사 이중 집계 방지)
+
+_TOKEN_RE = re.compile(r"[0-9a-z가-힣]+(?:[.'&-][0-9a-z가-힣]+)*")
+_JOSA = ("에서는", "으로는", "에서", "으로", "에게", "까지", "부터", "보다", "처럼",
+         "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도", "만")
+STOPWORDS = frozenset("""
+a about after again against all also an and any are as at be because been before being between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his
+how i if in into is it its itself just me more most my no nor not now of off on once only or other our out over
+own same she should so some such than that the their them then there these they this those through to too under
+until up very was we were what when where which while who whom why will with would you your yours
+said says say new news year years also one two three first last may might must per via inc ltd co corp reuters
+according told report reported reporting week month today yesterday monday tuesday wednesday thursday friday
+saturday sunday
+기자 뉴스 연합뉴스 뉴시스 특파원 사진 제공 무단 전재 배포 금지 있다 했다 한다 밝혔다 말했다 전했다 것 수 등 및
+위해 대한 통해 이번 지난 오늘 내일 어제 올해 지난해 때문 관련 가운데 이날 대해 따르면 이후 현재 당시 또한 그리고
+하지만 그러나
+""".split())
+
+
+def _stopwords() -> frozenset:
+    extra = tagging_settings().get("stopwords") or []
+    return STOPWORDS | frozenset(str(w).lower() for w in extra)
+
+
+def _strip_josa(tok: str) -> str:
+    if len(tok) > 2 and "가" <= tok[-1] <= "힣":
+        for j in _JOSA:
+            if tok.endswith(j) and len(tok) - len(j) >= 2:
+                return tok[: -len(j)]
+    return tok
+
+
+def tokenize(text: str, ngram_max: int = 2, stopwords: Optional[frozenset] = None) -> List[str]:
+    """unigram (+ 불용어를 끼지 않은 연속 bigram)"""
+    stop = STOPWORDS if stopwords is None else stopwords
+    raw = [_strip_josa(t) for t in _TOKEN_RE.findall((text or "").lower())]
+    ok = [len(t) >= 2 and not t.isdigit() and t not in stop for t in raw]
+    out = [t for t, good in zip(raw, ok) if good]
+    if ngram_max >= 2:
+        out.extend(f"{a} {b}" for a, b, ga, gb in zip(raw, raw[1:], ok, ok[1:]) if ga and gb)
+    return out
+
+
+# ────────────────────────────────
+# 📊 문서 빈도 (증분)
+# ────────────────────────────────
+def _df_state(cur) -> Dict[str, Any]:
+    cur.execute("SELECT state FROM job_checkpoints WHERE job = %s;", (DF_JOB,))
+    row = cur.fetchone()
+    return dict(row[0]) if row else {}
+
+
+def update_df(batch_size: Optional[int] = None, max_batches: Optional[int] = None) -> Dict[str, Any]:
+    """
+    아직 반영 안 된(df_counted = false) 기사를 id 순 배치로 읽어 term_df 에 더함.
+    배치마다 한 트랜잭션 (advisory lock 안에서 term_df upsert → df_counted 표시 → checkpoint 저장)
+    반환: {"articles", "batches", "terms_upserted", "docs", "last_id"(반영한 최대 id, 참고용)}
+    """
+    cfg = tagging_settings()
+    batch_size = int(batch_size or cfg.get("df_batch_size", 1000))
+    ngram_max = int(cfg.get("ngram_max", 2))
+    body_chars = int(cfg.get("body_chars", 3000))
+    stop = _stopwords()
+
+    articles = batches = upserted = 0
+    state: Dict[str, Any] = {}
+    while max_batches is None or batches < max_batches:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s);", (DF_LOCK_KEY,))
+                state = _df_state(cur)
+                cur.execute(
+                    """
+                    SELECT a.id, a.title, left(COALESCE(b.body, ''), %s)
+                    FROM articles a
+                    LEFT JOIN article_bodies b ON b.article_id = a.id
+                    WHERE NOT a.df_counted
+                    ORDER BY a.id
+                    LIMIT %s;
+                    """,
+                    (body_chars, batch_size),
+                )
+                rows = cur.fetchall()
+                df: Counter = Counter()
+                for _, title, body in rows:
+                    df.update(set(tokenize(f"{title or ''}\n{body}", ngram_max, stop)))
+                if rows:
+                    if df:
+                        execute_values(
+                            cur,
+                            """
+                            INSERT INTO term_df (term, df) VALUES %s
+                            ON CONFLICT (term) DO UPDATE
+                            SET df = term_df.df + EXCLUDED.df, updated_at = now();
+                            """,
+                            sorted(df.items()),
+                            page_size=1000,
+                        )
+                    # 행 잠금은 커밋 직전 이 UPDATE부터 → persist upsert를 막는 시간은 짧음
+                    cur.execute("UPDATE articles SET df_counted = true WHERE id = ANY(%s);",
+                                ([r[0] for r in rows],))
+                    state = {"last_id": max(int(state.get("last_id", 0)), rows[-1][0]),
+                             "docs": int(state.get("docs", 0)) + len(rows)}
+                    cur.execute(
+                        """
+                        INSERT INTO job_checkpoints (job, state, updated_at) VALUES (%s, %s, now())
+                        ON CONFLICT (job) DO UPDATE SET state = job_checkpoints.state || EXCLUDED.state,
+                                                        updated_at = now();
+                        """,
+                        (DF_JOB, Json(state)),
+                    )
+        conn.close()
+        if not rows:
+            break
+        batches += 1
+        articles += len(rows)
+        upserted += len(df)
+    return {"articles": articles, "batches": batches, "terms_upserted": upserted,
+            "docs": int(state.get("docs", 0)), "last_id": int(state.get("last_id", 0))}
+
+
+# ────────────────────────────────
+# 🏷️ 태그
+# ────────────────────────────────
+def top_terms(doc_index: np.ndarray,
+              term_index: np.ndarray,
+              terms: List[str],
+              df_lookup: Dict[str, int],
+              n_docs: int,
+              top_k: int = 5,
+              min_df: int = 2,
+              max_df_ratio: float = 0.3) -> Dict[int, List[str]]:
+    """
+    토큰 i 는 문서 doc_index[i] 의 term terms[term_index[i]] (term 문자열은 dict로 미리 정수화 —
+    문자열 정렬 없이 정수 키만 np.unique).
+    반환: {문서 번호: 상위 태그} — TF-IDF 계산과 순위는 전부 numpy 벡터 연산
+    """
+    if not len(term_index):
+        return {}
+    n_terms = len(terms)
+    keys, tf = np.unique(doc_index.astype(np.int64) * n_terms + term_index, return_counts=True)
+    doc, term = keys // n_terms, keys % n_terms
+
+    df = np.asarray([df_lookup.get(t, 0) for t in terms], np.float64)
+    idf = np.log((n_docs + 1) / (df + 1)) + 1.0
+    usable = (df >= min_df) & (df <= max(1.0, max_df_ratio * n_docs))
+    score = (1.0 + np.log(tf)) * idf[term]
+    keep = usable[term]
+    doc, term, score = doc[keep], term[keep], score[keep]
+
+    order = np.lexsort((term, -score, doc))  # 동점이면 처음 나온 term 순 → 결정적
+    doc, term = doc[order], term[order]
+    starts = np.r_[0, np.nonzero(doc[1:] != doc[:-1])[0] + 1] if len(doc) else np.zeros(0, np.int64)
+    rank = np.arange(len(doc)) - np.repeat(starts, np.diff(np.r_[starts, len(doc)]))
+    cand = rank < top_k * 3  # bigram 중복 제거 여유분
+
+    out: Dict[int, List[str]] = {}
+    for d, t in zip(doc[cand].tolist(), term[cand].tolist()):
+        tags = out.setdefault(d, [])
+        if len(tags) >= top_k:
+            continue
+        word = str(terms[t])
+        if " " not in word and any(word in tag.split(" ") for tag in tags):
+            continue  # 이미 뽑힌 bigram의 일부
+        tags.append(word)
+    return out
+
+
+def tag_events(event_ids: Optional[Iterable[int]] = None,
+               top_k: Optional[int] = None,
+               dry_run: bool = False,
+               refresh_df: bool = True) -> Dict[str, Any]:
+    """
+    event_ids(없으면 전체) 사건의 topic_tags 를 TF-IDF 상위 top_k 로 갱신.
+    반환: {"events", "updated", "df", "tags": {event_id: [...]} (최대 20개), "timings"}
+    """
+    cfg = tagging_settings()
+    top_k = int(top_k or cfg.get("top_k", 5))
+    ngram_max = int(cfg.get("ngram_max", 2))
+    title_weight = int(cfg.get("title_weight", 3))
+    body_chars = int(cfg.get("body_chars", 3000))
+    stop = _stopwords()
+    ids = None if event_ids is None else sorted({int(e) for e in event_ids})
+    timings: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    df_result = update_df() if refresh_df and not dry_run else None
+    timings["df_sec"] = round(time.perf_counter() - t0, 3)
+
+    t0 = time.perf_counter()
+    event_order: List[int] = []
+    doc_index: List[int] = []
+    term_index: List[int] = []
+    vocab: Dict[str, int] = {}
+    with get_conn() as conn:
+        with conn.cursor(name="event_tagging_docs") as cur:
+            cur.itersize = 5000
+            cur.execute(
+                """
+                SELECT ea.event_id, a.title, left(COALESCE(b.body, ''), %(chars)s)
+                FROM event_articles ea
+                JOIN articles a ON a.id = ea.article_id
+                LEFT JOIN article_bodies b ON b.article_id = a.id
+                WHERE %(ids)s::bigint[] IS NULL OR ea.event_id = ANY(%(ids)s)
+                ORDER BY ea.event_id, a.id;
+                """,
+                {"chars": body_chars, "ids": ids},
+            )
+            for event_id, title, body in cur:
+                if not event_order or event_order[-1] != event_id:
+                    event_order.append(event_id)
+                toks = tokenize(title or "", ngram_max, stop) * title_weight + tokenize(body, ngram_max, stop)
+                term_index.extend(vocab.setdefault(t, len(vocab)) for t in toks)
+                doc_index.extend([len(event_order) - 1] * len(toks))
+        with conn.cursor() as cur:
+            state = _df_state(cur)
+            terms = list(vocab)
+            cur.execute("SELECT term, df FROM term_df WHERE term = ANY(%s);", (terms,))
+            df_lookup = dict(cur.fetchall())
+    conn.close()
+    timings["load_sec"] = round(time.perf_counter() - t0, 3)
+
+    t0 = time.perf_counter()
+    picked = top_terms(np.asarray(doc_index, np.int64), np.asarray(term_index, np.int64), terms, df_lookup,
+                       int(state.get("docs", 0)), top_k,
+                       int(cfg.get("min_df", 2)), float(cfg.get("max_df_ratio", 0.3)))
+    tags = {event_order[d]: t for d, t in picked.items()}
+    timings["score_sec"] = round(time.perf_counter() - t0, 3)
+
+    updated = 0
+    t0 = time.perf_counter()
+    if tags and not dry_run:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    """
+                    UPDATE events ev SET topic_tags = v.tags
+                    FROM (VALUES %s) AS v(event_id, tags)
+                    WHERE ev.id = v.event_id AND ev.topic_tags IS DISTINCT FROM v.tags;
+                    """,
+                    sorted(tags.items()),
+                    template="(%s::bigint, %s::text[])",
+                    page_size=500,
+                )
+                updated = cur.rowcount
+        conn.close()
+    timings["write_sec"] = round(time.perf_counter() - t0, 3)
+
+    return {"events": len(event_order), "updated": updated, "df": df_result,
+            "tags": dict(list(tags.items())[:20]), "timings": timings}
+
+
+def on_events_changed(event_ids: Iterable[int]) -> None:
+    """클러스터링 / 온라인 배정 / 유지보수가 커밋 직후 호출. tagging.enabled 일 때만, 실패해도 흐름 유지"""
+    event_ids = [e for e in event_ids if e]
+    if not event_ids or not tagging_settings().get("enabled"):
+        return
+    try:
+        tag_events(event_ids)
+    except Exception as e:
+        print(f"[event_tagging.on_events_changed] Error: {e}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.event_tagging")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_df = sub.add_parser("df", help="새 기사 문서 빈도 증분 반영")
+    p_df.add_argument("--batch-size", type=int, default=None)
+
+    p_tag = sub.add_parser("tag", help="사건 topic_tags 갱신")
+    p_tag.add_argument("event_ids", type=int, nargs="*", help="비우면 전체 사건")
+    p_tag.add_argument("--top-k", type=int, default=None)
+    p_tag.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.command == "df":
+        print(json.dumps(update_df(args.batch_size), ensure_ascii=False, indent=2))
+        return 0
+    result = tag_events(args.event_ids or None, args.top_k, dry_run=args.dry_run)
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,7 +9,7 @@ import random
 import re
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from urllib.parse import urlparse, urlunparse
 
 # Third-party
@@ -405,9 +405,25 @@ def pick_scraper(url: str):
 # ─────────────────────────────────────────────────────────────────────────────
 # 4) fetch_scrape — RSS 여러 개 → 허브 필터 → 도메인별 스크레이퍼 병렬 크롤
 # ─────────────────────────────────────────────────────────────────────────────
-def fetch_scrape(feeds: List[str]) -> str:
+def _emit_article(on_article: Callable[[dict], None], raw: str, errors: List[dict]) -> None:
+    """스크랩 결과 하나를 파싱해 콜백으로 전달. 콜백 실패가 크롤링을 멈추지 않도록 errors에만 기록."""
+    try:
+        art = json.loads(raw)
+    except json.JSONDecodeError:
+        return
+    if not isinstance(art, dict):
+        return
+    art["published_date_source"] = "rss" if art.get("published_date") else None
+    try:
+        on_article(art)
+    except Exception as e:
+        errors.append({"url": art.get("url"), "error": f"on_article: {e}"})
+
+def fetch_scrape(feeds: List[str],
+                 on_article: Optional[Callable[[dict], None]] = None) -> str:
     """
     입력: RSS feed URL 리스트
+          on_article: (선택) 기사 하나가 스크랩 완료될 때마다 호출되는 콜백
     출력: json.dumps({
        "requested": N,
        "success": len(articles),
@@ -457,6 +473,11 @@ def fetch_scrape(feeds: List[str]) -> str:
                 url = futures[fut]
                 errors.append({"url": url, "error": str(e)})
                 print(f"❌ {futures[fut]} 실패:", e)
+                continue
+
+            # 완료되는 즉시 흘려보냄 (write-behind 저장 등)
+            if on_article is not None:
+                _emit_article(on_article, article, errors)
 
     # JSON 파싱
     articles: List[dict] = []
@@ -0,0 +1,250 @@
+# services/lsh.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🪣 LSH blocking (random hyperplane, cosine) — 전체 쌍 비교 없이 후보 쌍만 생성
+#   - table 하나 = 랜덤 초평면 n_bits개의 부호 패턴 (n_bits-bit 코드)
+#   - 같은 코드(bucket)에 들어간 기사끼리만 후보 쌍 → n_tables개 table의 합집합
+#   - cosine s 인 쌍이 한 table에서 만날 확률 p = (1 - arccos(s)/π)^n_bits
+#     후보가 될 확률(recall) = 1 - (1 - p)^n_tables   → tune()으로 목표 recall에 맞춰 table 수 결정
+#   - n_bits 는 기사 수에 맞춰 늘림 (auto_bits: ≈ log2(n) + 1)
+#     → 무관한 쌍의 충돌이 table당 ~n/4 로 유지, table 수는 n^ρ (ρ = ln(1/p)/ln 2 ≈ 0.28 @0.85)
+#       전체 비용 ~ n^(1+ρ)   (n_bits 고정이면 무관한 쌍 충돌이 n² 로 늘어남)
+#   - bucket 안에서는 (게시 시각 순) 이웃 max_bucket개까지만 짝지음
+#     → 후보 수 ≤ n × n_tables × max_bucket, 거대 bucket이 생겨도 거의 선형
+#   - 실제 recall은 measure_recall()로 정확 검색(event_clustering 타일 행렬곱)과 비교
+#
+#   사용처: event_clustering.similar_pairs(blocking="lsh"), 근중복 탐지 후보 생성
+#
+# 사용:
+#   python -m services.lsh tune --threshold 0.85 --recall 0.95 --rows 300000
+#   python -m services.lsh measure --hours 168 --sample 5000
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import clustering_settings
+
+
+# ────────────────────────────────
+# 📐 이론 recall / 파라미터 선택
+# ────────────────────────────────
+def collision_prob(sim: float, n_bits: int) -> float:
+    """cosine sim 인 두 벡터가 한 table에서 같은 bucket에 들어갈 확률"""
+    theta = math.acos(max(-1.0, min(1.0, sim)))
+    return (1.0 - theta / math.pi) ** n_bits
+
+
+def expected_recall(sim: float, n_bits: int, n_tables: int) -> float:
+    return 1.0 - (1.0 - collision_prob(sim, n_bits)) ** n_tables
+
+
+def tune(threshold: float, target_recall: float = 0.95, n_bits: int = 14) -> Dict[str, Any]:
+    """
+    threshold 경계의 쌍을 target_recall 확률로 후보에 넣는 최소 table 수.
+    (threshold보다 더 비슷한 쌍은 recall이 더 높음)
+    """
+    p = collision_prob(threshold, n_bits)
+    n_tables = max(1, math.ceil(math.log(1.0 - target_recall) / math.log(1.0 - p))) if p < 1 else 1
+    return {
+        "n_bits": n_bits,
+        "n_tables": n_tables,
+        "recall_at_threshold": round(expected_recall(threshold, n_bits, n_tables), 4),
+        # 무관한 쌍(cosine 0.0 / 0.3)이 후보가 되는 비율 → 검증 비용의 대략적 지표
+        "candidate_rate_sim_0.0": expected_recall(0.0, n_bits, n_tables),
+        "candidate_rate_sim_0.3": expected_recall(0.3, n_bits, n_tables),
+    }
+
+
+def auto_bits(n: int, min_bits: int = 8, max_bits: int = 24) -> int:
+    """table당 bucket 수 ≈ 2n → 무관한 기사끼리의 bucket 충돌을 기사 수에 비례하게 유지"""
+    return int(min(max_bits, max(min_bits, math.ceil(math.log2(max(n, 2))) + 1)))
+
+
+# ────────────────────────────────
+# 🪣 signature / bucket
+# ────────────────────────────────
+class HyperplaneLSH:
+    """
+    사용:
+        lsh = HyperplaneLSH(dim=256, n_bits=18, n_tables=98)
+        i, j = lsh.candidate_pairs(mat, max_bucket=256)
+    seed 고정 → 같은 입력이면 같은 후보 (결정적)
+    """
+
+    def __init__(self, dim: int, n_bits: int = 14, n_tables: int = 32, seed: int = 0) -> None:
+        if not 0 < n_bits <= 62:
+            raise ValueError("n_bits must be in 1..62")
+        self.dim = dim
+        self.n_bits = n_bits
+        self.n_tables = n_tables
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((dim, n_tables * n_bits)).astype(np.float32)
+        self._weights = (np.int64(1) << np.arange(n_bits, dtype=np.int64))
+
+    def signatures(self, mat: np.ndarray, chunk: int = 16384) -> np.ndarray:
+        """(n × dim) → (n × n_tables) int64 bucket 코드"""
+        out = np.empty((len(mat), self.n_tables), np.int64)
+        for c0 in range(0, len(mat), chunk):
+            bits = (mat[c0:c0 + chunk] @ self.planes) > 0
+            bits = bits.reshape(-1, self.n_tables, self.n_bits)
+            out[c0:c0 + chunk] = bits.astype(np.int64) @ self._weights
+        return out
+
+    def candidate_pairs(self, mat: np.ndarray, max_bucket: int = 256,
+                        codes: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """모든 table의 후보 쌍 합집합 (i < j, 중복 제거)"""
+        if codes is None:
+            codes = self.signatures(mat)
+        return bucket_pairs(codes, max_bucket)
+
+
+def bucket_pairs(codes: np.ndarray, max_bucket: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    codes: (n × n_tables) bucket 코드 (LSH band 해시 등 무엇이든).
+    table마다 (코드, index) 순 정렬 후 offset d = 1..max_bucket-1 만큼 떨어진 원소끼리
+    코드가 같으면 짝 → bucket 안의 pair 생성을 파이썬 루프 없이 offset 단위로 벡터화.
+    index 순서 = 입력 순서(게시 시각 순이면 시간상 가까운 기사끼리 짝지음).
+    """
+    n = len(codes)
+    if n < 2:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    keys: List[np.ndarray] = []
+    for t in range(codes.shape[1]):
+        order = np.argsort(codes[:, t], kind="stable")  # 같은 코드 안에서는 입력 순서 유지
+        c = codes[order, t]
+        for d in range(1, max_bucket):
+            same = c[:-d] == c[d:]
+            if not same.any():
+                break
+            a, b = order[:-d][same], order[d:][same]
+            keys.append(np.minimum(a, b) * n + np.maximum(a, b))
+    if not keys:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    uniq = np.unique(np.concatenate(keys))
+    return uniq // n, uniq % n
+
+
+def verify_pairs(mat: np.ndarray, i: np.ndarray, j: np.ndarray, threshold: float,
+                 chunk: int = 65536) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """후보 쌍을 원래 벡터로 정확히 계산해 threshold 이상만 남김"""
+    sims = np.empty(len(i), np.float32)
+    for c0 in range(0, len(i), chunk):  # 행 gather 메모리 제한
+        c1 = c0 + chunk
+        sims[c0:c1] = np.einsum("ij,ij->i", mat[i[c0:c1]], mat[j[c0:c1]])
+    keep = sims >= threshold
+    return i[keep], j[keep], sims[keep]
+
+
+def lsh_settings(threshold: float, n_rows: int) -> Dict[str, Any]:
+    """
+    crew_settings.yaml clustering.lsh
+      n_bits 미지정 → auto_bits(n_rows), n_tables 미지정 → target_recall 로 tune
+    """
+    cfg = dict(clustering_settings().get("lsh") or {})
+    n_bits = int(cfg.get("n_bits") or auto_bits(n_rows))
+    n_tables = cfg.get("n_tables") or tune(threshold, float(cfg.get("target_recall", 0.95)), n_bits)["n_tables"]
+    return {"n_bits": n_bits, "n_tables": int(n_tables), "max_bucket": int(cfg.get("max_bucket", 256)),
+            "seed": int(cfg.get("seed", 0))}
+
+
+# ────────────────────────────────
+# 📏 recall 측정
+# ────────────────────────────────
+def measure_recall(mat: np.ndarray,
+                   threshold: float,
+                   n_bits: int,
+                   n_tables: int,
+                   max_bucket: int = 256,
+                   sample: Optional[int] = None,
+                   seed: int = 0) -> Dict[str, Any]:
+    """
+    정확한 쌍(타일 행렬곱) 대비 LSH 쌍 recall / 후보 수 / 시간.
+    sample: 행이 많으면 앞에서부터 sample개만 사용 (정확 검색이 n²이므로)
+    """
+    from services.event_clustering import similar_pairs
+
+    if sample and len(mat) > sample:
+        mat = mat[:sample]
+    t0 = time.perf_counter()
+    ei, ej, _ = similar_pairs(mat, threshold, blocking="exact")
+    t_exact = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    lsh = HyperplaneLSH(mat.shape[1], n_bits, n_tables, seed)
+    ci, cj = lsh.candidate_pairs(mat, max_bucket)
+    li, lj, _ = verify_pairs(mat, ci, cj, threshold)
+    t_lsh = time.perf_counter() - t0
+
+    n = len(mat)
+    found = np.isin(ei * n + ej, li * n + lj)
+    return {
+        "n": n,
+        "threshold": threshold,
+        "n_bits": n_bits,
+        "n_tables": n_tables,
+        "max_bucket": max_bucket,
+        "exact_pairs": int(len(ei)),
+        "lsh_pairs": int(len(li)),
+        "recall": round(float(found.mean()) if len(ei) else 1.0, 4),
+        "expected_recall_at_threshold": round(expected_recall(threshold, n_bits, n_tables), 4),
+        "candidates": int(len(ci)),
+        "candidate_fraction": round(len(ci) / max(1, n * (n - 1) // 2), 6),
+        "exact_sec": round(t_exact, 3),
+        "lsh_sec": round(t_lsh, 3),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.lsh")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_tune = sub.add_parser("tune", help="목표 recall에 맞는 table 수 계산")
+    p_tune.add_argument("--threshold", type=float, default=None)
+    p_tune.add_argument("--recall", type=float, default=0.95)
+    p_tune.add_argument("--bits", type=int, default=None)
+    p_tune.add_argument("--rows", type=int, default=100_000, help="--bits 미지정 시 auto_bits 기준 기사 수")
+
+    p_measure = sub.add_parser("measure", help="DB 윈도우에서 정확 검색 대비 recall 측정")
+    p_measure.add_argument("--hours", type=float, default=72)
+    p_measure.add_argument("--threshold", type=float, default=None)
+    p_measure.add_argument("--bits", type=int, default=None)
+    p_measure.add_argument("--tables", type=int, default=None)
+    p_measure.add_argument("--max-bucket", type=int, default=None)
+    p_measure.add_argument("--sample", type=int, default=20000)
+    p_measure.add_argument("--model", default=None)
+
+    args = parser.parse_args(argv)
+    threshold = float(args.threshold if args.threshold is not None
+                      else clustering_settings().get("threshold", 0.85))
+    if args.command == "tune":
+        print(json.dumps(tune(threshold, args.recall, args.bits or auto_bits(args.rows)), indent=2))
+        return 0
+
+    from datetime import datetime, timedelta, timezone
+
+    from services.embedding_providers import get_provider
+    from services.event_clustering import load_window
+
+    provider = get_provider(args.model)
+    since = datetime.now(timezone.utc) - timedelta(hours=args.hours)
+    _, _, mat, _ = load_window(provider.name, provider.dim, since, unassigned_only=False)
+    cfg = lsh_settings(threshold, min(len(mat), args.sample or len(mat)))
+    n_bits = args.bits or cfg["n_bits"]
+    n_tables = args.tables or (cfg["n_tables"] if args.bits is None else tune(threshold, 0.95, n_bits)["n_tables"])
+    result = measure_recall(mat, threshold, n_bits, n_tables, args.max_bucket or cfg["max_bucket"], args.sample)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
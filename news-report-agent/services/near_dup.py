@@ -0,0 +1,342 @@
+# services/near_dup.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🪞 거의 같은 본문(통신사 전재 등) 기사 탐지 — MinHash + LSH band
+#   - persist_articles 직후 본문 word shingle → MinHash 서명 (numpy, num_perm개 해시 최소값)
+#   - 서명을 bands개 band로 나눠 band별 해시 → article_minhash.bands (GIN, && 로 후보 조회)
+#   - 후보는 서명 일치 비율(= 추정 Jaccard) ≥ threshold 일 때만 중복 확정
+#     같은 배치 안 후보는 lsh.bucket_pairs 로 (band 코드 = bucket 코드)
+#   - 중복 기사 → articles.duplicate_of = canonical (가장 먼저 저장된 기사, 체인 없이 항상 root)
+#       embedding_service: canonical 벡터 복사 (API 호출 없음)
+#       event_clustering: 클러스터링 대상에서 빼고 canonical의 사건에 바로 연결 → 언론사 수(coverage)에 포함
+#
+# 사용:
+#   python -m services.near_dup status
+#   python -m services.near_dup rebuild --hours 168   # 설정 변경 후 서명 재계산
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from config import near_dup_settings
+from services.db_services import get_conn
+from services.lsh import bucket_pairs
+
+# 동시에 여러 수집 배치가 서로를 canonical로 가리키지 않도록 링크 단계는 한 번에 하나만
+NEAR_DUP_LOCK_KEY = 742_031_004
+
+_WORD_RE = re.compile(r"\w+")
+_MERSENNE = (1 << 61) - 1
+
+
+def _settings() -> Dict[str, Any]:
+    cfg = near_dup_settings()
+    bands = int(cfg.get("bands", 16))
+    num_perm = int(cfg.get("num_perm", 128))
+    if num_perm % bands:
+        raise ValueError(f"near_dup.num_perm ({num_perm}) must be a multiple of bands ({bands})")
+    return {
+        "enabled": bool(cfg.get("enabled", True)),
+        "shingle_size": int(cfg.get("shingle_size", 5)),
+        "num_perm": num_perm,
+        "bands": bands,
+        "threshold": float(cfg.get("threshold", 0.8)),
+        "min_tokens": int(cfg.get("min_tokens", 50)),
+        "body_chars": int(cfg.get("body_chars", 20000)),
+        "lookback_hours": float(cfg.get("lookback_hours", 168)),
+        "seed": int(cfg.get("seed", 1)),
+    }
+
+
+@lru_cache(maxsize=4)
+def _permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """h_k(x) = (a_k·x + b_k) mod (2^61 - 1) 의 계수 — seed 고정이라 저장된 서명과 항상 같은 해시"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _MERSENNE, num_perm, dtype=np.uint64)
+    b = rng.integers(0, _MERSENNE, num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingles(text: str, k: int = 5) -> np.ndarray:
+    """소문자 단어 k-gram의 crc32 (중복 제거, uint64)"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < k:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + k]) for i in range(len(words) - k + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), np.uint64, len(grams)))
+
+
+def minhash(hashes: np.ndarray, num_perm: int = 128, seed: int = 1) -> np.ndarray:
+    """(uint32 × num_perm) 서명. 곱셈은 uint64에서 wrap-around (결정적이면 충분)"""
+    a, b = _permutations(num_perm, seed)
+    if not len(hashes):
+        return np.full(num_perm, 0xFFFFFFFF, np.uint32)
+    with np.errstate(over="ignore"):
+        h = (np.outer(hashes, a) + b) % np.uint64(_MERSENNE)
+    return (h & np.uint64(0xFFFFFFFF)).min(axis=0).astype(np.uint32)
+
+
+def band_keys(sig: np.ndarray, bands: int) -> List[int]:
+    """band마다 (band 번호 + 행 값) 해시 → signed int64 (bigint[] 저장용, band 간 충돌 없음)"""
+    rows = sig.astype("<u4").reshape(bands, -1)
+    return [int.from_bytes(hashlib.blake2b(bytes([i]) + r.tobytes(), digest_size=8).digest(), "little", signed=True)
+            for i, r in enumerate(rows)]
+
+
+def jaccard(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """서명 일치 비율 = Jaccard 추정값"""
+    return float(np.mean(sig_a == sig_b))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# canonical 링크
+# ─────────────────────────────────────────────────────────────────────────────
+def link_duplicates(rows: Sequence[Tuple[int, str]], cfg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    rows: [(article_id, body)] — 새로 저장/갱신된 기사.
+    서명 저장 + duplicate_of 설정 (매칭 없으면 NULL로 되돌림, 본문이 바뀌어 더 이상 중복이 아닌 경우).
+    반환: {"signed", "duplicates": {article_id: canonical_id}, "timings"}
+    """
+    cfg = cfg or _settings()
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    ids: List[int] = []
+    sigs: List[np.ndarray] = []
+    for article_id, body in sorted(rows, key=lambda r: r[0]):  # id 순 = 저장 순 → 먼저 온 기사가 canonical
+        text = (body or "")[: cfg["body_chars"]]
+        if len(_WORD_RE.findall(text)) < cfg["min_tokens"]:
+            continue
+        ids.append(int(article_id))
+        sigs.append(minhash(shingles(text, cfg["shingle_size"]), cfg["num_perm"], cfg["seed"]))
+    timings["signature_sec"] = round(time.perf_counter() - t0, 3)
+    result: Dict[str, Any] = {"signed": len(ids), "duplicates": {}, "timings": timings}
+    if not ids:
+        return result
+
+    keys = np.asarray([band_keys(s, cfg["bands"]) for s in sigs], np.int64)
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=cfg["lookback_hours"])
+    threshold = cfg["threshold"]
+
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s);", (NEAR_DUP_LOCK_KEY,))
+
+            # 1) DB 후보: band 하나라도 같은 최근 기사 (GIN &&) → root = duplicate_of 또는 자기 자신
+            t0 = time.perf_counter()
+            cur.execute(
+                """
+                SELECT m.article_id, m.signature, m.bands, COALESCE(a.duplicate_of, a.id)
+                FROM article_minhash m
+                JOIN articles a ON a.id = m.article_id
+                WHERE m.bands && %s::bigint[]
+                  AND m.article_id <> ALL(%s)
+                  AND a.fetched_at >= %s;
+                """,
+                (np.unique(keys).tolist(), ids, cutoff),
+            )
+            by_key: Dict[int, List[int]] = {}
+            db_sigs: List[np.ndarray] = []
+            db_roots: List[int] = []
+            for n, (_, sig, bands, root) in enumerate(cur.fetchall()):
+                db_sigs.append(np.frombuffer(bytes(sig), "<u4"))
+                db_roots.append(int(root))
+                for k in bands:
+                    by_key.setdefault(int(k), []).append(n)
+            timings["lookup_sec"] = round(time.perf_counter() - t0, 3)
+
+            # 2) 배치 안 후보 (band 코드가 같은 쌍) → 앞선 기사 → 뒤 기사 방향
+            t0 = time.perf_counter()
+            i, j = bucket_pairs(keys, max_bucket=len(ids))
+            earlier: Dict[int, List[int]] = {}
+            for a, b in zip(i.tolist(), j.tolist()):
+                if jaccard(sigs[a], sigs[b]) >= threshold:
+                    earlier.setdefault(max(a, b), []).append(min(a, b))
+
+            roots: List[int] = []
+            duplicate_of: List[Optional[int]] = []
+            for x, article_id in enumerate(ids):
+                cands = {c for k in keys[x].tolist() for c in by_key.get(k, ())}
+                found = {db_roots[c] for c in cands if jaccard(sigs[x], db_sigs[c]) >= threshold}
+                found |= {roots[e] for e in earlier.get(x, ())}
+                found.discard(article_id)
+                root = min(found) if found else None
+                duplicate_of.append(root)
+                roots.append(root if root is not None else article_id)
+            timings["match_sec"] = round(time.perf_counter() - t0, 3)
+
+            # 3) 저장: 서명 upsert + duplicate_of (이 기사를 root로 가리키던 기사는 새 root로 옮겨 체인 방지)
+            t0 = time.perf_counter()
+            execute_values(
+                cur,
+                """
+                INSERT INTO article_minhash (article_id, signature, bands)
+                VALUES %s
+                ON CONFLICT (article_id) DO UPDATE
+                SET signature = EXCLUDED.signature, bands = EXCLUDED.bands, created_at = now();
+                """,
+                [(a, s.astype("<u4").tobytes(), k) for a, s, k in zip(ids, sigs, keys.tolist())],
+                template="(%s, %s, %s::bigint[])",
+                page_size=500,
+            )
+            execute_values(
+                cur,
+                """
+                UPDATE articles a
+                SET duplicate_of = v.dup
+                FROM (VALUES %s) AS v(id, dup)
+                WHERE a.id = v.id AND a.duplicate_of IS DISTINCT FROM v.dup;
+                """,
+                list(zip(ids, duplicate_of)),
+                template="(%s::bigint, %s::bigint)",
+                page_size=500,
+            )
+            moved = [(a, d) for a, d in zip(ids, duplicate_of) if d is not None]
+            if moved:
+                execute_values(
+                    cur,
+                    """
+                    UPDATE articles a
+                    SET duplicate_of = v.root
+                    FROM (VALUES %s) AS v(old_root, root)
+                    WHERE a.duplicate_of = v.old_root;
+                    """,
+                    moved,
+                    template="(%s::bigint, %s::bigint)",
+                )
+        conn.commit()
+        timings["write_sec"] = round(time.perf_counter() - t0, 3)
+    finally:
+        conn.close()
+
+    result["duplicates"] = {a: d for a, d in zip(ids, duplicate_of) if d is not None}
+    return result
+
+
+def on_articles_stored(rows: Sequence[Tuple[int, str]]) -> Optional[Dict[str, Any]]:
+    """persist_articles가 커밋 직후 호출. near_dup.enabled 일 때만, 실패해도 저장 흐름 유지"""
+    if not rows:
+        return None
+    try:
+        cfg = _settings()
+        if not cfg["enabled"]:
+            return None
+        return link_duplicates(rows, cfg)
+    except Exception as e:
+        print(f"[on_articles_stored] Error: {e}")
+        return None
+
+
+def coverage(article_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    canonical 기사별 전재 현황 (자기 자신 포함).
+    반환: {canonical_id: {"articles": n, "outlets": n, "outlet_names": [...]}}
+    """
+    if not article_ids:
+        return {}
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT COALESCE(a.duplicate_of, a.id) AS root, count(*),
+                   count(DISTINCT a.outlet_id), array_agg(DISTINCT o.name)
+            FROM articles a
+            LEFT JOIN outlets o ON o.id = a.outlet_id
+            WHERE COALESCE(a.duplicate_of, a.id) = ANY(%s)
+            GROUP BY root;
+            """,
+            (list(article_ids),),
+        )
+        rows = cur.fetchall()
+    conn.close()
+    return {r[0]: {"articles": r[1], "outlets": r[2], "outlet_names": [n for n in r[3] if n]} for r in rows}
+
+
+def rebuild(hours: Optional[float] = None, batch_size: int = 1000) -> Dict[str, Any]:
+    """최근 hours(기본 lookback_hours) 기사 서명을 id 순 배치로 다시 계산 (설정 변경 후)"""
+    cfg = _settings()
+    since = datetime.now(timezone.utc) - timedelta(hours=float(hours or cfg["lookback_hours"]))
+    last_id, signed, duplicates, batches = 0, 0, 0, 0
+    while True:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT a.id, b.body
+                FROM articles a
+                JOIN article_bodies b ON b.article_id = a.id
+                WHERE a.fetched_at >= %s AND a.id > %s
+                ORDER BY a.id
+                LIMIT %s;
+                """,
+                (since, last_id, batch_size),
+            )
+            rows = cur.fetchall()
+        conn.close()
+        if not rows:
+            break
+        res = link_duplicates(rows, cfg)
+        last_id = rows[-1][0]
+        signed += res["signed"]
+        duplicates += len(res["duplicates"])
+        batches += 1
+    return {"since": since, "batches": batches, "signed": signed, "duplicates": duplicates}
+
+
+def status(top: int = 10) -> Dict[str, Any]:
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM article_minhash;")
+        signed = cur.fetchone()[0]
+        cur.execute(
+            """
+            SELECT a.duplicate_of, c.title, count(*) + 1 AS copies, count(DISTINCT a.outlet_id) AS outlets
+            FROM articles a
+            JOIN articles c ON c.id = a.duplicate_of
+            WHERE a.duplicate_of IS NOT NULL
+            GROUP BY a.duplicate_of, c.title
+            ORDER BY copies DESC, a.duplicate_of
+            LIMIT %s;
+            """,
+            (top,),
+        )
+        groups = [{"canonical_id": r[0], "title": r[1], "copies": r[2], "other_outlets": r[3]}
+                  for r in cur.fetchall()]
+        cur.execute("SELECT count(*), count(DISTINCT duplicate_of) FROM articles WHERE duplicate_of IS NOT NULL;")
+        n_dup, n_canonical = cur.fetchone()
+    conn.close()
+    return {"signed": signed, "duplicates": n_dup, "canonicals": n_canonical, "top": groups}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.near_dup")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_status = sub.add_parser("status", help="서명 수 / 중복 수 / 전재가 많은 canonical")
+    p_status.add_argument("--top", type=int, default=10)
+    p_rebuild = sub.add_parser("rebuild", help="최근 기사 서명 재계산 + canonical 재링크")
+    p_rebuild.add_argument("--hours", type=float, default=None)
+    p_rebuild.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        result = rebuild(args.hours, args.batch_size)
+    else:
+        result = status(args.top)
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,28 +3,44 @@ from typing import List, Dict, Any
 import json, time
 from services.fetch import fetch_scrape
 from services.persist import persist_articles
+from services.write_behind import ArticleWriteBehind
+
+# 2차 정제: 최소 요건(제목/URL/본문 길이)만 체크
+def good(a: Dict[str, Any]) -> bool:
+    if not a.get("url") or not a.get("title"):
+        return False
+    txt = (a.get("text") or "").strip()
+    if len(txt) < 300:
+        return False
+    return True
 
 def fetch_scrape_upsert(
     rss_feeds: List[str],
     batch_limit: int = 10_000,   # (지금은 fetch에서 안 쓰지만, 남겨도 무방)
     commit: bool = True,
+    write_behind: bool = True,   # 스크랩과 저장을 겹쳐서 실행 (백그라운드 writer)
 ) -> Dict[str, Any]:
     t0 = time.time()
 
+    # write-behind: 스크랩이 끝나는 기사부터 바로 큐에 넣고, writer가 묶어서 저장
+    wb = None
+    on_article = None
+    if commit and write_behind:
+        wb = ArticleWriteBehind().start()
+
+        def on_article(a: Dict[str, Any]) -> None:
+            if good(a):
+                wb.put(a)
+
     # fetch_scrape는 JSON 문자열을 반환하므로 파싱
-    fetched_json = fetch_scrape(rss_feeds)
+    try:
+        fetched_json = fetch_scrape(rss_feeds, on_article=on_article)
+    finally:
+        if wb is not None:
+            wb.close()  # 남은 기사 flush
     fetched = json.loads(fetched_json)
     articles = fetched.get("articles", [])
 
-    # 2차 정제: 최소 요건(제목/URL/본문 길이)만 체크
-    def good(a: Dict[str, Any]) -> bool:
-        if not a.get("url") or not a.get("title"):
-            return False
-        txt = (a.get("text") or "").strip()
-        if len(txt) < 300:
-            return False
-        return True
-
     cleaned = [a for a in articles if good(a)]
     not_cleaned = [a for a in articles if not good(a)]
 
@@ -45,11 +61,15 @@ def fetch_scrape_upsert(
         }
 
     # DB upsert
-    result = persist_articles(cleaned)
+    if wb is not None:
+        result = wb.result()
+        result["errors"] = result["errors"] + fetched.get("errors", [])
+    else:
+        result = persist_articles(cleaned)
+        result["errors"] = fetched.get("errors", [])
     result |= {
         "fetched": len(articles),
         "cleaned": len(cleaned),
-        "errors": fetched.get("errors", []),
         "elapsed_sec": round(time.time() - t0, 2),
         "dry_run": False,
     }
@@ -0,0 +1,405 @@
+# services/recent_index.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧠 최근 기사 벡터 인덱스 (프로세스 내 NumPy + mmap 스냅샷)
+#   - 클러스터링/중복 탐지/관련 기사 질의는 대부분 최근 24~72시간 대상
+#     → Postgres 왕복 없이 (N × dim) float32 행렬 matmul 한 번으로 top-k
+#   - 디스크 구조: {RECENT_INDEX_DIR}/{model}/
+#         meta.json              현재 세대(gen), 행 수(count), 용량, 차원
+#         gen-000001/vectors.f32 (capacity × dim) float32, L2 정규화
+#         gen-000001/ids.i64     article_id
+#         gen-000001/ts.f64      published_at(없으면 fetched_at) epoch 초
+#   - 읽기: np.memmap(mode="r") → 여러 워커 프로세스가 OS 페이지 캐시를 복사 없이 공유
+#   - 쓰기: 파일 lock 하나로 writer 직렬화. 새 행은 count 뒤에 append 후 meta.count 갱신
+#           → reader는 항상 [:count]만 보므로 쓰는 중인 행을 읽지 않음
+#           이미 있는 id도 벡터를 제자리 덮어쓰지 않고 새 행으로 append → count 공개 후
+#           예전 행의 ts만 -inf(tombstone)로 바꿈 (8바이트 한 번, reader는 예전/새 행 중 하나는 온전히 봄)
+#           용량이 차면 만료 행을 버리고 새 gen으로 compaction (os.replace로 meta 교체)
+#
+# 사용:
+#   python -m services.recent_index build --hours 72
+#   python -m services.recent_index stats
+#   python -m services.recent_index query "global energy crisis" --top-k 5
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from pgvector.psycopg2 import register_vector
+
+from config import embedding_settings
+from services.db_services import get_conn
+
+RECENT_INDEX_DIR = os.getenv("RECENT_INDEX_DIR", "data/recent_index")
+
+
+def _settings() -> Dict[str, Any]:
+    return dict(embedding_settings().get("recent_index") or {})
+
+
+def _to_numpy(v) -> np.ndarray:
+    # pgvector>=0.3 는 Vector 객체, 이전 버전은 numpy 배열
+    return np.asarray(v.to_numpy() if hasattr(v, "to_numpy") else v, dtype=np.float32)
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    return m / np.maximum(np.linalg.norm(m, axis=-1, keepdims=True), 1e-12)
+
+
+class RecentVectorIndex:
+    """
+    사용:
+        idx = RecentVectorIndex("text-embedding-3-small", 1536).open()
+        idx.search(query_vec, top_k=10)                # [{"id", "similarity"}, ...]
+        idx.search_many(query_matrix, top_k=10)        # 질의 여러 개를 matmul 한 번으로
+    """
+
+    def __init__(self, model: str, dim: int,
+                 root: Optional[str] = None,
+                 window_hours: Optional[float] = None) -> None:
+        cfg = _settings()
+        self.model = model
+        self.dim = int(dim)
+        self.window_hours = float(window_hours or cfg.get("window_hours", 72))
+        root = root or cfg.get("dir") or RECENT_INDEX_DIR
+        self.path = os.path.join(root, re.sub(r"[^A-Za-z0-9_.-]+", "_", model))
+
+        self._gen: Optional[int] = None
+        self._count = 0
+        self._capacity = 0
+        self._meta_mtime = 0
+        self._vectors: Optional[np.memmap] = None
+        self._ids: Optional[np.memmap] = None
+        self._ts: Optional[np.memmap] = None
+
+    # ── 파일 구조 ───────────────────────────────────────────────────────────
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    def _gen_dir(self, gen: int) -> str:
+        return os.path.join(self.path, f"gen-{gen:06d}")
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._meta_path)  # reader는 예전/새 meta 중 하나만 봄
+
+    @contextmanager
+    def _writer_lock(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, "lock"), "w") as lf:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def _map(self, gen: int, capacity: int, mode: str) -> None:
+        d = self._gen_dir(gen)
+        self._vectors = np.memmap(os.path.join(d, "vectors.f32"), np.float32, mode, shape=(capacity, self.dim))
+        self._ids = np.memmap(os.path.join(d, "ids.i64"), np.int64, mode, shape=(capacity,))
+        self._ts = np.memmap(os.path.join(d, "ts.f64"), np.float64, mode, shape=(capacity,))
+
+    # ── 열기 / 갱신 ─────────────────────────────────────────────────────────
+    def open(self) -> "RecentVectorIndex":
+        """스냅샷이 있으면 mmap (없으면 빈 인덱스). 반환: self"""
+        self.refresh(force=True)
+        return self
+
+    @property
+    def ready(self) -> bool:
+        return self._vectors is not None
+
+    def refresh(self, force: bool = False) -> None:
+        """meta.json이 바뀌었으면 count 갱신, 세대가 바뀌었으면 다시 mmap"""
+        try:
+            mtime = os.stat(self._meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if not force and mtime == self._meta_mtime:
+            return
+        meta = self._read_meta()
+        if not meta or meta.get("dim") != self.dim:
+            return
+        if meta["gen"] != self._gen:
+            self._map(meta["gen"], meta["capacity"], "r")
+            self._gen, self._capacity = meta["gen"], meta["capacity"]
+        self._count = meta["count"]
+        self._meta_mtime = mtime
+
+    # ── 쓰기 ────────────────────────────────────────────────────────────────
+    def _write_generation(self, ids: np.ndarray, ts: np.ndarray, vectors: np.ndarray,
+                          capacity: int, prev: Optional[Dict[str, Any]]) -> None:
+        gen = (prev["gen"] + 1) if prev else 1
+        d = self._gen_dir(gen)
+        os.makedirs(d, exist_ok=True)
+        n = len(ids)
+        for name, dtype, shape, data in (
+            ("vectors.f32", np.float32, (capacity, self.dim), vectors),
+            ("ids.i64", np.int64, (capacity,), ids),
+            ("ts.f64", np.float64, (capacity,), ts),
+        ):
+            mm = np.memmap(os.path.join(d, name), dtype, "w+", shape=shape)
+            mm[:n] = data
+            mm.flush()
+            del mm
+        self._write_meta({"model": self.model, "dim": self.dim, "gen": gen, "count": n,
+                          "capacity": capacity, "window_hours": self.window_hours,
+                          "built_at": time.time()})
+        # 예전 세대는 삭제 (이미 mmap 중인 reader는 inode가 살아 있어 계속 읽힘)
+        if prev:
+            shutil.rmtree(self._gen_dir(prev["gen"]), ignore_errors=True)
+
+    def _cutoff(self) -> float:
+        return time.time() - self.window_hours * 3600
+
+    def build(self, capacity: Optional[int] = None) -> int:
+        """DB에서 최근 window 벡터를 읽어 새 세대로 스냅샷. 반환: 행 수"""
+        ids: List[int] = []
+        ts: List[float] = []
+        vecs: List[np.ndarray] = []
+        with get_conn() as conn:
+            register_vector(conn)
+            with conn.cursor(name="recent_index_build") as cur:
+                cur.itersize = 5000
+                cur.execute(
+                    """
+                    SELECT e.article_id,
+                           extract(epoch FROM COALESCE(a.published_at, a.fetched_at))::float8,
+                           e.embedding
+                    FROM article_embeddings e
+                    JOIN articles a ON a.id = e.article_id
+                    WHERE e.model = %s AND e.dim = %s
+                      AND COALESCE(a.published_at, a.fetched_at) >= to_timestamp(%s)
+                    """,
+                    (self.model, self.dim, self._cutoff()),
+                )
+                for article_id, epoch, emb in cur:
+                    ids.append(article_id)
+                    ts.append(epoch)
+                    vecs.append(_to_numpy(emb))
+        n = len(ids)
+        mat = _normalize(np.vstack(vecs)) if vecs else np.zeros((0, self.dim), np.float32)
+        capacity = max(int(capacity or _settings().get("capacity", 0) or 0), n * 2, 1024)
+        with self._writer_lock():
+            self._write_generation(np.asarray(ids, np.int64), np.asarray(ts, np.float64),
+                                   mat, capacity, self._read_meta())
+        self.refresh(force=True)
+        return n
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray, ts: Sequence[float]) -> int:
+        """
+        새 벡터 반영. 모든 행은 뒤에 append (이미 있는 id는 count 공개 후 예전 행 tombstone).
+        window 밖(ts < cutoff) 벡터는 무시. 반환: 반영한 행 수
+        """
+        ids = np.asarray(ids, np.int64)
+        ts = np.asarray(ts, np.float64)
+        vectors = _normalize(np.asarray(vectors, np.float32).reshape(len(ids), self.dim))
+        _, first = np.unique(ids, return_index=True)
+        keep = np.zeros(len(ids), dtype=bool)
+        keep[first] = True
+        keep &= ts >= self._cutoff()
+        ids, ts, vectors = ids[keep], ts[keep], vectors[keep]
+        if not len(ids):
+            return 0
+
+        with self._writer_lock():
+            meta = self._read_meta()
+            if not meta:
+                self._write_generation(ids, ts, vectors, max(len(ids) * 2, 1024), None)
+                self.refresh(force=True)
+                return len(ids)
+
+            gen, count, capacity = meta["gen"], meta["count"], meta["capacity"]
+            d = self._gen_dir(gen)
+            cur_ids = np.memmap(os.path.join(d, "ids.i64"), np.int64, "r+", shape=(capacity,))
+            cur_ts = np.memmap(os.path.join(d, "ts.f64"), np.float64, "r+", shape=(capacity,))
+            stale = np.flatnonzero(np.isin(cur_ids[:count], ids) & (cur_ts[:count] > -np.inf))
+
+            if count + len(ids) > capacity:
+                # compaction: 만료/tombstone 행 제거 + 교체될 행 제외 후 새 세대 (용량 2배)
+                self._map(gen, capacity, "r")
+                live = self._ts[:count] >= self._cutoff()
+                live &= ~np.isin(self._ids[:count], ids)
+                all_ids = np.concatenate([self._ids[:count][live], ids])
+                all_ts = np.concatenate([self._ts[:count][live], ts])
+                all_vecs = np.vstack([self._vectors[:count][live], vectors])
+                del cur_ids, cur_ts
+                self._write_generation(all_ids, all_ts, all_vecs, max(capacity, len(all_ids) * 2), meta)
+                self.refresh(force=True)
+                return len(ids)
+
+            cur_vecs = np.memmap(os.path.join(d, "vectors.f32"), np.float32, "r+", shape=(capacity, self.dim))
+            end = count + len(ids)
+            cur_vecs[count:end] = vectors
+            cur_ts[count:end] = ts
+            cur_ids[count:end] = ids
+            for mm in (cur_vecs, cur_ts, cur_ids):
+                mm.flush()
+            meta["count"] = end
+            self._write_meta(meta)  # 데이터 flush 이후에 count 공개
+            if len(stale):
+                cur_ts[stale] = -np.inf  # 새 행이 보인 뒤에 예전 행 제외
+                cur_ts.flush()
+        self.refresh(force=True)
+        return len(ids)
+
+    def add_from_db(self, article_ids: Iterable[int]) -> int:
+        """방금 저장된 article_embeddings 행을 읽어 반영 (임베딩 저장 직후 hook)"""
+        ids = list(dict.fromkeys(article_ids))
+        if not ids:
+            return 0
+        with get_conn() as conn:
+            register_vector(conn)
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT e.article_id,
+                           extract(epoch FROM COALESCE(a.published_at, a.fetched_at))::float8,
+                           e.embedding
+                    FROM article_embeddings e
+                    JOIN articles a ON a.id = e.article_id
+                    WHERE e.article_id = ANY(%s) AND e.model = %s AND e.dim = %s
+                      AND COALESCE(a.published_at, a.fetched_at) >= to_timestamp(%s)
+                    """,
+                    (ids, self.model, self.dim, self._cutoff()),
+                )
+                rows = cur.fetchall()
+        if not rows:
+            return 0
+        return self.add([r[0] for r in rows], np.vstack([_to_numpy(r[2]) for r in rows]), [r[1] for r in rows])
+
+    # ── 검색 ────────────────────────────────────────────────────────────────
+    def search_many(self, queries: np.ndarray, top_k: int = 10,
+                    since: Optional[float] = None,
+                    exclude_ids: Optional[Sequence[int]] = None) -> List[List[Dict[str, Any]]]:
+        """queries: (Q × dim). since: epoch 초 (기본: window 시작)"""
+        self.refresh()
+        q = _normalize(np.atleast_2d(np.asarray(queries, np.float32)))
+        if not self.ready or self._count == 0:
+            return [[] for _ in range(len(q))]
+
+        n = self._count
+        ids = self._ids[:n]
+        mask = self._ts[:n] >= (since if since is not None else self._cutoff())
+        if exclude_ids:
+            mask &= ~np.isin(ids, np.asarray(exclude_ids, np.int64))
+        n_live = int(mask.sum())
+        if not n_live:
+            return [[] for _ in range(len(q))]
+
+        # 연속 slice [:n]과 바로 matmul (fancy indexing 복사 없음), 필터 밖 행은 -inf
+        sims = q @ self._vectors[:n].T  # (Q × N) 한 번의 BLAS matmul
+        sims[:, ~mask] = -np.inf
+        # 교체 중인 id는 tombstone 직전 잠깐 두 행 → 여유분까지 뽑아 id 중복 제거
+        k = min(top_k + 8, n_live)
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-top, axis=1)
+        out: List[List[Dict[str, Any]]] = []
+        for i in range(len(q)):
+            hits: List[Dict[str, Any]] = []
+            seen = set()
+            for j in part[i, order[i]]:
+                article_id = int(ids[j])
+                if article_id in seen:
+                    continue
+                seen.add(article_id)
+                hits.append({"id": article_id, "similarity": float(sims[i, j])})
+                if len(hits) == top_k:
+                    break
+            out.append(hits)
+        return out
+
+    def search(self, query: Sequence[float], top_k: int = 10, **kw: Any) -> List[Dict[str, Any]]:
+        return self.search_many(np.asarray(query, np.float32)[None, :], top_k, **kw)[0]
+
+    def stats(self) -> Dict[str, Any]:
+        self.refresh()
+        live = int((self._ts[:self._count] >= self._cutoff()).sum()) if self.ready else 0
+        return {"model": self.model, "dim": self.dim, "path": self.path, "gen": self._gen,
+                "count": self._count, "live": live, "capacity": self._capacity,
+                "window_hours": self.window_hours,
+                "mb": round(self._capacity * self.dim * 4 / 1024 / 1024, 1)}
+
+
+# ────────────────────────────────
+# 프로세스 단위 인스턴스 / 임베딩 저장 hook
+# ────────────────────────────────
+_indexes: Dict[tuple, RecentVectorIndex] = {}
+
+
+def get_recent_index(model: str, dim: int) -> RecentVectorIndex:
+    key = (model, int(dim))
+    if key not in _indexes:
+        _indexes[key] = RecentVectorIndex(model, dim).open()
+    return _indexes[key]
+
+
+def on_embeddings_stored(model: str, dim: int, article_ids: Iterable[int]) -> None:
+    """embedding_service가 저장 직후 호출. recent_index.enabled일 때만 동작, 실패해도 저장 흐름은 유지"""
+    if not _settings().get("enabled"):
+        return
+    try:
+        get_recent_index(model, dim).add_from_db(article_ids)
+    except Exception as e:
+        print(f"[recent_index] update failed: {e}")
+
+
+# ────────────────────────────────
+# CLI
+# ────────────────────────────────
+def main(argv: Optional[List[str]] = None) -> int:
+    from services.embedding_providers import get_provider
+
+    parser = argparse.ArgumentParser(description="최근 기사 mmap 벡터 인덱스")
+    parser.add_argument("--model", default=None, help="provider 이름 (기본: crew_settings.yaml)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build")
+    p_build.add_argument("--hours", type=float, default=None)
+    sub.add_parser("stats")
+    p_query = sub.add_parser("query")
+    p_query.add_argument("text")
+    p_query.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    provider = get_provider(args.model)
+    if args.cmd == "build":
+        idx = RecentVectorIndex(provider.name, provider.dim, window_hours=args.hours)
+        t0 = time.perf_counter()
+        n = idx.build()
+        print(f"✅ {n} vectors in {time.perf_counter() - t0:.2f}s → {idx.path}")
+    elif args.cmd == "stats":
+        print(json.dumps(RecentVectorIndex(provider.name, provider.dim).open().stats(), ensure_ascii=False, indent=2))
+    else:
+        idx = RecentVectorIndex(provider.name, provider.dim).open()
+        q = provider.embed_one(args.text)
+        t0 = time.perf_counter()
+        hits = idx.search(q, top_k=args.top_k)
+        print(f"⏱️ {(time.perf_counter() - t0) * 1000:.2f} ms")
+        for h in hits:
+            print(f"  {h['id']:>8}  {h['similarity']:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,383 @@
+# services/schema.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧱 스키마 / 인덱스 관리 (버전 마이그레이션)
+#   - persist / db_services / embedding_service 가 가정하는 테이블을 여기서 정의
+#   - schema_migrations 테이블에 적용 버전 기록 → 이미 적용된 건 건너뜀
+#   - check: 핫 쿼리에 필요한 인덱스가 실제 DB에 있는지 점검
+#
+# 사용:
+#   python -m services.schema migrate   # 미적용 마이그레이션 적용
+#   python -m services.schema status    # 적용 버전 목록
+#   python -m services.schema check     # 누락 인덱스 리포트 (누락 시 exit 1)
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Any, Dict, List, Tuple
+
+from services.db_services import get_conn
+
+# 여러 프로세스가 동시에 migrate 돌려도 한 번만 적용되도록 잡는 advisory lock 키
+MIGRATION_LOCK_KEY = 742_031_001
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 마이그레이션 목록 (version, 설명, SQL) — 추가만 하고 기존 항목은 수정하지 않음
+# ─────────────────────────────────────────────────────────────────────────────
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (1, "base schema", """
+    CREATE EXTENSION IF NOT EXISTS vector;
+
+    CREATE TABLE IF NOT EXISTS outlets (
+        id            bigserial PRIMARY KEY,
+        name          text NOT NULL,
+        domain        text NOT NULL UNIQUE,
+        country_code  varchar(2),
+        timezone      text,
+        created_at    timestamptz NOT NULL DEFAULT now()
+    );
+
+    CREATE TABLE IF NOT EXISTS articles (
+        id                   bigserial PRIMARY KEY,
+        outlet_id            bigint REFERENCES outlets(id),
+        url                  text NOT NULL,
+        title                text NOT NULL,
+        published_at         timestamptz,
+        "language"           text,
+        author               text,
+        body                 text,
+        canonical_url        text,
+        hash_sha256          text,
+        published_raw        text,
+        published_tz_offset  text,
+        published_tz_source  text,
+        fetched_at           timestamptz NOT NULL DEFAULT now(),
+        CONSTRAINT articles_url_key UNIQUE (url)
+    );
+
+    CREATE TABLE IF NOT EXISTS article_embeddings (
+        article_id  bigint PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+        model       text NOT NULL,
+        dim         integer NOT NULL,
+        embedding   vector(1536) NOT NULL,
+        created_at  timestamptz NOT NULL DEFAULT now()
+    );
+
+    CREATE TABLE IF NOT EXISTS events (
+        id                   bigserial PRIMARY KEY,
+        summary              text,
+        topic_tags           text[],
+        start_time           timestamptz,
+        end_time             timestamptz,
+        centroid_article_id  bigint REFERENCES articles(id) ON DELETE SET NULL,
+        event_cred           real CHECK (event_cred BETWEEN 0 AND 1),
+        conflicts            text[],
+        created_at           timestamptz NOT NULL DEFAULT now()
+    );
+
+    CREATE TABLE IF NOT EXISTS event_articles (
+        event_id    bigint NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+        article_id  bigint NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+        similarity  real,
+        PRIMARY KEY (event_id, article_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS reports (
+        id          bigserial PRIMARY KEY,
+        event_id    bigint NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+        format      text NOT NULL DEFAULT 'md' CHECK (format IN ('md', 'html', 'json')),
+        version     integer NOT NULL DEFAULT 1,
+        content     text NOT NULL,
+        created_at  timestamptz NOT NULL DEFAULT now()
+    );
+    """),
+    (2, "hot query indexes", """
+    -- get_recent_articles: ORDER BY published_at DESC NULLS LAST LIMIT n
+    CREATE INDEX IF NOT EXISTS articles_published_at_idx
+        ON articles (published_at DESC NULLS LAST);
+    -- 본문 해시로 중복/변경 확인
+    CREATE INDEX IF NOT EXISTS articles_hash_sha256_idx
+        ON articles (hash_sha256);
+    -- outlet 조인/필터
+    CREATE INDEX IF NOT EXISTS articles_outlet_id_idx
+        ON articles (outlet_id);
+    -- 기사 → 소속 사건 역조회
+    CREATE INDEX IF NOT EXISTS event_articles_article_id_idx
+        ON event_articles (article_id);
+    -- get_latest_report: WHERE event_id = ? ORDER BY version DESC, created_at DESC LIMIT 1
+    CREATE INDEX IF NOT EXISTS reports_event_version_idx
+        ON reports (event_id, version DESC, created_at DESC);
+    -- search_similar_text: ORDER BY embedding <=> q (cosine)
+    CREATE INDEX IF NOT EXISTS article_embeddings_hnsw_cosine_idx
+        ON article_embeddings USING hnsw (embedding vector_cosine_ops);
+    """),
+    (3, "split article bodies into hot/cold storage", """
+    -- hot: 최근 기사 본문만 보관 (retention job이 오래된 본문을 압축 아카이브로 이동)
+    CREATE TABLE IF NOT EXISTS article_bodies (
+        article_id  bigint PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+        body        text NOT NULL,
+        stored_at   timestamptz NOT NULL DEFAULT now()
+    );
+    CREATE INDEX IF NOT EXISTS article_bodies_stored_at_idx
+        ON article_bodies (stored_at);
+
+    -- cold: 아카이브 파일 위치 (zstd 프레임 단위로 seek 가능)
+    CREATE TABLE IF NOT EXISTS article_body_archive (
+        article_id    bigint PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+        archive_path  text NOT NULL,
+        frame_offset  bigint NOT NULL,
+        frame_length  bigint NOT NULL,
+        archived_at   timestamptz NOT NULL DEFAULT now()
+    );
+
+    INSERT INTO article_bodies (article_id, body, stored_at)
+    SELECT id, body, fetched_at FROM articles WHERE body IS NOT NULL
+    ON CONFLICT (article_id) DO NOTHING;
+
+    -- 메타데이터 행에서 본문 제거 (공간 회수는 이후 VACUUM FULL / pg_repack)
+    ALTER TABLE articles DROP COLUMN IF EXISTS body;
+    """),
+    (4, "embedding cache keyed by model + content hash", """
+    -- 차원은 모델마다 다르므로 vector 타입 차원 미지정 (검색용이 아니라 인덱스 불필요)
+    CREATE TABLE IF NOT EXISTS embedding_cache (
+        model         text NOT NULL,
+        content_hash  text NOT NULL,
+        dim           integer NOT NULL,
+        embedding     vector NOT NULL,
+        created_at    timestamptz NOT NULL DEFAULT now(),
+        PRIMARY KEY (model, content_hash)
+    );
+    """),
+    (5, "dimension-agnostic article_embeddings + per-dim HNSW", """
+    -- dimensions 파라미터로 줄인 벡터(512, 256 …)도 저장할 수 있도록 차원 제약 제거.
+    -- HNSW는 고정 차원이 필요하므로 dim별 partial expression index로 대체
+    -- (halfvec / binary 1차 검색 인덱스는 services.vector_search 에서 필요할 때 생성)
+    DROP INDEX IF EXISTS article_embeddings_hnsw_cosine_idx;
+    ALTER TABLE article_embeddings ALTER COLUMN embedding TYPE vector;
+    CREATE INDEX IF NOT EXISTS article_embeddings_hnsw_cosine_1536_idx
+        ON article_embeddings USING hnsw ((embedding::vector(1536)) vector_cosine_ops)
+        WHERE dim = 1536;
+    """),
+    (6, "job checkpoints for resumable batch workers", """
+    -- 백필 등 장시간 작업의 진행 위치 (job 이름별 state jsonb 한 행)
+    CREATE TABLE IF NOT EXISTS job_checkpoints (
+        job         text PRIMARY KEY,
+        state       jsonb NOT NULL DEFAULT '{}'::jsonb,
+        updated_at  timestamptz NOT NULL DEFAULT now()
+    );
+    """),
+    (7, "multi-model article_embeddings + embedding model registry", """
+    -- 모델 전환 중에는 한 기사에 (기존 모델, 새 모델) 벡터가 함께 존재
+    ALTER TABLE article_embeddings DROP CONSTRAINT IF EXISTS article_embeddings_pkey;
+    ALTER TABLE article_embeddings ADD CONSTRAINT article_embeddings_pkey PRIMARY KEY (article_id, model);
+
+    -- 검색/적재 기본 모델 레지스트리 (services.embedding_migration)
+    --   active: 검색·적재 기본 모델 (최대 1개), migrating: 백필 중,
+    --   standby: 전환 전 모델 (벡터 유지, 되돌리기 가능), retired: 벡터/인덱스 삭제됨
+    CREATE TABLE IF NOT EXISTS embedding_models (
+        model         text PRIMARY KEY,
+        dim           integer NOT NULL,
+        status        text NOT NULL CHECK (status IN ('active', 'migrating', 'standby', 'retired')),
+        created_at    timestamptz NOT NULL DEFAULT now(),
+        activated_at  timestamptz,
+        retired_at    timestamptz
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS embedding_models_single_active_idx
+        ON embedding_models ((true)) WHERE status = 'active';
+    """),
+    (8, "event centroids for online assignment", """
+    -- 사건별 멤버 벡터 평균(정규화 전) + 멤버 수 → 새 기사 합류 시 running mean으로 갱신
+    -- 모델마다 벡터 공간이 다르므로 (event_id, model) 키
+    CREATE TABLE IF NOT EXISTS event_centroids (
+        event_id         bigint NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+        model            text NOT NULL,
+        dim              integer NOT NULL,
+        centroid         vector NOT NULL,
+        n_articles       integer NOT NULL,
+        last_article_at  timestamptz NOT NULL,
+        updated_at       timestamptz NOT NULL DEFAULT now(),
+        PRIMARY KEY (event_id, model)
+    );
+    -- open 사건 = 최근 open_hours 안에 기사가 합류한 사건
+    CREATE INDEX IF NOT EXISTS event_centroids_open_idx
+        ON event_centroids (model, last_article_at DESC);
+    """),
+    (9, "term document frequencies for TF-IDF event tagging", """
+    -- 기사 단위 문서 빈도 (term이 등장한 기사 수), 새 기사만 증분 반영
+    -- 반영 위치(last_id)와 전체 문서 수(docs)는 job_checkpoints('term_df')
+    CREATE TABLE IF NOT EXISTS term_df (
+        term        text PRIMARY KEY,
+        df          integer NOT NULL,
+        updated_at  timestamptz NOT NULL DEFAULT now()
+    );
+    """),
+    (10, "MinHash signatures for near-duplicate (syndicated) articles", """
+    -- 통신사 전재 등 본문이 거의 같은 기사 → 먼저 저장된 기사(canonical)를 가리킴
+    ALTER TABLE articles ADD COLUMN IF NOT EXISTS duplicate_of bigint
+        REFERENCES articles(id) ON DELETE SET NULL;
+    CREATE INDEX IF NOT EXISTS articles_duplicate_of_idx
+        ON articles (duplicate_of) WHERE duplicate_of IS NOT NULL;
+
+    -- signature: uint32 × num_perm (little-endian), bands: band별 해시 → && 로 후보 조회 (LSH 인덱스)
+    CREATE TABLE IF NOT EXISTS article_minhash (
+        article_id  bigint PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+        signature   bytea NOT NULL,
+        bands       bigint[] NOT NULL,
+        created_at  timestamptz NOT NULL DEFAULT now()
+    );
+    CREATE INDEX IF NOT EXISTS article_minhash_bands_idx
+        ON article_minhash USING gin (bands);
+    """),
+    (11, "archived body length for embedding eligibility", """
+    -- 아카이브된 본문도 임베딩 대상 (모델 전환 재임베딩) → 압축 해제 없이 길이 기준을 보도록
+    -- NULL = 이 마이그레이션 이전에 아카이브된 행 (길이 모름 → 대상으로 취급)
+    ALTER TABLE article_body_archive ADD COLUMN IF NOT EXISTS body_chars integer;
+    """),
+    (12, "embedding backfill claim leases", """
+    -- 백필 워커가 임베딩 중인 기사 (짧은 트랜잭션으로 claim → 임베딩 → 삭제)
+    -- claimed_at이 lease보다 오래되면 (워커 중단) 다른 워커가 다시 가져감
+    CREATE TABLE IF NOT EXISTS embedding_claims (
+        model       text NOT NULL,
+        article_id  bigint NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+        claimed_at  timestamptz NOT NULL DEFAULT now(),
+        PRIMARY KEY (model, article_id)
+    );
+    """),
+    (13, "per-article term_df counted flag", """
+    -- id 워터마크(last_id)는 늦게 커밋된 작은 id를 건너뜀 → 기사별로 DF 반영 여부 기록
+    ALTER TABLE articles ADD COLUMN IF NOT EXISTS df_counted boolean NOT NULL DEFAULT false;
+    -- 기존 워터마크 이하 기사는 이미 반영됨
+    UPDATE articles SET df_counted = true
+    WHERE NOT df_counted
+      AND id <= COALESCE((SELECT (state->>'last_id')::bigint FROM job_checkpoints WHERE job = 'term_df'), 0);
+    -- 미반영 기사만 담는 partial index (반영되면 인덱스에서 빠짐 → 크기 ~ 새 기사 수)
+    CREATE INDEX IF NOT EXISTS articles_df_pending_idx ON articles (id) WHERE NOT df_counted;
+    """),
+]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# check 대상 인덱스: (테이블, 인덱스 방식, 키 정의, 용도)
+#   - 이름이 아니라 pg_indexes.indexdef의 "USING <방식> (<키>)"로 비교
+#     → 손으로 다른 이름으로 만든 동일 인덱스도 인정
+# ─────────────────────────────────────────────────────────────────────────────
+REQUIRED_INDEXES: List[Tuple[str, str, str, str]] = [
+    ("outlets", "btree", "domain", "persist_outlets ON CONFLICT (domain)"),
+    ("articles", "btree", "url", "persist_articles ON CONFLICT (url)"),
+    ("articles", "btree", "published_at DESC NULLS LAST", "get_recent_articles"),
+    ("articles", "btree", "hash_sha256", "content hash lookups"),
+    ("event_articles", "btree", "event_id, article_id", "link_event_articles ON CONFLICT"),
+    ("event_articles", "btree", "article_id", "article → event lookups"),
+    ("reports", "btree", "event_id, version DESC, created_at DESC", "get_latest_report"),
+    ("article_embeddings", "btree", "article_id, model", "upsert_embeddings ON CONFLICT (article_id, model)"),
+    ("article_embeddings", "hnsw", "((embedding)::vector(1536)) vector_cosine_ops", "search_similar_text"),
+    ("article_bodies", "btree", "article_id", "hot body lookups"),
+    ("article_body_archive", "btree", "article_id", "cold body lookups"),
+    ("embedding_cache", "btree", "model, content_hash", "embedding cache lookups"),
+    ("event_centroids", "btree", "model, last_article_at DESC", "open event centroids (online assignment)"),
+    ("term_df", "btree", "term", "TF-IDF document frequency lookups"),
+    ("articles", "btree", "duplicate_of", "canonical → near-duplicate lookups"),
+    ("article_minhash", "gin", "bands", "MinHash LSH band lookups"),
+]
+
+
+def _ensure_migrations_table(cur) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version      integer PRIMARY KEY,
+            description  text NOT NULL,
+            applied_at   timestamptz NOT NULL DEFAULT now()
+        );
+        """
+    )
+
+
+def applied_versions() -> List[Dict[str, Any]]:
+    with get_conn() as conn, conn.cursor() as cur:
+        _ensure_migrations_table(cur)
+        cur.execute("SELECT version, description, applied_at FROM schema_migrations ORDER BY version;")
+        rows = cur.fetchall()
+    return [{"version": r[0], "description": r[1], "applied_at": r[2]} for r in rows]
+
+
+def migrate() -> List[int]:
+    """
+    미적용 마이그레이션을 버전 순서대로 각각 한 트랜잭션에서 적용.
+    반환: 이번에 적용한 버전 목록
+    """
+    applied: List[int] = []
+    for version, description, sql in sorted(MIGRATIONS):
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s);", (MIGRATION_LOCK_KEY,))
+            _ensure_migrations_table(cur)
+            cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s;", (version,))
+            if cur.fetchone():
+                continue
+            cur.execute(sql)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s);",
+                (version, description),
+            )
+            applied.append(version)
+    return applied
+
+
+def check_indexes() -> List[Dict[str, str]]:
+    """
+    REQUIRED_INDEXES 중 DB에 없는 것만 반환.
+    반환: [{"table", "using", "keys", "purpose"}, ...] (비어 있으면 OK)
+    """
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT tablename, indexdef
+            FROM pg_indexes
+            WHERE schemaname = current_schema()
+            """
+        )
+        defs: Dict[str, List[str]] = {}
+        for table, indexdef in cur.fetchall():
+            defs.setdefault(table, []).append(indexdef)
+
+    missing: List[Dict[str, str]] = []
+    for table, using, keys, purpose in REQUIRED_INDEXES:
+        needle = f"USING {using} ({keys})"
+        if not any(needle in d for d in defs.get(table, [])):
+            missing.append({"table": table, "using": using, "keys": keys, "purpose": purpose})
+    return missing
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.schema")
+    parser.add_argument("command", choices=["migrate", "status", "check"])
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        done = migrate()
+        print(f"✅ applied: {done}" if done else "✅ already up to date")
+        return 0
+
+    if args.command == "status":
+        known = {v for v, _, _ in MIGRATIONS}
+        for row in applied_versions():
+            known.discard(row["version"])
+            print(f"  v{row['version']:>3}  {row['applied_at']:%Y-%m-%d %H:%M}  {row['description']}")
+        for v in sorted(known):
+            print(f"  v{v:>3}  (pending)")
+        return 0
+
+    missing = check_indexes()
+    if not missing:
+        print("✅ all required indexes present")
+        return 0
+    print(f"❌ missing indexes: {len(missing)}")
+    for m in missing:
+        print(f"  • {m['table']} USING {m['using']} ({m['keys']})  — {m['purpose']}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+# services/topic_scope.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🎯 주제(topic) 범위 한정 — 클러스터링 / 리포트 전에 주제 관련 기사만 고름
+#   - topic 임베딩은 한 번만 (embed_queries → 질의 캐시, 같은 실행의 다른 태스크도 재사용)
+#   - 후보 두 갈래 (윈도우 since ~ until 안에서만)
+#       keyword: topic 토큰(event_tagging.tokenize) 중 흔하지 않은 것(term_df 비율 ≤ max_df_ratio)으로
+#                제목/본문 ILIKE → 후보만 정확 cosine 계산, keyword_similarity 이상
+#       vector : HNSW top-k (max_articles, iterative scan) 중 vector_similarity 이상 (키워드 없이 다른 표현으로 쓴 기사)
+#     → 비용은 윈도우 전체가 아니라 주제 보도량(키워드 후보 + top-k)에 비례
+#   - 결과 기사 id만 cluster_window / assign_online / topic_events(리포트용)로 넘김
+#
+# 사용:
+#   python -m services.topic_scope select "global energy crisis" --hours 72
+#   python -m services.topic_scope events "global energy crisis" --hours 72
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pgvector.psycopg2 import register_vector
+
+from config import topic_scope_settings
+from services import vector_search
+from services.db_services import get_conn
+from services.embedding_providers import get_provider
+from services.embedding_service import embed_queries
+from services.event_tagging import DF_JOB, tokenize
+
+
+def topic_settings() -> Dict[str, Any]:
+    cfg = topic_scope_settings()
+    return {
+        "window_hours": float(cfg.get("window_hours", 72)),
+        "keyword_similarity": float(cfg.get("keyword_similarity", 0.3)),
+        "vector_similarity": float(cfg.get("vector_similarity", 0.45)),
+        "max_articles": int(cfg.get("max_articles", 2000)),
+        "max_keyword_candidates": int(cfg.get("max_keyword_candidates", 20000)),
+        "max_df_ratio": float(cfg.get("max_df_ratio", 0.2)),
+        "keywords": {str(k).lower(): list(v or []) for k, v in (cfg.get("keywords") or {}).items()},
+    }
+
+
+def topic_keywords(topic: str, cfg: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    topic 토큰 + topic_scope.keywords[topic] 추가어 중 전체 기사의 max_df_ratio 이하에만 나오는 term.
+    ("global"처럼 흔한 단어는 후보를 넓히기만 하므로 제외, term_df가 비어 있으면 전부 사용)
+    """
+    cfg = cfg or topic_settings()
+    terms = list(dict.fromkeys(tokenize(topic) + [str(k).lower() for k in cfg["keywords"].get(topic.lower(), [])]))
+    if not terms:
+        return []
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT (state->>'docs')::bigint FROM job_checkpoints WHERE job = %s;", (DF_JOB,))
+        row = cur.fetchone()
+        docs = int(row[0]) if row and row[0] else 0
+        cur.execute("SELECT term, df FROM term_df WHERE term = ANY(%s);", (terms,))
+        df = dict(cur.fetchall())
+    conn.close()
+    if not docs:
+        return terms
+    keep = [t for t in terms if df.get(t, 0) <= cfg["max_df_ratio"] * docs]
+    return keep or sorted(terms, key=lambda t: df.get(t, 0))[:1]  # 전부 흔하면 가장 드문 것 하나
+
+
+def select_articles(topic: str,
+                    hours: Optional[float] = None,
+                    model: Optional[str] = None,
+                    since: Optional[datetime] = None,
+                    until: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    반환: {"topic", "article_ids" (similarity 내림차순), "similarity": {id: sim}, "keywords",
+           "keyword_candidates", "keyword_hits", "vector_hits", "timings"}
+    """
+    cfg = topic_settings()
+    if since is None:
+        since = datetime.now(timezone.utc) - timedelta(hours=float(hours or cfg["window_hours"]))
+    provider = get_provider(model)
+    dim = provider.dim
+    timings: Dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    q = np.asarray(embed_queries([topic], provider.name)[0], dtype=np.float32)
+    timings["embed_sec"] = round(time.perf_counter() - t0, 3)
+
+    t0 = time.perf_counter()
+    keywords = topic_keywords(topic, cfg)
+    sims: Dict[int, float] = {}
+    n_candidates = 0
+    if keywords:
+        patterns = [f"%{k.replace('%', '').replace('_', '')}%" for k in keywords]
+        with get_conn() as conn:
+            register_vector(conn)
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT c.id, 1 - (e.embedding::vector({dim}) <=> %(q)s::vector({dim}))
+                    FROM (
+                        SELECT a.id
+                        FROM articles a
+                        LEFT JOIN article_bodies b ON b.article_id = a.id
+                        WHERE COALESCE(a.published_at, a.fetched_at) >= %(since)s
+                          AND (%(until)s::timestamptz IS NULL OR COALESCE(a.published_at, a.fetched_at) < %(until)s)
+                          AND (a.title ILIKE ANY(%(patterns)s) OR b.body ILIKE ANY(%(patterns)s))
+                        LIMIT %(limit)s
+                    ) c
+                    JOIN article_embeddings e ON e.article_id = c.id AND e.model = %(model)s AND e.dim = %(dim)s;
+                    """,
+                    {"q": q, "since": since, "until": until, "patterns": patterns,
+                     "limit": cfg["max_keyword_candidates"], "model": provider.name, "dim": dim},
+                )
+                rows = cur.fetchall()
+        conn.close()
+        n_candidates = len(rows)
+        sims = {int(i): float(s) for i, s in rows if s >= cfg["keyword_similarity"]}
+    keyword_hits = len(sims)
+    timings["keyword_sec"] = round(time.perf_counter() - t0, 3)
+
+    t0 = time.perf_counter()
+    vector_hits = 0
+    # pgvector < 0.8 은 iterative scan이 없어 ef_search 상한(1000)까지만 받을 수 있음
+    top_k = min(cfg["max_articles"], vector_search.max_candidates() or cfg["max_articles"])
+    for r in vector_search.search(q, provider.name, top_k=top_k, since=since, until=until):
+        if r["similarity"] >= cfg["vector_similarity"] and r["id"] not in sims:
+            sims[int(r["id"])] = float(r["similarity"])
+            vector_hits += 1
+    timings["vector_sec"] = round(time.perf_counter() - t0, 3)
+
+    ranked = sorted(sims.items(), key=lambda kv: (-kv[1], kv[0]))[: cfg["max_articles"]]
+    return {
+        "topic": topic,
+        "model": provider.name,
+        "since": since,
+        "article_ids": [i for i, _ in ranked],
+        "similarity": dict(ranked),
+        "keywords": keywords,
+        "keyword_candidates": n_candidates,
+        "keyword_hits": keyword_hits,
+        "vector_hits": vector_hits,
+        "timings": timings,
+    }
+
+
+def topic_events(topic: str,
+                 hours: Optional[float] = None,
+                 limit: int = 10,
+                 articles_per_event: int = 5,
+                 model: Optional[str] = None) -> Dict[str, Any]:
+    """
+    주제 범위 기사가 속한 사건만 (범위 기사 수 순) — 리포트 입력.
+    반환: {"topic", "articles", "events": [{"id", "summary", "topic_tags", "event_cred", "conflicts",
+            "start_time", "end_time", "scoped_articles", "articles": [{"id", "title", "outlet", "url"}]}]}
+    """
+    scope = select_articles(topic, hours, model)
+    ids = scope["article_ids"]
+    events: List[Dict[str, Any]] = []
+    if ids:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(
+                """
+                WITH hit AS (
+                    SELECT ea.event_id, count(*) AS n
+                    FROM event_articles ea
+                    WHERE ea.article_id = ANY(%(ids)s)
+                    GROUP BY ea.event_id
+                    ORDER BY n DESC, ea.event_id
+                    LIMIT %(limit)s
+                )
+                SELECT ev.id, ev.summary, ev.topic_tags, ev.event_cred, ev.conflicts,
+                       ev.start_time, ev.end_time, hit.n,
+                       (SELECT json_agg(x) FROM (
+                            SELECT a.id, a.title, o.name AS outlet, a.url
+                            FROM event_articles ea2
+                            JOIN articles a ON a.id = ea2.article_id
+                            LEFT JOIN outlets o ON o.id = a.outlet_id
+                            WHERE ea2.event_id = ev.id AND ea2.article_id = ANY(%(ids)s)
+                            ORDER BY ea2.similarity DESC NULLS LAST, a.id
+                            LIMIT %(per_event)s
+                        ) x)
+                FROM hit JOIN events ev ON ev.id = hit.event_id
+                ORDER BY hit.n DESC, ev.id;
+                """,
+                {"ids": ids, "limit": limit, "per_event": articles_per_event},
+            )
+            for r in cur.fetchall():
+                events.append({"id": r[0], "summary": r[1], "topic_tags": r[2], "event_cred": r[3],
+                               "conflicts": r[4], "start_time": r[5], "end_time": r[6],
+                               "scoped_articles": r[7], "articles": r[8] or []})
+        conn.close()
+    return {"topic": topic, "articles": len(ids), "events": events}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.topic_scope")
+    parser.add_argument("command", choices=["select", "events"])
+    parser.add_argument("topic")
+    parser.add_argument("--hours", type=float, default=None)
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "select":
+        result = select_articles(args.topic, args.hours, args.model)
+        result = {**result, "article_ids": result["article_ids"][:50],
+                  "similarity": dict(list(result["similarity"].items())[:20])}
+    else:
+        result = topic_events(args.topic, args.hours, args.limit, model=args.model)
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
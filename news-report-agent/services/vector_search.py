@@ -0,0 +1,357 @@
+# services/vector_search.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🔎 article_embeddings 벡터 검색 (정밀도 모드 + re-rank + 필터)
+#   - heap에는 항상 full precision 벡터를 저장 (re-rank 기준)
+#   - 인덱스는 dim별 partial expression index로 모드/방식(hnsw, ivfflat)마다 따로 생성
+#       full   : embedding::vector(d)                  vector_cosine_ops  (4 bytes/성분)
+#       half   : embedding::halfvec(d)                 halfvec_cosine_ops (2 bytes/성분)
+#       binary : binary_quantize(embedding)::bit(d)    bit_hamming_ops    (1 bit/성분)
+#   - half/binary는 1차로 top_k × rerank_factor 후보를 뽑고 full precision 거리로 재정렬
+#   - halfvec / binary_quantize 는 pgvector >= 0.7 필요
+#   - since/until/outlet_ids/language 필터는 ANN 스캔 뒤에 적용되므로
+#     pgvector >= 0.8 의 iterative scan으로 LIMIT을 채울 때까지 인덱스를 더 읽음
+#     (그 이전 버전은 ef_search / probes를 키워서 보완)
+#   - hnsw.ef_search는 1..1000 → top_k가 그보다 크면 iterative scan으로 더 읽음
+#     (pgvector < 0.8 에서는 max_candidates() 만큼만 돌려줌)
+#
+# 사용:
+#   python -m services.vector_search index --dim 1536 --mode binary
+#   python -m services.vector_search index --dim 1536 --method ivfflat --lists 1000
+#   python -m services.vector_search drop  --dim 1536 --mode half
+#   python -m services.vector_search index --dim 1536 --model text-embedding-3-large@1536
+#   python -m services.vector_search list
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import hashlib
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pgvector.psycopg2 import register_vector
+
+from config import embedding_settings
+from services.db_services import get_conn
+
+SEARCH_MODES = ("full", "half", "binary")
+INDEX_METHODS = ("hnsw", "ivfflat")
+
+# pgvector 인덱스 최대 차원 (vector/halfvec/bit HNSW 기준)
+MAX_INDEX_DIM = {"full": 2000, "half": 4000, "binary": 64000}
+
+# hnsw.ef_search 허용 범위 상한 (1..1000) — 더 깊은 결과는 iterative scan으로
+MAX_EF_SEARCH = 1000
+
+
+def _check(dim: int, mode: str) -> int:
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"unknown search mode: {mode} (expected one of {SEARCH_MODES})")
+    dim = int(dim)  # 타입 modifier는 파라미터로 못 넘기므로 SQL에 직접 들어감 → int 강제
+    if not 0 < dim <= MAX_INDEX_DIM[mode]:
+        raise ValueError(f"dim {dim} out of range for {mode} index (max {MAX_INDEX_DIM[mode]})")
+    return dim
+
+
+def _index_expr(dim: int, mode: str) -> tuple[str, str]:
+    """(인덱스 키 식, operator class)"""
+    if mode == "half":
+        return f"(embedding::halfvec({dim}))", "halfvec_cosine_ops"
+    if mode == "binary":
+        return f"(binary_quantize(embedding)::bit({dim}))", "bit_hamming_ops"
+    return f"(embedding::vector({dim}))", "vector_cosine_ops"
+
+
+def _first_pass_distance(dim: int, mode: str, col: str = "embedding", q: str = "%(q)s") -> str:
+    """인덱스 식과 똑같은 모양이어야 planner가 인덱스를 씀"""
+    if mode == "half":
+        return f"{col}::halfvec({dim}) <=> {q}::vector({dim})::halfvec({dim})"
+    if mode == "binary":
+        return f"binary_quantize({col})::bit({dim}) <~> binary_quantize({q}::vector({dim}))"
+    return f"{col}::vector({dim}) <=> {q}::vector({dim})"
+
+
+def index_name(dim: int, mode: str = "full", method: str = "hnsw", model: Optional[str] = None) -> str:
+    """model을 주면 그 모델 전용 partial index 이름 (63자 제한 → slug 앞부분 + 해시)"""
+    suffix = "cosine" if mode == "full" else mode
+    if model is None:
+        return f"article_embeddings_{method}_{suffix}_{int(dim)}_idx"
+    slug = re.sub(r"[^a-z0-9]+", "_", model.lower()).strip("_")[:12]
+    digest = hashlib.blake2b(model.encode("utf-8"), digest_size=4).hexdigest()
+    return f"article_embeddings_{method}_{suffix}_{int(dim)}_{slug}_{digest}_idx"
+
+
+def _index_where(dim: int, model: Optional[str]) -> str:
+    """검색 WHERE (e.dim = D AND e.model = '...')와 같은 조건이어야 planner가 partial index를 씀"""
+    where = f"dim = {dim}"
+    if model is not None:
+        where += " AND model = '{}'".format(model.replace("'", "''"))
+    return where
+
+
+@lru_cache(maxsize=1)
+def pgvector_version() -> Tuple[int, ...]:
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector';")
+        row = cur.fetchone()
+    return tuple(int(x) for x in row[0].split(".")) if row else (0,)
+
+
+# ────────────────────────────────
+# 🧱 인덱스 관리
+# ────────────────────────────────
+def _run_autocommit(sql: str) -> None:
+    """CONCURRENTLY 는 트랜잭션 블록 밖에서만 가능 → `with conn` 없이 autocommit"""
+    conn = get_conn()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(sql)
+    finally:
+        conn.close()
+
+
+def _default_lists(dim: int, model: Optional[str] = None) -> int:
+    """pgvector 권장값: 100만 행까지 rows/1000, 그 이상은 sqrt(rows)"""
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(f"SELECT count(*) FROM article_embeddings WHERE {_index_where(dim, model)};")
+        rows = cur.fetchone()[0]
+    return max(10, rows // 1000 if rows <= 1_000_000 else int(rows ** 0.5))
+
+
+def ensure_index(dim: int,
+                 mode: str = "full",
+                 method: str = "hnsw",
+                 m: int = 16,
+                 ef_construction: int = 64,
+                 lists: Optional[int] = None,
+                 model: Optional[str] = None) -> str:
+    """
+    dim 벡터용 ANN 인덱스를 모드/방식별로 생성 (이미 있으면 그대로).
+      - hnsw   : m / ef_construction (빌드 느림, 검색 recall/속도 우수, 데이터 없이 생성 가능)
+      - ivfflat: lists (빌드 빠름, 데이터가 쌓인 뒤 만들어야 centroid가 의미 있음)
+      - model  : 같은 dim의 모델이 여럿일 때(모델 전환 중) 그 모델 행만 담는 partial index
+    운영 중 테이블 잠금을 피하려고 CONCURRENTLY 로 생성 → autocommit 연결 사용.
+    """
+    dim = _check(dim, mode)
+    if method not in INDEX_METHODS:
+        raise ValueError(f"unknown index method: {method} (expected one of {INDEX_METHODS})")
+    expr, opclass = _index_expr(dim, mode)
+    name = index_name(dim, mode, method, model)
+    if method == "ivfflat":
+        params = f"lists = {int(lists or _default_lists(dim, model))}"
+    else:
+        params = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+    sql = f"""
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}
+        ON article_embeddings USING {method} ({expr} {opclass})
+        WITH ({params})
+        WHERE {_index_where(dim, model)};
+    """
+    _run_autocommit(sql)
+    return name
+
+
+def drop_index(dim: int, mode: str = "full", method: str = "hnsw", model: Optional[str] = None) -> str:
+    name = index_name(_check(dim, mode), mode, method, model)
+    _run_autocommit(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+    return name
+
+
+def list_indexes() -> List[Dict[str, Any]]:
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT i.indexname, pg_relation_size(c.oid), i.indexdef
+            FROM pg_indexes i
+            JOIN pg_class c ON c.relname = i.indexname
+            WHERE i.tablename = 'article_embeddings'
+              AND (i.indexdef LIKE '%%USING hnsw%%' OR i.indexdef LIKE '%%USING ivfflat%%')
+            ORDER BY i.indexname;
+            """
+        )
+        rows = cur.fetchall()
+    return [{"name": r[0], "bytes": r[1], "indexdef": r[2]} for r in rows]
+
+
+# ────────────────────────────────
+# 🔎 검색
+# ────────────────────────────────
+def max_candidates() -> Optional[int]:
+    """한 번에 받을 수 있는 1차 후보 수 상한 (iterative scan이 없으면 ef_search 상한, 있으면 None)"""
+    return None if pgvector_version() >= (0, 8) else MAX_EF_SEARCH
+
+
+def _scan_settings(cur, candidates: int, cfg: Dict[str, Any],
+                   ef_search: Optional[int], probes: Optional[int], filtered: bool) -> None:
+    """트랜잭션 로컬 검색 파라미터 (set_config(..., true) = SET LOCAL)"""
+    settings = {
+        # HNSW는 ef_search개까지만 후보를 돌려줌 → 최소한 1차 후보 수만큼 (허용 범위 1..1000)
+        "hnsw.ef_search": min(MAX_EF_SEARCH, max(candidates, int(ef_search or cfg.get("ef_search", 40)))),
+        "ivfflat.probes": int(probes or cfg.get("probes", 10)),
+    }
+    deep = candidates > MAX_EF_SEARCH
+    if (filtered or deep) and pgvector_version() >= (0, 8):
+        # 필터로 버려진 만큼 / ef_search 상한을 넘는 후보 수만큼 인덱스를 더 읽어서 LIMIT을 채움
+        # (순서는 바깥 re-rank에서 정확히 맞춤)
+        mode = cfg.get("iterative_scan", "relaxed_order")
+        if mode == "off" and deep:
+            mode = "relaxed_order"
+        settings["hnsw.iterative_scan"] = mode
+        settings["ivfflat.iterative_scan"] = mode
+        settings["hnsw.max_scan_tuples"] = max(candidates, int(cfg.get("max_scan_tuples", 20_000)))
+    for key, value in settings.items():
+        cur.execute("SELECT set_config(%s, %s, true);", (key, str(value)))
+
+
+def _filters(dim: int, model: str,
+             since: Optional[datetime], until: Optional[datetime],
+             outlet_ids: Optional[Sequence[int]], language: Optional[str]) -> Tuple[List[str], Dict[str, Any]]:
+    where = [f"e.dim = {dim}", "e.model = %(model)s"]
+    params: Dict[str, Any] = {"model": model}
+    if since is not None:
+        where.append("a.published_at >= %(since)s")
+        params["since"] = since
+    if until is not None:
+        where.append("a.published_at < %(until)s")
+        params["until"] = until
+    if outlet_ids:
+        where.append("a.outlet_id = ANY(%(outlet_ids)s)")
+        params["outlet_ids"] = list(outlet_ids)
+    if language:
+        where.append('a."language" = %(language)s')
+        params["language"] = language
+    return where, params
+
+
+def _topk_sql(dim: int, mode: str, where: List[str], q: str) -> str:
+    """
+    질의 벡터 q(SQL 식) 하나에 대한 top_k: 인덱스로 1차 후보 → full precision 재정렬.
+    filters가 있으면 1차 서브쿼리 안에서 articles 조인 (인덱스 스캔 + iterative scan 필터)
+    """
+    joined = "JOIN articles a ON a.id = e.article_id" if len(where) > 2 else ""
+    return f"""
+        SELECT a.id, a.title, a.url,
+               1 - (c.embedding <=> {q}) AS similarity
+        FROM (
+            SELECT e.article_id, e.embedding
+            FROM article_embeddings e
+            {joined}
+            WHERE {" AND ".join(where)}
+            ORDER BY {_first_pass_distance(dim, mode, col="e.embedding", q=q)}
+            LIMIT %(candidates)s
+        ) c
+        JOIN articles a ON a.id = c.article_id
+        ORDER BY c.embedding <=> {q}
+        LIMIT %(top_k)s
+    """
+
+
+def search(vector: Sequence[float],
+           model: str,
+           top_k: int = 5,
+           mode: Optional[str] = None,
+           rerank_factor: Optional[int] = None,
+           since: Optional[datetime] = None,
+           until: Optional[datetime] = None,
+           outlet_ids: Optional[Sequence[int]] = None,
+           language: Optional[str] = None,
+           ef_search: Optional[int] = None,
+           probes: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    vector와 가까운 기사 top_k (cosine similarity, full precision 기준 정렬).
+      - since/until: published_at 범위, outlet_ids: 언론사 제한, language: 기사 언어
+      - ef_search (hnsw) / probes (ivfflat): 쿼리별 recall ↔ 속도 조절
+    기본값은 crew_settings.yaml embedding.search.
+    """
+    return search_many([vector], model, top_k, mode, rerank_factor, since, until,
+                       outlet_ids, language, ef_search, probes)[0]
+
+
+def search_many(vectors: Sequence[Sequence[float]],
+                model: str,
+                top_k: int = 5,
+                mode: Optional[str] = None,
+                rerank_factor: Optional[int] = None,
+                since: Optional[datetime] = None,
+                until: Optional[datetime] = None,
+                outlet_ids: Optional[Sequence[int]] = None,
+                language: Optional[str] = None,
+                ef_search: Optional[int] = None,
+                probes: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+    """
+    질의 벡터 여러 개를 SQL 한 번으로 검색 (unnest WITH ORDINALITY + LATERAL).
+    반환: 입력 순서대로 결과 목록. 인자 의미는 search()와 같음.
+    """
+    if not len(vectors):
+        return []
+    cfg = dict(embedding_settings().get("search") or {})
+    mode = mode or cfg.get("mode", "full")
+    rerank_factor = int(rerank_factor or cfg.get("rerank_factor", 4))
+
+    qs = [np.asarray(v, dtype=np.float32) for v in vectors]
+    dim = _check(len(qs[0]), mode)
+    if any(len(v) != dim for v in qs):
+        raise ValueError("all query vectors must have the same dimension")
+    candidates = top_k if mode == "full" else top_k * max(1, rerank_factor)
+
+    where, params = _filters(dim, model, since, until, outlet_ids, language)
+    params |= {"candidates": candidates, "top_k": top_k}
+    if len(qs) == 1:
+        sql = _topk_sql(dim, mode, where, "%(q)s::vector")
+        params["q"] = qs[0]
+    else:
+        sql = f"""
+        SELECT q.i, r.id, r.title, r.url, r.similarity
+        FROM unnest(%(qs)s::vector[]) WITH ORDINALITY AS q(vec, i)
+        CROSS JOIN LATERAL ({_topk_sql(dim, mode, where, "q.vec")}) r
+        ORDER BY q.i, r.similarity DESC
+        """
+        params["qs"] = qs
+
+    with get_conn() as conn:
+        register_vector(conn)
+        with conn.cursor() as cur:
+            _scan_settings(cur, candidates, cfg, ef_search, probes, len(where) > 2)
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+
+    if len(qs) == 1:
+        return [[{"id": r[0], "title": r[1], "url": r[2], "similarity": float(r[3])} for r in rows]]
+    out: List[List[Dict[str, Any]]] = [[] for _ in qs]
+    for i, article_id, title, url, sim in rows:
+        out[i - 1].append({"id": article_id, "title": title, "url": url, "similarity": float(sim)})
+    return out
+
+
+# ────────────────────────────────
+# CLI
+# ────────────────────────────────
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="article_embeddings ANN 인덱스 관리")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    for cmd in ("index", "drop"):
+        p = sub.add_parser(cmd)
+        p.add_argument("--dim", type=int, default=1536)
+        p.add_argument("--mode", choices=SEARCH_MODES, default="full")
+        p.add_argument("--method", choices=INDEX_METHODS, default="hnsw")
+        p.add_argument("--model", default=None, help="해당 모델 전용 partial index")
+        if cmd == "index":
+            p.add_argument("--lists", type=int, default=None, help="ivfflat lists (기본: 행 수 기반)")
+    sub.add_parser("list")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "index":
+        print(f"✅ {ensure_index(args.dim, args.mode, args.method, lists=args.lists, model=args.model)}")
+    elif args.cmd == "drop":
+        print(f"🗑️ {drop_index(args.dim, args.mode, args.method, args.model)}")
+    else:
+        for ix in list_indexes():
+            print(f"  {ix['name']:<48} {ix['bytes'] / 1024 / 1024:8.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+# services/write_behind.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧵 Write-behind 저장 버퍼
+#   - 스크레이퍼는 put()만 하고 바로 다음 기사로 넘어감
+#   - 백그라운드 writer 스레드가 bounded queue에서 꺼내 크기/시간 기준으로 모아
+#     persist_articles(bulk upsert)로 flush
+#   - 큐가 가득 차면 put()이 블록 → 자연스러운 backpressure
+#   - close() 시 남은 기사를 모두 flush 후 종료
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from services.persist import persist_articles
+
+_STOP = object()
+
+
+class ArticleWriteBehind:
+    """
+    사용:
+        with ArticleWriteBehind() as wb:
+            fetch_scrape(feeds, on_article=wb.put)
+        summary = wb.result()
+    """
+
+    def __init__(self,
+                 flush_size: int = 200,
+                 flush_interval: float = 2.0,
+                 max_queue: int = 2_000,
+                 persist: Callable[[List[Dict[str, Any]]], Dict[str, Any]] = persist_articles) -> None:
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._persist = persist
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # 누적 결과
+        self._totals = {"processed": 0, "inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+        self._inserted_ids: List[int] = []
+        self._updated_ids: List[int] = []
+        self._errors: List[Dict[str, Any]] = []
+        self._near_duplicates: Dict[int, int] = {}       # {article_id: canonical_id}
+        self._article_index: Optional[Dict[str, Any]] = None  # 프로세스 누적 카운터 → 마지막 값
+
+        # 지표
+        self._flush_ms: List[float] = []
+        self._max_depth = 0
+        self._blocked_puts = 0
+
+    # ── lifecycle ───────────────────────────────────────────────────────────
+    def start(self) -> "ArticleWriteBehind":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="article-write-behind", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """남은 기사까지 flush하고 writer 종료 (중복 호출 안전)"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def __enter__(self) -> "ArticleWriteBehind":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── producer side ───────────────────────────────────────────────────────
+    def put(self, article: Dict[str, Any], timeout: Optional[float] = None) -> None:
+        """
+        큐에 기사 1건 적재. 가득 차 있으면 writer가 비울 때까지 대기(backpressure).
+        timeout을 넘기면 queue.Full.
+        """
+        if self._thread is None:
+            raise RuntimeError("ArticleWriteBehind is not started")
+        try:
+            self._queue.put_nowait(article)
+        except queue.Full:
+            with self._lock:
+                self._blocked_puts += 1
+            self._queue.put(article, timeout=timeout)
+        depth = self._queue.qsize()
+        with self._lock:
+            if depth > self._max_depth:
+                self._max_depth = depth
+
+    # ── writer side ─────────────────────────────────────────────────────────
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline: Optional[float] = None
+        while True:
+            wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = None  # 시간 기준 flush
+
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (len(batch) >= self.flush_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        t0 = time.perf_counter()
+        try:
+            res = self._persist(batch)
+        except Exception as e:
+            res = {"processed": len(batch), "skipped": len(batch),
+                   "errors": [{"url": None, "error": f"flush failed: {e}"}]}
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        with self._lock:
+            self._flush_ms.append(elapsed_ms)
+            for k in self._totals:
+                self._totals[k] += res.get(k, 0)
+            self._inserted_ids.extend(res.get("inserted_ids", []))
+            self._updated_ids.extend(res.get("updated_ids", []))
+            self._errors.extend(res.get("errors", []))
+            self._near_duplicates.update(res.get("near_duplicates") or {})
+            if res.get("article_index") is not None:
+                self._article_index = res["article_index"]
+
+    # ── 결과 / 지표 ─────────────────────────────────────────────────────────
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lat = sorted(self._flush_ms)
+            n = len(lat)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_depth,
+                "blocked_puts": self._blocked_puts,
+                "flushes": n,
+                "flush_ms_avg": round(sum(lat) / n, 2) if n else 0.0,
+                "flush_ms_p95": round(lat[min(n - 1, int(n * 0.95))], 2) if n else 0.0,
+                "flush_ms_max": round(lat[-1], 2) if n else 0.0,
+            }
+
+    def result(self) -> Dict[str, Any]:
+        """persist_articles와 같은 모양의 누적 결과 + write_behind 지표"""
+        with self._lock:
+            out: Dict[str, Any] = dict(self._totals)
+            out["errors"] = list(self._errors)
+            out["inserted_ids"] = list(self._inserted_ids)
+            out["updated_ids"] = list(self._updated_ids)
+            out["all_processed_ids"] = self._inserted_ids + self._updated_ids
+            out["article_index"] = self._article_index
+            out["near_duplicates"] = dict(self._near_duplicates)
+        out["write_behind"] = self.stats()
+        return out
@@ -0,0 +1,99 @@
+# tests/bench_clustering.py
+# ─────────────────────────────────────────────────────────────────────────────
+# ⏱️ 사건 클러스터링 속도 / 정확도 벤치마크 (DB 없이 합성 데이터)
+#   - 사건 중심 벡터 + 가우시안 잡음으로 기사 임베딩 생성, 사건마다 게시 시각이 몰려 있음
+#   - purity: 예측 클러스터 안에서 가장 많은 정답 사건의 비율
+#   - completeness: 정답 사건 기사 중 같은 예측 클러스터(최다)에 들어간 비율
+#
+# 사용:
+#   python -m tests.bench_clustering --n 50000 --dim 1536 --events 5000
+#   python -m tests.bench_clustering --n 10000 --exact     # 투영 prefilter recall 확인
+#   python -m tests.bench_clustering --n 200000 --threshold 0.85 --noise 0.35 --blocking lsh
+# ─────────────────────────────────────────────────────────────────────────────
+import argparse
+import time
+
+import numpy as np
+
+from services.event_clustering import cluster_members, density_labels, similar_pairs
+from services.lsh import auto_bits, tune
+
+
+def synthetic(n: int, dim: int, events: int, noise: float, hours: float, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(events, dim)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    truth = rng.integers(0, events, size=n)
+    mat = centers[truth] + rng.normal(0, noise / np.sqrt(dim), size=(n, dim)).astype(np.float32)
+    mat /= np.linalg.norm(mat, axis=1, keepdims=True)
+    event_ts = rng.uniform(0, hours * 3600, size=events)
+    ts = event_ts[truth] + rng.normal(0, 3 * 3600, size=n)
+    order = np.argsort(ts, kind="stable")
+    return mat[order], ts[order], truth[order]
+
+
+def _majority_share(groups: np.ndarray, other: np.ndarray) -> float:
+    """groups별로 other의 최빈값이 차지하는 비율의 가중 평균"""
+    valid = groups >= 0
+    g, o = groups[valid], other[valid]
+    if not len(g):
+        return 0.0
+    pair = np.stack([g, o], axis=1)
+    uniq, counts = np.unique(pair, axis=0, return_counts=True)
+    best = np.zeros(g.max() + 1, dtype=np.int64)
+    np.maximum.at(best, uniq[:, 0], counts)
+    return float(best.sum() / len(g))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=50_000)
+    ap.add_argument("--dim", type=int, default=1536)
+    ap.add_argument("--events", type=int, default=5_000)
+    ap.add_argument("--noise", type=float, default=0.5, help="잡음 크기 (cosine ≈ 1/(1+noise²))")
+    ap.add_argument("--hours", type=float, default=72)
+    ap.add_argument("--threshold", type=float, default=0.7)
+    ap.add_argument("--min-samples", type=int, default=2)
+    ap.add_argument("--max-gap-hours", type=float, default=48)
+    ap.add_argument("--block", type=int, default=2048)
+    ap.add_argument("--prefilter-dim", type=int, default=256, help="0 = 전체 차원으로만 계산")
+    ap.add_argument("--prefilter-margin", type=float, default=0.1)
+    ap.add_argument("--exact", action="store_true", help="전체 차원 결과와 쌍 recall 비교")
+    ap.add_argument("--blocking", choices=["exact", "lsh"], default="exact")
+    ap.add_argument("--bits", type=int, default=None, help="비우면 auto_bits(n)")
+    ap.add_argument("--tables", type=int, default=None, help="비우면 --target-recall 로 계산")
+    ap.add_argument("--target-recall", type=float, default=0.95)
+    ap.add_argument("--max-bucket", type=int, default=256)
+    args = ap.parse_args()
+
+    mat, ts, truth = synthetic(args.n, args.dim, args.events, args.noise, args.hours)
+    print(f"📦 {args.n} articles × {args.dim} dims, {args.events} true events")
+
+    lsh = None
+    if args.blocking == "lsh":
+        bits = args.bits or auto_bits(args.n)
+        lsh = {"n_bits": bits, "max_bucket": args.max_bucket,
+               "n_tables": args.tables or tune(args.threshold, args.target_recall, bits)["n_tables"]}
+        print(f"🪣 lsh: {lsh}")
+
+    t0 = time.perf_counter()
+    i, j, s = similar_pairs(mat, args.threshold, ts, args.max_gap_hours * 3600, args.block,
+                            args.prefilter_dim, args.prefilter_margin, args.blocking, lsh)
+    t_pairs = time.perf_counter() - t0
+    if args.exact:
+        t0 = time.perf_counter()
+        ei, ej, _ = similar_pairs(mat, args.threshold, ts, args.max_gap_hours * 3600, args.block)
+        found = set(zip(i.tolist(), j.tolist()))
+        hit = sum((a, b) in found for a, b in zip(ei.tolist(), ej.tolist()))
+        print(f"🔍 exact pairs: {len(ei):>10}  {time.perf_counter() - t0:8.2f}s  ({args.blocking} recall {hit / max(1, len(ei)):.4f})")
+
+    t0 = time.perf_counter()
+    labels = density_labels(len(mat), i, j, s, args.min_samples)
+    clusters = cluster_members(labels, mat)
+    t_cluster = time.perf_counter() - t0
+
+    print(f"🔗 pairs      : {len(i):>10}  {t_pairs:8.2f}s")
+    print(f"🧩 clusters   : {len(clusters):>10}  {t_cluster:8.2f}s")
+    print(f"🎯 purity     : {_majority_share(labels, truth):10.3f}")
+    print(f"🎯 complete   : {_majority_share(truth, np.where(labels >= 0, labels, -1 - np.arange(len(labels)))):10.3f}")
+    print(f"🔇 noise      : {(labels < 0).mean():10.3f}")
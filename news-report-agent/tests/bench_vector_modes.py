@@ -0,0 +1,110 @@
+# tests/bench_vector_modes.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 📏 벡터 저장/검색 모드별 recall · latency 벤치마크
+#   - 정답: 저장된 full precision 벡터로 numpy 정확 검색 (brute force)
+#   - DB 모드: full / half / binary(+ full precision re-rank) 를 실제 search()로 호출
+#   - 차원 축소: text-embedding-3 의 dimensions 파라미터와 같은 방식(앞쪽 d개 + 재정규화)을
+#     numpy로 흉내내서 recall과 벡터당 바이트 비교
+#
+# 사용:
+#   python -m tests.bench_vector_modes --queries 200 --top-k 10 --build
+# ─────────────────────────────────────────────────────────────────────────────
+import argparse
+import time
+
+import numpy as np
+from pgvector.psycopg2 import register_vector
+
+from services.db_services import get_conn
+from services.embedding_providers import get_provider
+from services import vector_search
+
+BYTES_PER_DIM = {"full": 4.0, "half": 2.0, "binary": 1 / 8}
+
+
+def load_vectors(model: str, dim: int):
+    with get_conn() as conn:
+        register_vector(conn)
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT article_id, embedding FROM article_embeddings WHERE model = %s AND dim = %s ORDER BY article_id;",
+                (model, dim),
+            )
+            rows = cur.fetchall()
+    ids = np.array([r[0] for r in rows], dtype=np.int64)
+    # pgvector>=0.3 는 Vector 객체, 이전 버전은 numpy 배열을 돌려줌
+    vecs = [r[1].to_numpy() if hasattr(r[1], "to_numpy") else r[1] for r in rows]
+    mat = np.vstack(vecs).astype(np.float32) if vecs else np.zeros((0, dim), np.float32)
+    return ids, mat
+
+
+def normalize(m: np.ndarray) -> np.ndarray:
+    return m / np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+
+
+def exact_topk(mat: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    sims = queries @ mat.T
+    part = np.argpartition(-sims, min(k, sims.shape[1] - 1), axis=1)[:, :k]
+    order = np.take_along_axis(sims, part, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(part, order, axis=1)
+
+
+def recall(truth: list[set], found: list[set]) -> float:
+    hits = sum(len(t & f) for t, f in zip(truth, found))
+    return hits / max(1, sum(len(t) for t in truth))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=None, help="provider 이름 (기본: crew_settings.yaml)")
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("--top-k", type=int, default=10)
+    ap.add_argument("--noise", type=float, default=0.05, help="질의 = 저장 벡터 + 가우시안 잡음")
+    ap.add_argument("--rerank-factor", type=int, default=4)
+    ap.add_argument("--build", action="store_true", help="half/binary 인덱스가 없으면 생성")
+    args = ap.parse_args()
+
+    provider = get_provider(args.model)
+    ids, mat = load_vectors(provider.name, provider.dim)
+    if len(ids) < args.top_k:
+        raise SystemExit(f"❌ {provider.name}: 벡터 {len(ids)}개 — 먼저 임베딩을 생성하세요")
+
+    rng = np.random.default_rng(0)
+    pick = rng.choice(len(ids), size=min(args.queries, len(ids)), replace=False)
+    queries = normalize(mat[pick] + rng.normal(0, args.noise / np.sqrt(provider.dim), mat[pick].shape).astype(np.float32))
+    truth_idx = exact_topk(mat, queries, args.top_k)
+    truth = [set(ids[row].tolist()) for row in truth_idx]
+
+    print(f"📦 {provider.name}: {len(ids)} vectors × {provider.dim} dims, {len(queries)} queries, top_k={args.top_k}\n")
+
+    # ① DB 검색 모드
+    print(f"{'mode':<8}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}{'bytes/vec':>12}")
+    for mode in vector_search.SEARCH_MODES:
+        try:
+            if args.build:
+                vector_search.ensure_index(provider.dim, mode)
+            lat, found = [], []
+            for q in queries:
+                t0 = time.perf_counter()
+                rows = vector_search.search(q, provider.name, top_k=args.top_k, mode=mode,
+                                            rerank_factor=args.rerank_factor)
+                lat.append((time.perf_counter() - t0) * 1000)
+                found.append({r["id"] for r in rows})
+        except Exception as e:
+            print(f"{mode:<8}  unsupported: {str(e).splitlines()[0]}")
+            continue
+        lat.sort()
+        print(f"{mode:<8}{recall(truth, found):>10.3f}{lat[len(lat) // 2]:>10.2f}"
+              f"{lat[min(len(lat) - 1, int(len(lat) * 0.95))]:>10.2f}{provider.dim * BYTES_PER_DIM[mode]:>12.0f}")
+
+    # ② 차원 축소 (numpy 정확 검색, full precision)
+    print(f"\n{'dims':<8}{'recall@k':>10}{'ms/query':>10}{'bytes/vec':>12}")
+    for d in sorted({provider.dim, 1024, 768, 512, 256}, reverse=True):
+        if d > provider.dim:
+            continue
+        sub = normalize(mat[:, :d])
+        q = normalize(queries[:, :d])
+        t0 = time.perf_counter()
+        idx = exact_topk(sub, q, args.top_k)
+        ms = (time.perf_counter() - t0) * 1000 / len(q)
+        print(f"{d:<8}{recall(truth, [set(ids[row].tolist()) for row in idx]):>10.3f}{ms:>10.3f}{d * 4:>12}")
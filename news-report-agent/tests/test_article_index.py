@@ -0,0 +1,142 @@
+# tests/test_article_index.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 known-article 인덱스 + 다른 upsert 경로의 forget (DB 없이 — 연결은 가짜 객체)
+#   python -m pytest -q tests/test_article_index.py
+# ─────────────────────────────────────────────────────────────────────────────
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from models import Article
+from services import async_db, db_services
+from services.article_index import KnownArticleIndex
+
+URL = "https://example.com/news/1"
+PUB = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+        self.next_id = 100
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.log.append(params)
+
+    def fetchone(self):
+        self.next_id += 1
+        return (self.next_id,)
+
+
+class FakeConn:
+    def __init__(self):
+        self.log = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+
+class FakeAsyncCursor:
+    def __init__(self, log):
+        self.log = log
+        self.rows = []
+
+    async def executemany(self, sql, params, returning=False):
+        params = list(params)
+        self.log.extend(params)
+        self.rows = [(100 + k,) for k in range(len(params))]
+
+    async def fetchone(self):
+        return self.rows[0]
+
+    def nextset(self):
+        self.rows = self.rows[1:]
+        return bool(self.rows) or None
+
+
+class FakeAsyncCM:
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeAsyncConn:
+    def __init__(self):
+        self.log = []
+
+    def transaction(self):
+        return FakeAsyncCM(None)
+
+    def cursor(self):
+        return FakeAsyncCursor(self.log)
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeAsyncConn()
+
+    def connection(self):
+        return FakeAsyncCM(self.conn)
+
+
+@pytest.fixture
+def index(monkeypatch):
+    idx = KnownArticleIndex()
+    idx.record(URL, "h1", "title", PUB)
+    idx.warmed = True
+    monkeypatch.setattr(db_services, "get_index", lambda conn=None: idx)
+    monkeypatch.setattr(async_db, "get_index", lambda conn=None: idx)
+    return idx
+
+
+def _article():
+    return Article(outlet_id=1, url=URL, title="title", published_at=PUB, body="본문", hash_sha256="h1")
+
+
+def test_index_skips_only_known_unchanged_rows():
+    idx = KnownArticleIndex()
+    idx.record(URL, "h1", "title", PUB)
+    assert idx.is_unchanged(URL, "h1", "title", PUB)
+    assert not idx.is_unchanged(URL, "h1", "title (수정)", PUB)
+    assert not idx.is_unchanged(URL, None, "title", PUB)  # 본문 해시 없는 행은 항상 upsert
+    assert not idx.is_unchanged("https://example.com/other", "h1", "title", PUB)
+    assert idx.stats()["hits"] == 1 and idx.stats()["stale"] == 1 and idx.stats()["misses"] == 2
+
+
+def test_sync_upsert_forgets_pydantic_urls(index, monkeypatch):
+    conn = FakeConn()
+    monkeypatch.setattr(db_services, "get_conn", lambda: conn)
+    assert db_services.upsert_articles([_article()]) == [101]
+    assert conn.log[0]["url"] == URL and isinstance(conn.log[0]["url"], str)
+    assert len(index) == 0
+    assert not index.is_unchanged(URL, "h1", "title", PUB)
+
+
+def test_async_upsert_forgets_pydantic_urls(index, monkeypatch):
+    pool = FakePool()
+
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(async_db, "get_pool", get_pool)
+    assert asyncio.run(async_db.upsert_articles([_article()])) == [100]
+    assert pool.conn.log[0]["url"] == URL
+    assert len(index) == 0
@@ -0,0 +1,133 @@
+# tests/test_embedding_executor.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 임베딩 실행기 — token bucket 충전 / 오류 분류 / input 오류만 배치 분할 (가짜 provider, 가짜 시계)
+#   python -m pytest -q tests/test_embedding_executor.py
+# ─────────────────────────────────────────────────────────────────────────────
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services import embedding_executor
+from services.embedding_executor import EmbeddingExecutor, RateLimiter, is_input_error, is_retryable
+
+
+class FakeClock:
+    """monotonic / sleep 대체 — sleep 하면 시간만 앞으로 감"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class APIError(Exception):
+    def __init__(self, status=None, code=None, headers=None):
+        super().__init__(f"status {status}")
+        self.status_code = status
+        self.code = code
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(embedding_executor, "time",
+                        SimpleNamespace(monotonic=c.monotonic, sleep=c.sleep, perf_counter=time.perf_counter))
+    return c
+
+
+def _batch(n, tokens=10):
+    return [(f"k{i}", f"text {i}", tokens) for i in range(n)]
+
+
+def test_rate_limiter_starts_full_then_refills(clock):
+    limiter = RateLimiter(rpm=60, tpm=600)  # 초당 요청 1개, 토큰 10개
+    assert limiter.acquire(300) == 0.0
+    assert limiter.acquire(300) == 0.0     # 토큰 버킷 소진
+    waited = limiter.acquire(20)           # 토큰 20개 = 2초 충전
+    assert waited == pytest.approx(2.0)
+    clock.now += 600                       # 오래 쉬어도 버킷 용량 이상은 쌓이지 않음
+    limiter._refill(clock.now)
+    assert (limiter._req, limiter._tok) == (60, 600)
+
+
+def test_rate_limiter_oversized_request_and_cooldown(clock):
+    limiter = RateLimiter(rpm=60, tpm=100)
+    assert limiter.acquire(10_000) == 0.0  # 버킷보다 큰 요청은 버킷 크기로 잘라서 통과
+    limiter = RateLimiter(rpm=60, tpm=600)
+    limiter.cooldown(3.0)
+    assert limiter.scale == pytest.approx(0.7)
+    assert limiter.acquire(1) == pytest.approx(3.0)  # 일시정지 동안 대기
+    limiter.recover()
+    assert limiter.scale == pytest.approx(0.735)
+
+
+def test_error_classification():
+    assert is_retryable(APIError(429)) and is_retryable(APIError(503))
+    assert is_retryable(APIConnectionError())
+    assert not is_retryable(APIError(429, code="insufficient_quota"))
+    assert not is_retryable(APIError(400)) and not is_retryable(APIError(401))
+
+    assert is_input_error(APIError(400)) and is_input_error(APIError(413))
+    assert is_input_error(ValueError("bad text"))  # 로컬 provider의 입력 처리 오류
+    assert not is_input_error(APIError(401)) and not is_input_error(APIError(429))
+    assert not is_input_error(APIError(400, code="insufficient_quota"))
+    assert not is_input_error(RuntimeError("boom"))
+
+
+def test_run_batch_bisects_input_errors_only(clock):
+    calls = []
+
+    def embed(texts):
+        calls.append(len(texts))
+        if "text 5" in texts:
+            raise APIError(400)
+        return [[float(len(t))] for t in texts]
+
+    ex = EmbeddingExecutor(embed, max_retries=0)
+    vectors, failed = ex._run_batch(_batch(8))
+    assert sorted(failed) == ["k5"]
+    assert sorted(vectors) == [f"k{i}" for i in range(8) if i != 5]
+    assert calls == [8, 4, 4, 2, 1, 1, 2]   # 실패한 절반만 다시 분할 (깊이 우선)
+    assert ex.stats()["splits"] == 3
+
+
+def test_run_batch_fails_whole_batch_on_non_input_error(clock):
+    calls = []
+
+    def embed(texts):
+        calls.append(len(texts))
+        raise APIError(401)
+
+    ex = EmbeddingExecutor(embed, max_retries=0)
+    vectors, failed = ex._run_batch(_batch(8))
+    assert vectors == {} and sorted(failed) == [f"k{i}" for i in range(8)]
+    assert calls == [8] and ex.stats()["splits"] == 0
+
+
+def test_call_retries_with_retry_after_hint(clock):
+    responses = [APIError(429, headers={"retry-after-ms": "1500"}), None]
+
+    def embed(texts):
+        error = responses.pop(0)
+        if error is not None:
+            raise error
+        return [[1.0] for _ in texts]
+
+    ex = EmbeddingExecutor(embed, max_retries=2)
+    vectors, failed = ex.run([_batch(2)])
+    assert failed == {} and sorted(vectors) == ["k0", "k1"]
+    stats = ex.stats()
+    assert (stats["requests"], stats["retries"], stats["rate_limited"]) == (2, 1, 1)
+    assert clock.slept and sum(clock.slept) == pytest.approx(1.5)
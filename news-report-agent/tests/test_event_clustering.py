@@ -0,0 +1,83 @@
+# tests/test_event_clustering.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 사건 클러스터링 엔진 (DB 없이) — 쌍 / 연결요소 / 밀도 라벨 / 클러스터 평균
+#   python -m pytest -q tests/test_event_clustering.py
+# ─────────────────────────────────────────────────────────────────────────────
+import numpy as np
+
+from services.event_clustering import (
+    _drop_taken,
+    _normalize,
+    cluster_members,
+    connected_components,
+    density_labels,
+    similar_pairs,
+)
+
+
+def _unit(rows):
+    return _normalize(np.asarray(rows, np.float32))
+
+
+# 0-1-2 사슬, 3-4 쌍, 5 단독
+I = np.array([0, 1, 3])
+J = np.array([1, 2, 4])
+S = np.array([0.9, 0.9, 0.95], np.float32)
+
+
+def test_connected_components_root_is_min_index():
+    assert connected_components(6, I, J).tolist() == [0, 0, 0, 3, 3, 5]
+    assert connected_components(3, np.zeros(0, np.int64), np.zeros(0, np.int64)).tolist() == [0, 1, 2]
+
+
+def test_density_labels_threshold_components():
+    # min_samples=2 → 임계값 연결요소, 단독 원소는 noise, 라벨은 첫 원소 순
+    assert density_labels(6, I, J, S, min_samples=2).tolist() == [0, 0, 0, 1, 1, -1]
+
+
+def test_density_labels_border_joins_nearest_core():
+    # min_samples=3 → core는 1 하나, 0/2는 border로 합류, 3-4는 core가 없어 noise
+    assert density_labels(6, I, J, S, min_samples=3).tolist() == [0, 0, 0, -1, -1, -1]
+
+
+def test_similar_pairs_matches_brute_force():
+    rng = np.random.default_rng(0)
+    mat = _normalize(rng.normal(size=(300, 16)).astype(np.float32))
+    i, j, s = similar_pairs(mat, 0.6, block=64)
+    sims = mat @ mat.T
+    want = {(a, b) for a, b in zip(*np.nonzero(np.triu(sims, 1) >= 0.6))}
+    assert set(zip(i.tolist(), j.tolist())) == want
+    assert np.allclose(s, sims[i, j], atol=1e-5)
+
+
+def test_similar_pairs_respects_max_gap():
+    mat = _unit([[1, 0], [1, 0.01], [1, 0.02]])
+    ts = np.array([0.0, 10.0, 100.0])
+    i, j, _ = similar_pairs(mat, 0.9, ts=ts, max_gap_sec=50)
+    assert list(zip(i.tolist(), j.tolist())) == [(0, 1)]
+
+
+def test_cluster_members_centroid_and_min_size():
+    mat = _unit([[1, 0], [1, 0.2], [1, -0.2], [0, 1], [0.1, 1]])
+    labels = np.array([0, 0, 0, 1, -1])
+    out = cluster_members(labels, mat, min_size=2)
+    assert len(out) == 1  # 라벨 1은 멤버 하나 → 제외
+    members, sims, centroid, mean = out[0]
+    assert members.tolist() == [0, 1, 2]
+    assert centroid == 0  # 평균 방향 = [1, 0]
+    assert np.allclose(mean / np.linalg.norm(mean), [1, 0], atol=1e-6)
+    assert sims[0] > sims[1] and np.isclose(sims[1], sims[2])
+
+
+def test_drop_taken_recomputes_or_skips_clusters():
+    mat = _unit([[1, 0], [1, 0.2], [1, -0.2], [0, 1], [0.1, 1]])
+    clusters = cluster_members(np.array([0, 0, 0, 1, 1]), mat, min_size=2)
+    # 0(centroid)은 다른 실행이 배정 → 나머지 둘로 재계산, 3 빠진 사건은 min_size 미만 → 제외
+    out = _drop_taken(clusters, np.array([True, False, False, True, False]), mat, min_size=2)
+    assert len(out) == 1
+    members, sims, centroid, mean = out[0]
+    assert members.tolist() == [1, 2] and centroid in (1, 2)
+    assert np.allclose(mean / np.linalg.norm(mean), [1, 0], atol=1e-6)
+    assert np.allclose(sims, sims[0])
+    # 배정된 기사가 없으면 그대로
+    assert _drop_taken(clusters, np.zeros(5, bool), mat, 2) == clusters
@@ -0,0 +1,89 @@
+# tests/test_event_maintenance.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 사건 병합 / 분할 유지보수 (DB 없이 — dry_run 경로만)
+#   python -m pytest -q tests/test_event_maintenance.py
+# ─────────────────────────────────────────────────────────────────────────────
+import struct
+from datetime import datetime, timezone
+
+import numpy as np
+
+from services.event_maintenance import Members, _merge_block, _split_block
+
+CFG = {"threshold": 0.85, "min_samples": 2, "max_gap_hours": None,
+       "merge_threshold": 0.9, "split_cohesion": 0.8, "split_min_size": 4}
+
+
+def _send(vec):
+    """vector_send() 형식: int16 dim + int16 unused + float32 big-endian"""
+    return struct.pack(">hh", len(vec), 0) + np.asarray(vec, ">f4").tobytes()
+
+
+def _members(rows):
+    """rows: (event_id, article_id, vector) — 같은 사건끼리 연속"""
+    return Members([(e, a, float(a), f"title {a}", None, _send(v)) for e, a, v in rows], dim=2)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_members_groups_and_cohesion():
+    m = _members([(10, 1, [1, 0]), (10, 2, [1, 0]), (20, 3, [1, 0]), (20, 4, [0, 1])])
+    assert m.event_ids.tolist() == [10, 20]
+    assert m.starts.tolist() == [0, 2] and m.sizes.tolist() == [2, 2]
+    means, sims, cohesion = m.stats()
+    assert np.allclose(cohesion, [1.0, 0.0], atol=1e-6)  # 멤버 쌍 cosine 평균
+    assert np.allclose(means[1], [0.5, 0.5])
+    assert np.allclose(sims[2:], np.sqrt(0.5), atol=1e-6)
+
+
+def test_split_keeps_largest_group_and_moves_rest():
+    # 사건 10: [1,0] 방향 3개 + [0,1] 방향 2개 → 큰 묶음은 남고 작은 묶음 하나가 새 사건
+    m = _members([(10, 1, [1, 0]), (10, 2, [1, 0.05]), (10, 3, [1, -0.05]),
+                  (10, 4, [0, 1]), (10, 5, [0.05, 1]),
+                  (20, 6, [1, 0]), (20, 7, [1, 0.01]), (20, 8, [1, 0.02]), (20, 9, [1, 0.03])])
+    _, _, cohesion = m.stats()
+    split, created = _split_block(None, m, cohesion, CFG, dry_run=True)
+    assert split == [10]
+    assert created == [-1]
+
+
+def test_split_noise_articles_become_single_events():
+    m = _members([(10, 1, [1, 0]), (10, 2, [1, 0.05]), (10, 3, [0, 1]), (10, 4, [-1, 0.2])])
+    _, _, cohesion = m.stats()
+    split, created = _split_block(None, m, cohesion, CFG, dry_run=True)
+    assert split == [10] and len(created) == 2
+
+
+def test_split_skips_small_or_cohesive_events():
+    m = _members([(10, 1, [1, 0]), (10, 2, [0, 1]), (10, 3, [-1, 0])])  # split_min_size 미만
+    _, _, cohesion = m.stats()
+    assert _split_block(None, m, cohesion, CFG, dry_run=True) == ([], [])
+
+
+def test_merge_maps_to_largest_event():
+    now = datetime.now(timezone.utc)
+    rows = [
+        (1, 3, 0.0, 10.0, _send([1, 0])),
+        (2, 5, 0.0, 10.0, _send([1, 0.01])),   # 1과 수렴, 멤버가 더 많음 → 남음
+        (3, 5, 0.0, 10.0, _send([1, -0.01])),  # 동률이면 id가 작은 2가 남음
+        (4, 9, 0.0, 10.0, _send([0, 1])),      # 무관
+    ]
+    mapping = _merge_block(FakeCursor(rows), "hash", 2, [1], now, CFG, dry_run=True)
+    assert mapping == {1: 2, 3: 2}
+
+
+def test_merge_respects_max_gap():
+    now = datetime.now(timezone.utc)
+    rows = [(1, 3, 0.0, 3600.0, _send([1, 0])), (2, 5, 10 * 3600.0, 11 * 3600.0, _send([1, 0]))]
+    cfg = {**CFG, "max_gap_hours": 2}
+    assert _merge_block(FakeCursor(rows), "hash", 2, [1], now, cfg, dry_run=True) == {}
+    assert _merge_block(FakeCursor(rows), "hash", 2, [1], now, {**cfg, "max_gap_hours": 24}, dry_run=True) == {1: 2}
@@ -0,0 +1,84 @@
+# tests/test_event_scoring.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 사건 event_cred / conflicts 집계 (DB 없이 — _load_rows 대신 고정 행, dry_run)
+#   python -m pytest -q tests/test_event_scoring.py
+# ─────────────────────────────────────────────────────────────────────────────
+import numpy as np
+
+from services import event_scoring
+from services.event_scoring import _conflicts, _distinct_per_group, _title_numbers
+
+H = 3600.0
+CFG = {
+    "weights": dict(event_scoring.DEFAULT_WEIGHTS),
+    "outlet_scale": 2.0, "country_scale": 1.5, "time_full_hours": 6.0,
+    "conflict_penalty": 0.05, "max_penalty": 0.3, "time_conflict_hours": 6.0,
+    "future_tolerance_hours": 1.0, "low_similarity": 0.6, "max_gap_hours": 48.0,
+}
+
+
+def _flags(rows):
+    """rows: (article, outlet, pub, fetched, hash, title, sim)"""
+    cols = list(zip(*rows))
+    return _conflicts(slice(0, len(rows)), np.asarray(cols[0]), np.asarray(cols[1]),
+                      np.asarray(cols[2], np.float64), np.asarray(cols[3], np.float64),
+                      list(cols[4]), list(cols[5]), np.asarray(cols[6], np.float64), CFG)
+
+
+def test_distinct_per_group_ignores_invalid():
+    group = np.array([0, 0, 0, 1, 1])
+    values = np.array([5, 5, 6, 7, -1])
+    assert _distinct_per_group(group, values, values >= 0, 3).tolist() == [2, 1, 0]
+
+
+def test_title_numbers_first_per_unit():
+    assert _title_numbers("Quake kills 1,200 people, 3.5% GDP hit") == {"people": "1200", "%": "3.5"}
+    assert _title_numbers("사망자 30명, 피해 5억 (부상 12명)") == {"명": "30", "억": "5"}
+
+
+def test_conflicts_same_body_time_gap_and_future():
+    flags = _flags([
+        (1, 1, 0.0, 0.0, "h", "a", 0.9),
+        (2, 2, 8 * H, 8 * H, "h", "b", 0.9),        # 같은 본문, 8h 늦게 게시
+        (3, 3, 5 * H, 2 * H, None, "c", 0.9),        # 수집 3h 뒤 게시
+    ])
+    assert flags == ["게시 시각 불일치: 같은 본문 기사 1·2 (8.0h 차이)",
+                     "미래 게시 시각: 기사 3 (수집 3.0h 뒤)"]
+
+
+def test_conflicts_title_numbers_across_outlets_only():
+    same_outlet = _flags([(1, 1, 0.0, 0.0, None, "30 dead", 0.9), (2, 1, 0.0, 0.0, None, "32 dead", 0.9)])
+    assert same_outlet == []
+    other_outlet = _flags([(1, 1, 0.0, 0.0, None, "30 dead", 0.9), (2, 2, 0.0, 0.0, None, "32 dead", 0.9)])
+    assert other_outlet == ["제목 수치 불일치 (dead): 30 / 32"]
+
+
+def test_conflicts_outlier_time_and_low_similarity():
+    flags = _flags([
+        (1, 1, 0.0, 0.0, None, "a", 0.9),
+        (2, 2, H, H, None, "b", 0.9),
+        (3, 3, 100 * H, 100 * H, None, "c", 0.5),
+    ])
+    assert flags == ["게시 시각 이상치: 기사 3 (중앙값과 99h 차이)", "낮은 유사도 기사: 3 (0.50)"]
+
+
+def test_score_events_aggregates(monkeypatch):
+    rows = [
+        # event, article, outlet, country, pub, fetched, hash, title, similarity
+        (1, 11, 1, "KR", 0.0, 0.0, None, "a", 0.9),
+        (1, 12, 2, "US", 6 * H, 6 * H, None, "b", 0.9),
+        (1, 13, 3, "US", 3 * H, 3 * H, None, "c", 0.9),
+        (2, 21, 1, None, 0.0, 0.0, None, "d", None),
+        (2, 22, 1, None, None, 0.0, None, "e", None),
+    ]
+    monkeypatch.setattr(event_scoring, "_load_rows", lambda ids: rows)
+    monkeypatch.setattr(event_scoring, "_settings", lambda: CFG)
+    out = event_scoring.score_events(dry_run=True)
+    assert out["events"] == 2 and out["updated"] == 0
+    a, b = out["scores"][1], out["scores"][2]
+    assert (a["outlets"], a["countries"], a["span_hours"]) == (3, 2, 6.0)
+    assert a["similarity_mean"] == 0.9 and a["similarity_std"] == 0.0
+    assert (b["outlets"], b["countries"], b["span_hours"], b["similarity_mean"]) == (1, 0, 0.0, None)
+    # b: 언론사/국가/시간 특징 0, similarity 없음 → cohesion 중립 0.5 × 0.3
+    assert b["event_cred"] == 0.15
+    assert a["event_cred"] > b["event_cred"]
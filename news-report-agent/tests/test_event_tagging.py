@@ -0,0 +1,48 @@
+# tests/test_event_tagging.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 TF-IDF 사건 태그 (DB 없이)
+#   python -m pytest -q tests/test_event_tagging.py
+# ─────────────────────────────────────────────────────────────────────────────
+import numpy as np
+
+from services.event_tagging import top_terms, tokenize
+
+
+def _docs(token_lists):
+    """[[term, ...], ...] → (doc_index, term_index, terms)"""
+    terms = sorted({t for doc in token_lists for t in doc})
+    pos = {t: k for k, t in enumerate(terms)}
+    doc_index = np.asarray([d for d, doc in enumerate(token_lists) for _ in doc], np.int64)
+    term_index = np.asarray([pos[t] for doc in token_lists for t in doc], np.int64)
+    return doc_index, term_index, terms
+
+
+def test_tokenize_unigrams_and_bigrams():
+    assert tokenize("The Federal Reserve raised rates in 2024") == [
+        "federal", "reserve", "raised", "rates",
+        "federal reserve", "reserve raised", "raised rates",
+    ]
+    # 불용어 / 숫자를 낀 bigram은 만들지 않음
+    assert tokenize("rates in 2024", ngram_max=2) == ["rates"]
+
+
+def test_tokenize_strips_korean_josa():
+    assert tokenize("한국은행이 기준금리를 인상했다", ngram_max=1) == ["한국은행", "기준금리", "인상했다"]
+
+
+def test_top_terms_ranks_by_tfidf():
+    doc_index, term_index, terms = _docs([["opec", "opec", "oil", "price"], ["oil", "price", "price"]])
+    df = {"opec": 2, "oil": 40, "price": 90}
+    out = top_terms(doc_index, term_index, terms, df, n_docs=100, top_k=2, min_df=2, max_df_ratio=0.5)
+    assert out == {0: ["opec", "oil"], 1: ["oil"]}  # price는 max_df_ratio 초과
+
+
+def test_top_terms_min_df_and_bigram_dedup():
+    doc_index, term_index, terms = _docs([["federal reserve", "federal", "reserve", "typo"]])
+    df = {"federal reserve": 3, "federal": 5, "reserve": 5, "typo": 1}
+    out = top_terms(doc_index, term_index, terms, df, n_docs=100, top_k=5, min_df=2)
+    assert out == {0: ["federal reserve"]}  # bigram의 일부 unigram 제외, df 1인 term 제외
+
+
+def test_top_terms_empty():
+    assert top_terms(np.zeros(0, np.int64), np.zeros(0, np.int64), [], {}, n_docs=10) == {}
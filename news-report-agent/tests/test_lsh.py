@@ -0,0 +1,69 @@
+# tests/test_lsh.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 random hyperplane LSH blocking (DB 없이)
+#   python -m pytest -q tests/test_lsh.py
+# ─────────────────────────────────────────────────────────────────────────────
+import numpy as np
+
+from services.event_clustering import _normalize, resolve_blocking, similar_pairs
+from services.lsh import HyperplaneLSH, auto_bits, bucket_pairs, expected_recall, tune
+
+# table 0: {0, 2, 4} 같은 bucket / table 1: {0, 1}, {3, 4}
+CODES = np.array([[1, 7], [2, 7], [1, 8], [3, 9], [1, 9]])
+
+
+def _pairs(i, j):
+    return list(zip(i.tolist(), j.tolist()))
+
+
+def test_bucket_pairs_union_of_tables():
+    assert _pairs(*bucket_pairs(CODES)) == [(0, 1), (0, 2), (0, 4), (2, 4), (3, 4)]
+
+
+def test_bucket_pairs_max_bucket_limits_offset():
+    # max_bucket=2 → bucket 안에서 바로 옆(입력 순서) 원소끼리만
+    assert _pairs(*bucket_pairs(CODES, max_bucket=2)) == [(0, 1), (0, 2), (2, 4), (3, 4)]
+
+
+def test_bucket_pairs_empty():
+    assert _pairs(*bucket_pairs(CODES[:1])) == []
+    assert _pairs(*bucket_pairs(np.array([[1], [2], [3]]))) == []
+
+
+def test_signatures_deterministic():
+    rng = np.random.default_rng(0)
+    mat = _normalize(rng.normal(size=(50, 32)).astype(np.float32))
+    a = HyperplaneLSH(32, n_bits=10, n_tables=4, seed=3).signatures(mat)
+    b = HyperplaneLSH(32, n_bits=10, n_tables=4, seed=3).signatures(mat)
+    assert a.shape == (50, 4) and (a == b).all()
+    assert a.min() >= 0 and a.max() < 2 ** 10
+
+
+def test_tune_reaches_target_recall():
+    t = tune(0.85, 0.95, n_bits=14)
+    assert t["recall_at_threshold"] >= 0.95
+    assert expected_recall(0.85, 14, t["n_tables"] - 1) < 0.95  # 최소 table 수
+
+
+def test_auto_bits_bounds():
+    assert auto_bits(1000) == 11
+    assert auto_bits(1) == 8
+    assert auto_bits(10 ** 9) == 24
+
+
+def test_lsh_pairs_subset_of_exact():
+    rng = np.random.default_rng(1)
+    centers = _normalize(rng.normal(size=(20, 64)).astype(np.float32))
+    mat = _normalize(centers[rng.integers(0, 20, 400)] + rng.normal(0, 0.02, (400, 64)).astype(np.float32))
+    exact = set(_pairs(*similar_pairs(mat, 0.9)[:2]))
+    i, j, s = similar_pairs(mat, 0.9, blocking="lsh", lsh={"n_bits": 10, "n_tables": 16, "max_bucket": 256})
+    found = set(_pairs(i, j))
+    assert found <= exact and (s >= 0.9).all()
+    assert len(found) / len(exact) > 0.95
+
+
+def test_resolve_blocking_auto():
+    cfg = {"blocking": "auto", "lsh": {"auto_min_rows": 1000}}
+    assert resolve_blocking(999, cfg) == "exact"
+    assert resolve_blocking(1000, cfg) == "lsh"
+    assert resolve_blocking(10, {"blocking": "lsh"}) == "lsh"
@@ -0,0 +1,50 @@
+# tests/test_near_dup.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 MinHash / LSH band 서명 (DB 없이)
+#   python -m pytest -q tests/test_near_dup.py
+# ─────────────────────────────────────────────────────────────────────────────
+import zlib
+
+import numpy as np
+
+from services.near_dup import band_keys, jaccard, minhash, shingles
+
+
+def _text(n, start=0):
+    return " ".join(f"w{k}" for k in range(start, start + n))
+
+
+def test_shingles_word_kgrams():
+    assert shingles("One two three four five six", 5).tolist() == sorted(
+        [zlib.crc32(b"one two three four five"), zlib.crc32(b"two three four five six")])
+    assert shingles("A b", 5).tolist() == [zlib.crc32(b"a b")]  # k보다 짧으면 전체가 하나
+    assert len(shingles("", 5)) == 0
+
+
+def test_minhash_deterministic_and_empty():
+    h = shingles(_text(100))
+    assert (minhash(h, 64, seed=1) == minhash(h, 64, seed=1)).all()
+    assert not (minhash(h, 64, seed=1) == minhash(h, 64, seed=2)).all()
+    assert (minhash(np.zeros(0, np.uint64), 8) == 0xFFFFFFFF).all()
+
+
+def test_minhash_estimates_jaccard():
+    # 1000단어 중 뒤 200단어만 다름 → shingle Jaccard = 796 / 1196 ≈ 0.666
+    a, b = shingles(_text(1000)), shingles(_text(800) + " " + _text(200, start=5000))
+    true = len(np.intersect1d(a, b)) / len(np.union1d(a, b))
+    est = jaccard(minhash(a, 256), minhash(b, 256))
+    assert abs(est - true) < 0.08
+    assert jaccard(minhash(a, 128), minhash(a, 128)) == 1.0
+    assert jaccard(minhash(a, 128), minhash(shingles(_text(1000, start=9000)), 128)) < 0.05
+
+
+def test_band_keys_collide_only_on_equal_bands():
+    sig = minhash(shingles(_text(300)), 128)
+    other = sig.copy()
+    other[0] ^= 1  # 첫 band만 다름
+    ka, kb = band_keys(sig, 16), band_keys(other, 16)
+    assert len(ka) == 16 and all(-2 ** 63 <= k < 2 ** 63 for k in ka)
+    assert ka[0] != kb[0] and ka[1:] == kb[1:]
+    # 같은 행 값이라도 band 번호가 다르면 다른 키
+    same = np.zeros(128, np.uint32)
+    assert len(set(band_keys(same, 16))) == 16
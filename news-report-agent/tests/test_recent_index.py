@@ -0,0 +1,76 @@
+# tests/test_recent_index.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 최근 기사 mmap 인덱스 — append / tombstone / compaction (DB 없이 — tmp_path에 스냅샷)
+#   python -m pytest -q tests/test_recent_index.py
+# ─────────────────────────────────────────────────────────────────────────────
+import os
+import time
+
+import numpy as np
+import pytest
+
+from services.recent_index import RecentVectorIndex
+
+DIM = 4
+
+
+@pytest.fixture
+def index(tmp_path):
+    return RecentVectorIndex("hash:4", DIM, root=str(tmp_path), window_hours=24).open()
+
+
+def _vecs(n, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+
+def test_empty_index_searches_nothing(index):
+    assert not index.ready
+    assert index.search([1, 0, 0, 0], top_k=3) == []
+
+
+def test_add_search_and_window(index):
+    now = time.time()
+    vecs = np.eye(DIM, dtype=np.float32)[:3]
+    assert index.add([1, 2, 3, 9], np.vstack([vecs, vecs[:1]]), [now, now, now, now - 48 * 3600]) == 3
+    hits = index.search([1, 0.1, 0, 0], top_k=2)
+    assert [h["id"] for h in hits] == [1, 2]
+    assert hits[0]["similarity"] == pytest.approx(1 / np.sqrt(1.01), rel=1e-5)
+    assert index.search([1, 0, 0, 0], top_k=5, exclude_ids=[1])[0]["id"] != 1
+    assert index.search([1, 0, 0, 0], top_k=5, since=now + 1) == []
+    assert index.stats()["count"] == 3  # window 밖(48h 전) 벡터는 무시
+
+
+def test_readd_appends_and_tombstones_old_row(index):
+    now = time.time()
+    index.add([1, 2], np.eye(DIM, dtype=np.float32)[:2], [now, now])
+    assert index.add([1], np.array([[0, 0, 1, 0]], np.float32), [now]) == 1
+    stats = index.stats()
+    assert (stats["gen"], stats["count"], stats["live"]) == (1, 3, 2)  # 새 행 append, 예전 행 ts = -inf
+    assert index._ts[0] == -np.inf
+    hits = index.search([0, 0, 1, 0], top_k=5)
+    assert [h["id"] for h in hits] == [1, 2]  # 같은 id는 한 번만, 새 벡터 기준
+    assert hits[0]["similarity"] == pytest.approx(1.0)
+
+    # 다른 프로세스처럼 새로 연 reader도 같은 스냅샷을 봄
+    reader = RecentVectorIndex("hash:4", DIM, root=os.path.dirname(index.path), window_hours=24).open()
+    assert reader.search([0, 0, 1, 0], top_k=1)[0]["id"] == 1
+
+
+def test_compaction_drops_expired_and_replaced_rows(index, monkeypatch):
+    now = time.time()
+    index.add(range(600), _vecs(600), [now - 3600] * 300 + [now] * 300)
+    assert index.stats()["capacity"] == 1200
+    index.add(range(500, 600), _vecs(100, seed=1), [now] * 100)  # 100개 교체 → count 700
+    old_gen_dir = index._gen_dir(1)
+
+    # 앞 300개 만료 + 새 기사 600개 → 용량 초과 → 새 세대로 compaction
+    monkeypatch.setattr(index, "_cutoff", lambda: now - 60)
+    assert index.add(range(1000, 1600), _vecs(600, seed=2), [now] * 600) == 600
+    stats = index.stats()
+    assert stats["gen"] == 2 and stats["count"] == stats["live"] == 900
+    assert stats["capacity"] == 1800
+    assert not os.path.exists(old_gen_dir)
+    ids = np.asarray(index._ids[:index._count])
+    assert len(np.unique(ids)) == 900 and ids.min() == 300
+    # 교체된 id는 새 벡터만 남음
+    assert index.search(_vecs(100, seed=1)[0], top_k=1)[0] == {"id": 500, "similarity": pytest.approx(1.0)}
@@ -0,0 +1,80 @@
+# tests/test_vector_search.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 벡터 검색 모드 / 탐색 파라미터 (DB 없이 — set_config 호출만 기록)
+#   python -m pytest -q tests/test_vector_search.py
+# ─────────────────────────────────────────────────────────────────────────────
+import pytest
+
+from services import vector_search
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.settings = {}
+
+    def execute(self, sql, params):
+        key, value = params
+        self.settings[key] = value
+
+
+def _scan(monkeypatch, version, candidates, cfg, filtered=False, ef_search=None):
+    monkeypatch.setattr(vector_search, "pgvector_version", lambda: version)
+    cur = RecordingCursor()
+    vector_search._scan_settings(cur, candidates, cfg, ef_search, None, filtered)
+    return cur.settings
+
+
+def test_ef_search_at_least_candidates(monkeypatch):
+    s = _scan(monkeypatch, (0, 7, 4), 200, {"ef_search": 40})
+    assert s == {"hnsw.ef_search": "200", "ivfflat.probes": "10"}
+    assert _scan(monkeypatch, (0, 7, 4), 10, {"ef_search": 40})["hnsw.ef_search"] == "40"
+
+
+def test_ef_search_clamped_without_iterative_scan(monkeypatch):
+    s = _scan(monkeypatch, (0, 6, 2), 2000, {"ef_search": 40})
+    assert s["hnsw.ef_search"] == str(vector_search.MAX_EF_SEARCH)
+    assert "hnsw.iterative_scan" not in s
+
+
+def test_deep_results_use_iterative_scan(monkeypatch):
+    s = _scan(monkeypatch, (0, 8, 0), 5000, {"iterative_scan": "off", "max_scan_tuples": 1000})
+    assert s["hnsw.ef_search"] == "1000"
+    assert s["hnsw.iterative_scan"] == "relaxed_order"  # off여도 상한을 넘으면 켬
+    assert s["hnsw.max_scan_tuples"] == "5000"
+
+
+def test_filtered_search_keeps_configured_scan(monkeypatch):
+    s = _scan(monkeypatch, (0, 8, 0), 40, {"iterative_scan": "strict_order", "max_scan_tuples": 20000},
+              filtered=True)
+    assert s["hnsw.iterative_scan"] == "strict_order"
+    assert s["hnsw.max_scan_tuples"] == "20000"
+    assert "hnsw.iterative_scan" not in _scan(monkeypatch, (0, 8, 0), 40, {"iterative_scan": "off"})
+
+
+def test_max_candidates(monkeypatch):
+    monkeypatch.setattr(vector_search, "pgvector_version", lambda: (0, 6, 2))
+    assert vector_search.max_candidates() == 1000
+    monkeypatch.setattr(vector_search, "pgvector_version", lambda: (0, 8, 0))
+    assert vector_search.max_candidates() is None
+
+
+def test_check_dim_limits():
+    assert vector_search._check(3000, "half") == 3000
+    with pytest.raises(ValueError):
+        vector_search._check(3000, "full")
+    with pytest.raises(ValueError):
+        vector_search._check(512, "int8")
+
+
+def test_index_expressions_match_first_pass():
+    # planner가 인덱스를 쓰려면 1차 거리 식의 왼쪽이 인덱스 키 식과 같아야 함
+    for mode in vector_search.SEARCH_MODES:
+        expr, _ = vector_search._index_expr(512, mode)
+        assert vector_search._first_pass_distance(512, mode).startswith(expr[1:-1] + " ")
+
+
+def test_index_name_fits_identifier_limit():
+    name = vector_search.index_name(1536, "binary", "hnsw", model="local:BAAI/bge-m3-very-long-model-name")
+    assert len(name) <= 63
+    assert name != vector_search.index_name(1536, "binary", "hnsw", model="local:BAAI/bge-m3-other")
+    assert vector_search.index_name(512) == "article_embeddings_hnsw_cosine_512_idx"
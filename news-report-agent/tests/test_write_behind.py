@@ -0,0 +1,85 @@
+# tests/test_write_behind.py
+# ─────────────────────────────────────────────────────────────────────────────
+# 🧪 write-behind 저장 버퍼 — 크기 / 시간 기준 flush, 누적 결과·지표 (DB 없이 — 가짜 persist)
+#   python -m pytest -q tests/test_write_behind.py
+# ─────────────────────────────────────────────────────────────────────────────
+import threading
+
+import pytest
+
+from services.write_behind import ArticleWriteBehind
+
+
+class FakePersist:
+    """persist_articles 대체 — 받은 배치 기록, 짝수 url은 insert / 홀수는 update"""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+        self.flushed = threading.Condition()
+
+    def __call__(self, batch):
+        with self.flushed:
+            self.batches.append([a["url"] for a in batch])
+            self.flushed.notify_all()
+        if self.fail_on is not None and any(a["url"] == self.fail_on for a in batch):
+            raise RuntimeError("db down")
+        ins = [a["id"] for a in batch if a["id"] % 2 == 0]
+        upd = [a["id"] for a in batch if a["id"] % 2 == 1]
+        return {"processed": len(batch), "inserted": len(ins), "updated": len(upd),
+                "unchanged": 0, "skipped": 0, "inserted_ids": ins, "updated_ids": upd,
+                "errors": [], "article_index": {"hits": len(self.batches)}}
+
+    def wait_for(self, n, timeout=5.0):
+        with self.flushed:
+            assert self.flushed.wait_for(lambda: len(self.batches) >= n, timeout)
+
+
+def _article(i):
+    return {"id": i, "url": f"https://example.com/{i}"}
+
+
+def test_put_requires_start():
+    with pytest.raises(RuntimeError):
+        ArticleWriteBehind(persist=FakePersist()).put(_article(1))
+
+
+def test_flush_by_size_then_remainder_on_close():
+    persist = FakePersist()
+    wb = ArticleWriteBehind(flush_size=3, flush_interval=60.0, persist=persist).start()
+    for i in range(7):
+        wb.put(_article(i))
+    persist.wait_for(2)
+    assert [len(b) for b in persist.batches] == [3, 3]  # 60초 전이라 나머지 1건은 대기
+    wb.close()
+    assert [len(b) for b in persist.batches] == [3, 3, 1]
+    wb.close()  # 중복 호출 안전
+    assert len(persist.batches) == 3
+
+
+def test_flush_by_interval():
+    persist = FakePersist()
+    with ArticleWriteBehind(flush_size=100, flush_interval=0.05, persist=persist) as wb:
+        wb.put(_article(1))
+        wb.put(_article(2))
+        persist.wait_for(1)  # flush_size 미만이어도 flush_interval 뒤에 flush
+        assert persist.batches == [["https://example.com/1", "https://example.com/2"]]
+    assert len(persist.batches) == 1  # close 시 남은 기사 없음
+
+
+def test_result_accumulates_and_records_failed_flush():
+    persist = FakePersist(fail_on="https://example.com/3")
+    with ArticleWriteBehind(flush_size=2, flush_interval=60.0, persist=persist) as wb:
+        for i in range(5):
+            wb.put(_article(i))
+    out = wb.result()
+    # 배치 [0,1] / [2,3](실패) / [4]
+    assert out["inserted_ids"] == [0, 4] and out["updated_ids"] == [1]
+    assert out["all_processed_ids"] == [0, 4, 1]
+    assert (out["processed"], out["inserted"], out["updated"], out["skipped"]) == (5, 2, 1, 2)
+    assert out["errors"] == [{"url": None, "error": "flush failed: db down"}]
+    assert out["article_index"] == {"hits": 3}  # 마지막 flush 값
+    stats = out["write_behind"]
+    assert stats["flushes"] == 3 and stats["queue_depth"] == 0
+    assert stats["max_queue_depth"] <= 5 and stats["blocked_puts"] == 0
+    assert stats["flush_ms_max"] >= stats["flush_ms_avg"] >= 0.0
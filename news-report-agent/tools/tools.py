@@ -1,6 +1,8 @@
 from crewai import tool
 from services.orchestrator import fetch_scrape_upsert
 from services.embedding_service import generate_embeddings_batch
+from services.event_clustering import assign_online, cluster_window
+from services.topic_scope import select_articles, topic_events
 import json
 
 @tool
@@ -21,6 +23,8 @@ def fetch_and_store_news(rss_feeds: list[str]) -> dict:
         commit=True  # 실제 저장
     )
     
+    wb = result.get('write_behind') or {}
+
     # 읽기 쉬운 형태로 변환 (ID 정보 포함)
     summary = f"""📊 뉴스 수집 및 저장 완료:
 
@@ -28,9 +32,11 @@ def fetch_and_store_news(rss_feeds: list[str]) -> dict:
 ✅ 정제된 기사: {result.get('cleaned', 0)}개
 🆕 새로 저장: {result.get('inserted', 0)}개 (ID: {result.get('inserted_ids', [])})
 🔄 업데이트: {result.get('updated', 0)}개 (ID: {result.get('updated_ids', [])})
+💤 변경 없음: {result.get('unchanged', 0)}개
 ⏭️ 건너뜀: {result.get('skipped', 0)}개
 ❌ 오류: {len(result.get('errors', []))}개
 ⏱️ 소요시간: {result.get('elapsed_sec', 0)}초
+🧵 저장 flush: {wb.get('flushes', 0)}회 (평균 {wb.get('flush_ms_avg', 0)}ms, 최대 큐 {wb.get('max_queue_depth', 0)})
 
 🔗 임베딩 대상 ID: {result.get('all_processed_ids', [])}"""
     
@@ -54,10 +60,93 @@ def generate_embeddings_for_articles(article_ids: list[int]) -> str:
     summary = f"""🔢 임베딩 생성 완료:
 
 ✅ 처리된 기사: {result['processed']}개
+📡 API 요청: {result.get('requests', 0)}회 (재시도 {result.get('retries', 0)}회, 429 {result.get('rate_limited', 0)}회)
+🚀 처리량: {(result.get('throughput') or {}).get('inputs_per_sec', 0)} inputs/s, {(result.get('throughput') or {}).get('tokens_per_min', 0)} tokens/min
+🗃️ 캐시 적중: {result.get('cache_hits', 0)}개 (적중률 {result.get('cache_hit_rate', 0.0):.1%})
+✂️ 청크 분할: {result.get('chunked', 0)}개 기사 (전송 토큰 {result.get('tokens_sent', 0)})
 ❌ 오류: {len(result['errors'])}개
 📝 처리된 ID: {result['processed_ids']}
 
 {'⚠️ 오류 목록:' if result['errors'] else ''}
 {chr(10).join(f'  • {error}' for error in result['errors']) if result['errors'] else ''}"""
     
-    return summary
\ No newline at end of file
+    return summary
+
+
+@tool
+def cluster_recent_events(hours: float = 72, threshold: float | None = None, mode: str = "online",
+                          topic: str | None = None) -> str:
+    """
+    최근 기사 임베딩을 사건 단위로 클러스터링하고 events / event_articles에 저장합니다.
+    (numpy 벡터화 유사도 + 밀도 기반 묶기, 같은 입력이면 같은 결과)
+    
+    Args:
+        hours: 최근 몇 시간의 미배정 기사를 대상으로 할지 (online 모드에서는 open 사건 기준 시간)
+        threshold: cosine 유사도 임계값 (None이면 crew_settings.yaml clustering.threshold)
+        mode: "online" = 기존 open 사건에 합류 / 새 사건, "batch" = 윈도우 전체를 새로 묶기
+        topic: 주어지면 주제 관련 기사(임베딩 유사도 + 키워드)만 클러스터링
+        
+    Returns:
+        str: 생성된 사건 요약 (EventList 형태 JSON 포함)
+    """
+    article_ids = None
+    if topic:
+        article_ids = select_articles(topic, hours)["article_ids"]
+        if not article_ids:
+            return f"🎯 '{topic}' 관련 기사가 최근 {hours}시간 안에 없습니다."
+
+    if mode == "online":
+        result = assign_online(article_ids, threshold=threshold, open_hours=hours)
+        t = result["timings"]
+        return f"""🔄 사건 온라인 배정 완료:
+
+📰 대상 기사: {result['articles']}개 (임계값 {result['threshold']}, open 사건 {result.get('open_events', 0)}개)
+🔗 기존 사건 합류: {result['joined']}개 기사 → {result['events_touched']}개 사건 갱신
+🆕 새 사건: {len(result['new_events'])}개
+⏱️ 소요시간: 로드 {t.get('load_sec', 0)}초 / 매칭 {t.get('match_sec', 0)}초 / 저장 {t.get('write_sec', 0)}초
+
+📦 새 사건: {json.dumps(result['new_events'], ensure_ascii=False, default=str)}"""
+
+    result = cluster_window(hours=hours, threshold=threshold, article_ids=article_ids)
+    events = [
+        {
+            "id": e["event_id"],
+            "summary": e["summary"],
+            "start_time": e["start_time"],
+            "end_time": e["end_time"],
+            "centroid_article_id": e["centroid_article_id"],
+        }
+        for e in result["events"]
+    ]
+    t = result["timings"]
+    
+    summary = f"""🧩 사건 클러스터링 완료:
+
+📰 대상 기사: {result['articles']}개 (임계값 {result['threshold']})
+🔗 유사 쌍: {result['pairs']}개
+🗂️ 생성된 사건: {len(events)}개 (묶인 기사 {result['clustered_articles']}개)
+⏱️ 소요시간: 로드 {t['load_sec']}초 / 유사도 {t['pairs_sec']}초 / 묶기 {t['cluster_sec']}초 / 저장 {t['write_sec']}초
+
+📦 EventList: {json.dumps({"events": events}, ensure_ascii=False, default=str)}"""
+    
+    return summary
+
+
+@tool
+def get_topic_events(topic: str, hours: float = 72, limit: int = 10) -> str:
+    """
+    주제 관련 기사가 속한 사건만 골라 리포트 작성용 데이터로 반환합니다.
+    (주제 임베딩 1회 + 키워드 사전 필터 → 관련 기사 → 소속 사건, 관련 기사 수 순)
+    
+    Args:
+        topic: 리포트 주제 (예: "global energy crisis")
+        hours: 최근 몇 시간의 기사를 대상으로 할지
+        limit: 최대 사건 수
+        
+    Returns:
+        str: 사건 목록 JSON (요약, 태그, event_cred, conflicts, 주제 관련 기사 제목/언론사/URL)
+    """
+    result = topic_events(topic, hours, limit)
+    return f"""🎯 '{topic}' 관련 사건: {len(result['events'])}개 (관련 기사 {result['articles']}개)
+
+📦 Events: {json.dumps(result['events'], ensure_ascii=False, default=str)}"""